@@ -1,8 +1,16 @@
-import json
+import asyncio
 import re
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional
 from app.aws.bedrock_client import BedrockClient
-from app.aws.kb_client import KnowledgeBaseClient
+from app.aws.kb_client import KnowledgeBaseClient, pack_context
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.tracing import span
+from app.schemas.llm import DomainApplicationsOutput
+from app.services.domain_registry import DomainRegistry, DomainSpec, get_domain_registry
+from app.utils.validators import generate_validated
+
+logger = get_logger(__name__)
 
 
 class CrossDomainAgent:
@@ -11,66 +19,59 @@ class CrossDomainAgent:
     using grounded knowledge from the Bedrock Knowledge Base.
     """
     
-    def __init__(self):
-        self.bedrock = BedrockClient()
-        self.kb = KnowledgeBaseClient()
-        
-        # Domain-specific search queries to retrieve from KB
-        self.domain_queries = {
-            "health": "education to health healthcare medical applications skills transfer",
-            "finance": "education to finance financial banking applications skills transfer",
-            "agriculture": "education to agriculture farming crop applications skills transfer"
-        }
+    def __init__(
+        self,
+        bedrock: Optional[BedrockClient] = None,
+        kb: Optional[KnowledgeBaseClient] = None,
+        registry: Optional[DomainRegistry] = None
+    ):
+        self.bedrock = bedrock or BedrockClient()
+        self.kb = kb or KnowledgeBaseClient(self.bedrock)
+        # Target domains, their KB queries and prompts come from the registry
+        self.registry = registry or get_domain_registry()
+        self.max_concurrency = settings.CROSS_DOMAIN_MAX_CONCURRENCY
+        self.domain_timeout = settings.CROSS_DOMAIN_TIMEOUT_SECONDS
+        self.batched = settings.CROSS_DOMAIN_BATCHED
+        self.batch_size = max(1, settings.CROSS_DOMAIN_BATCH_SIZE)
     
-    def _retrieve_domain_context(self, domain: str, skills: List[str]) -> str:
+    async def _retrieve_contexts(
+        self,
+        specs: List[DomainSpec],
+        skills: List[str],
+        semaphore: asyncio.Semaphore
+    ) -> Dict[str, str]:
         """
-        Retrieves relevant context from the Knowledge Base for a specific domain.
+        KB context for the given domains from one concurrent batch of
+        retrievals, bounded by the run's shared retrieval `semaphore`.
+        A domain whose retrieval fails or misses CROSS_DOMAIN_TIMEOUT_SECONDS
+        gets "" (which selects the conservative fallback prompt).
         """
-        skills_str = " ".join(skills[:5])  # Use top 5 skills for context
-        query = f"{self.domain_queries.get(domain, domain)} {skills_str}"
-        
-        print(f"[CrossDomain] Searching KB for domain '{domain}' with query: {query[:100]}...")
-        
-        documents = self.kb.search(query)
+        queries = {spec.name: spec.query(skills[:5]) for spec in specs}  # Use top 5 skills for context
+        logger.info(f"Searching KB for {len(queries)} domains")
         
-        if not documents:
-            print(f"[CrossDomain] No documents found for domain '{domain}'")
-            return ""
+        results = await self.kb.search_many(list(queries.values()), timeout=self.domain_timeout, semaphore=semaphore)
         
-        # Combine top 3 document contents
-        context_parts = []
-        for doc in documents[:3]:
-            content = doc.get("content", "")
-            if content:
-                context_parts.append(content)
-                print(f"[CrossDomain] Found content for '{domain}' (score: {doc.get('score', 'N/A')})")
-        
-        return "\n\n".join(context_parts)
+        contexts = {}
+        for domain, query in queries.items():
+            documents = results.get(query, [])
+            if documents:
+                logger.debug(f"Found {len(documents)} documents for '{domain}' (best score: {documents[0].get('score', 'N/A')})")
+            else:
+                logger.info(f"No documents found for domain '{domain}'")
+            # Best-ranked document contents within the token budget
+            contexts[domain] = pack_context(documents)
+        return contexts
     
-    def _generate_domain_application(self, domain: str, skills: List[str], kb_context: str) -> str:
+    async def _generate_domain_application(self, spec: DomainSpec, skills: List[str], kb_context: str) -> str:
         """
         Generates domain-specific skill application using LLM grounded in KB content.
         """
+        domain = spec.name
         skills_summary = ", ".join(skills)
         
         if kb_context:
-            # Use KB-grounded prompt
-            prompt = f"""
-            You are a cross-domain career analyst. Your task is to explain how educational skills 
-            can be applied to the {domain.upper()} domain.
-            
-            USER'S SKILLS:
-            {skills_summary}
-            
-            KNOWLEDGE BASE REFERENCE (Use this as your primary source):
-            {kb_context}
-            
-            Based ONLY on the knowledge base content above, provide a specific, concise explanation 
-            (2-3 sentences max) of how these skills apply to {domain}. 
-            
-            Focus on concrete applications mentioned in the knowledge base.
-            Do NOT make up information. If the knowledge base doesn't mention something, don't include it.
-            """
+            # Use the domain's KB-grounded prompt
+            prompt = spec.prompt(skills, kb_context)
         else:
             # Fallback if no KB content - be conservative
             prompt = f"""
@@ -82,20 +83,203 @@ class CrossDomainAgent:
             might be relevant to the {domain} domain. Be conservative and factual.
             """
         
-        response = self.bedrock.generate_text(prompt)
+        response = await self.bedrock.generate_text(prompt)
         
+        return self._clean_application(response, domain)
+    
+    def _clean_application(self, response: str, domain: str) -> str:
         # Clean up the response - extract just the core content
         response = response.strip()
         # Remove any markdown or extra formatting
         response = re.sub(r'^[\s\S]*?(?=[A-Z])', '', response, count=1) if response else response
         
-        return response if response else f"Skills can be applied to {domain} sector."
+        return response if response else self._fallback_application(domain)
+    
+    @staticmethod
+    def _fallback_application(domain: str) -> str:
+        # Conservative text for a domain whose generation failed or timed out
+        return f"Skills can be applied to {domain} sector."
+    
+    async def _generate_with_fallback(self, spec: DomainSpec, skills: List[str], kb_context: str) -> str:
+        try:
+            return await asyncio.wait_for(
+                self._generate_domain_application(spec, skills, kb_context),
+                timeout=self.domain_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Generation for domain '{spec.name}' timed out after {self.domain_timeout}s")
+        except Exception as e:
+            logger.warning(f"Generation failed for domain '{spec.name}': {e}")
+        return self._fallback_application(spec.name)
+    
+    async def _generate_bounded(
+        self,
+        spec: DomainSpec,
+        skills: List[str],
+        kb_context: str,
+        semaphore: asyncio.Semaphore
+    ) -> str:
+        async with semaphore:
+            return await self._generate_with_fallback(spec, skills, kb_context)
+    
+    async def _process_domain(
+        self,
+        spec: DomainSpec,
+        skills: List[str],
+        retrieval: asyncio.Semaphore,
+        semaphore: asyncio.Semaphore,
+        on_domain_complete: Optional[Callable[[str, str], None]]
+    ) -> str:
+        """
+        Retrieval then grounded generation for one domain, so its generation
+        starts as soon as its own context arrives.
+        """
+        domain = spec.name
+        kb_context = (await self._retrieve_contexts([spec], skills, retrieval))[domain]
+        async with semaphore:
+            with span("cross_domain.domain", kind="step", domain=domain):
+                logger.debug(f"Processing domain: {domain}")
+                application = await self._generate_with_fallback(spec, skills, kb_context)
+        
+        if on_domain_complete:
+            on_domain_complete(domain, application)
+        return application
+    
+    async def _generate_batched(self, skills: List[str], contexts: Dict[str, str]) -> Dict[str, str]:
+        """
+        One grounded generation covering every domain. Returns the
+        applications the model produced, keyed by domain; domains that are
+        missing or empty are left out for the caller to fill in.
+        """
+        blocks = []
+        for domain, kb_context in contexts.items():
+            if kb_context:
+                blocks.append(f"""
+            ### {domain}
+            KNOWLEDGE BASE REFERENCE (Use this as your primary source):
+            {kb_context}
+            """)
+            else:
+                blocks.append(f"""
+            ### {domain}
+            No knowledge base content was found. Give a brief, general statement (1 sentence) and be conservative and factual.
+            """)
+        
+        prompt = f"""
+            You are a cross-domain career analyst. Your task is to explain how educational skills 
+            can be applied to each of the domains below.
+            
+            USER'S SKILLS:
+            {", ".join(skills)}
+            
+            DOMAINS:
+            {"".join(blocks)}
+            
+            For each domain with knowledge base content, provide a specific, concise explanation 
+            (2-3 sentences max) of how these skills apply to it, based ONLY on that domain's knowledge base content.
+            Do NOT make up information. If the knowledge base doesn't mention something, don't include it.
+            
+            Return ONLY a JSON object with one key per domain ({", ".join(f'"{domain}"' for domain in contexts)}),
+            each mapped to its explanation as a string.
+            """
+        
+        output = await generate_validated(self.bedrock, prompt, DomainApplicationsOutput)
+        if output is None:
+            logger.warning("Batched response was not valid JSON, falling back per domain")
+            return {}
+        parsed = output.root
+        
+        return {
+            domain: self._clean_application(parsed[domain], domain)
+            for domain in contexts
+            if parsed.get(domain, "").strip()
+        }
     
-    def run(self, learning_path: Dict[str, Any]) -> Dict[str, str]:
+    async def _run_batch(
+        self,
+        specs: List[DomainSpec],
+        skills: List[str],
+        retrieval: asyncio.Semaphore,
+        semaphore: asyncio.Semaphore,
+        on_domain_complete: Optional[Callable[[str, str], None]]
+    ) -> Dict[str, str]:
+        """
+        Retrieves context for a group of domains and generates their
+        applications in one call. Domains the batched answer misses are
+        generated individually; if the call times out, every domain gets the
+        conservative fallback instead. The batched call and each fallback
+        take a `semaphore` slot.
+        """
+        names = [spec.name for spec in specs]
+        with span("cross_domain.batch", kind="step", domains=len(specs)):
+            contexts = await self._retrieve_contexts(specs, skills, retrieval)
+            
+            try:
+                async with semaphore:
+                    applications = await asyncio.wait_for(
+                        self._generate_batched(skills, contexts),
+                        timeout=self.domain_timeout
+                    )
+            except asyncio.TimeoutError:
+                logger.warning(f"Batched generation timed out after {self.domain_timeout}s, using the conservative fallback")
+                applications = {name: self._fallback_application(name) for name in names}
+            except Exception as e:
+                logger.warning(f"Batched generation failed ({e}), falling back per domain")
+                applications = {}
+            
+            missing = [spec for spec in specs if spec.name not in applications]
+            if missing:
+                logger.warning(f"Batched answer missing {[spec.name for spec in missing]}, generating them individually")
+                fallbacks = await asyncio.gather(*[
+                    self._generate_bounded(spec, skills, contexts[spec.name], semaphore)
+                    for spec in missing
+                ])
+                applications.update(zip([spec.name for spec in missing], fallbacks))
+        
+        results = {name: applications[name] for name in names}
+        if on_domain_complete:
+            for domain, application in results.items():
+                on_domain_complete(domain, application)
+        return results
+    
+    async def _run_batched(
+        self,
+        specs: List[DomainSpec],
+        skills: List[str],
+        retrieval: asyncio.Semaphore,
+        semaphore: asyncio.Semaphore,
+        on_domain_complete: Optional[Callable[[str, str], None]]
+    ) -> Dict[str, str]:
+        """
+        Splits the domains into groups of CROSS_DOMAIN_BATCH_SIZE and runs
+        the groups concurrently, so adding domains grows prompt size and
+        call count in steps rather than wall-clock time linearly.
+        Model calls are bounded by `semaphore`.
+        """
+        batches = [specs[i:i + self.batch_size] for i in range(0, len(specs), self.batch_size)]
+        results: Dict[str, str] = {}
+        for batch_results in await asyncio.gather(*[
+            self._run_batch(batch, skills, retrieval, semaphore, on_domain_complete)
+            for batch in batches
+        ]):
+            results.update(batch_results)
+        return results
+    
+    async def run(
+        self,
+        learning_path: Dict[str, Any],
+        on_domain_complete: Optional[Callable[[str, str], None]] = None,
+        domains: Optional[List[str]] = None
+    ) -> Dict[str, str]:
         """
         Determines how the generated learning path can be applied to other domains.
         Uses Knowledge Base retrieval for grounded, factual responses.
+        `domains` restricts the run to those registry entries (all enabled
+        domains by default). `on_domain_complete(domain, application)` is
+        called as each domain finishes.
         """
+        specs = self.registry.select(domains)
+        
         # Extract all skills from the learning path
         all_skills = (
             learning_path.get("foundation", []) + 
@@ -107,22 +291,28 @@ class CrossDomainAgent:
             # Fallback if learning path has no skills
             all_skills = learning_path.get("skills_identified", ["general technical skills"])
         
-        print(f"[CrossDomain] Processing {len(all_skills)} skills for cross-domain mapping...")
+        logger.info(f"Processing {len(all_skills)} skills for cross-domain mapping...")
         
-        results = {}
+        # Retrievals share KB_SEARCH_MAX_CONCURRENCY and model calls in either
+        # mode share CROSS_DOMAIN_MAX_CONCURRENCY; each domain (or batch)
+        # generates as soon as its own context is in
+        retrieval = asyncio.Semaphore(settings.KB_SEARCH_MAX_CONCURRENCY)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
         
-        # Process each domain
-        for domain in ["health", "finance", "agriculture"]:
-            print(f"[CrossDomain] Processing domain: {domain}")
-            
-            # Step 1: Retrieve relevant KB content for this domain
-            kb_context = self._retrieve_domain_context(domain, all_skills)
-            
-            # Step 2: Generate domain-specific application grounded in KB
-            application = self._generate_domain_application(domain, all_skills, kb_context)
-            
-            results[domain] = application
+        if self.batched:
+            results = await self._run_batched(specs, all_skills, retrieval, semaphore, on_domain_complete)
+            logger.info(f"Completed. Results: {list(results.keys())}")
+            return results
+        
+        # Domain pipelines run concurrently
+        applications = await asyncio.gather(*[
+            self._process_domain(spec, all_skills, retrieval, semaphore, on_domain_complete)
+            for spec in specs
+        ])
+        
+        # gather() preserves input (priority) order, so the result dict is deterministic
+        results = dict(zip([spec.name for spec in specs], applications))
         
-        print(f"[CrossDomain] Completed. Results: {list(results.keys())}")
+        logger.info(f"Completed. Results: {list(results.keys())}")
         
         return results
@@ -1,8 +1,36 @@
-from typing import Dict, Any, List
-import json
-import re
-from app.aws.kb_client import KnowledgeBaseClient
+from typing import Dict, Any, List, Optional, Tuple
+from app.aws.kb_client import KnowledgeBaseClient, pack_context
 from app.aws.bedrock_client import BedrockClient
+from app.aws.errors import BedrockRequestError, BedrockStructuredOutputError
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.tracing import annotate
+from app.schemas.llm import LearningPathOutput
+from app.utils.validators import generate_validated
+
+logger = get_logger(__name__)
+
+STAGES = ("foundation", "intermediate", "advanced")
+
+# Tool schema for the single-call mode: relevance verdict, skills and stages together
+LEARNING_PATH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "relevant": {
+            "type": "boolean",
+            "description": "False if the retrieved content is about a different topic than the user goal."
+        },
+        "skills": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "Technical skills, concepts and tools mentioned in the content. Empty if not relevant."
+        },
+        "foundation": {"type": "array", "items": {"type": "string"}},
+        "intermediate": {"type": "array", "items": {"type": "string"}},
+        "advanced": {"type": "array", "items": {"type": "string"}}
+    },
+    "required": ["relevant", "skills", "foundation", "intermediate", "advanced"]
+}
 
 
 class EducationAgent:
@@ -11,11 +39,11 @@ class EducationAgent:
     Generates learning paths strictly from Knowledge Base content.
     """
 
-    def __init__(self):
-        self.kb = KnowledgeBaseClient()
-        self.bedrock = BedrockClient()
+    def __init__(self, bedrock: Optional[BedrockClient] = None, kb: Optional[KnowledgeBaseClient] = None):
+        self.bedrock = bedrock or BedrockClient()
+        self.kb = kb or KnowledgeBaseClient(self.bedrock)
 
-    def _extract_skills(self, documents: List[Dict[str, Any]], goal: str) -> List[str]:
+    async def _extract_skills(self, documents: List[Dict[str, Any]], goal: str) -> List[str]:
         """
         Uses LLM to extract specific technical skills from the retrieved documents.
         Crucially, it validates if the content is actually RELEVANT to the user's goal.
@@ -23,8 +51,8 @@ class EducationAgent:
         if not documents:
             return []
 
-        # Aggregate context from top documents
-        context_text = "\n\n".join([doc.get("content", "") for doc in documents[:3]])
+        # Aggregate context from the best-ranked documents within the token budget
+        context_text = pack_context(documents)
 
         prompt = f"""
         You are a strict content validator and curriculum designer. 
@@ -44,7 +72,7 @@ class EducationAgent:
         - OR a comma-separated list of skills found in the text.
         """
 
-        response = self.bedrock.generate_text(prompt)
+        response = await self.bedrock.generate_text(prompt)
         
         if "IRRELEVANT" in response.upper():
             return []
@@ -53,7 +81,7 @@ class EducationAgent:
         skills_list = [s.strip() for s in response.split(",") if s.strip()]
         return list(set(skills_list))
 
-    def _structure_learning_path(self, skills: List[str], goal: str) -> Dict[str, Any]:
+    async def _structure_learning_path(self, skills: List[str], goal: str) -> Dict[str, Any]:
         """
         Uses LLM to organize the extracted skills into a logical learning progression based on the user's goal.
         """
@@ -78,33 +106,87 @@ class EducationAgent:
         }}
         """
 
-        response = self.bedrock.generate_text(prompt)
-        
-        # specific logic to find and parse JSON in case of chatty model output
-        try:
-            # simple regex to extract json block if wrapped in code blocks or text
-            match = re.search(r'\{.*\}', response, re.DOTALL)
-            if match:
-                json_str = match.group(0)
-                return json.loads(json_str)
-            else:
-                return json.loads(response)
-        except json.JSONDecodeError:
-            # Fallback if JSON parsing fails
+        # Validated against the schema, with one repair retry for chatty or malformed output
+        path = await generate_validated(self.bedrock, prompt, LearningPathOutput)
+        if path is not None:
+            return path.model_dump()
+        else:
+            # Fallback if the model never produced a valid path
             return {
                 "foundation": skills[:len(skills)//3],
                 "intermediate": skills[len(skills)//3:2*len(skills)//3],
                 "advanced": skills[2*len(skills)//3:]
             }
 
-    def run(self, goal_context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _extract_and_structure(
+        self,
+        documents: List[Dict[str, Any]],
+        goal: str
+    ) -> Optional[Tuple[List[str], Dict[str, List[str]]]]:
+        """
+        Single structured-output call that does the relevance check, skill
+        extraction and stage assignment together.
+        Returns (skills, learning_path) - with no skills if the content is
+        irrelevant - or None if the model can't produce the structure, in
+        which case the caller uses the two-call path.
+        """
+        context_text = pack_context(documents)
+
+        prompt = f"""
+        You are a strict content validator and curriculum designer.
+        
+        User Goal: "{goal}"
+        
+        Retrieved Knowledge Base Content:
+        {context_text}
+        
+        Task:
+        1. Determine if the retrieved content contains specific information relevant to the User Goal.
+           If the content is about a completely different topic (e.g., User asks for "Java/Spring Boot" but content is only about "Python/Flask"), set "relevant" to false and leave every list empty.
+        2. If the content IS relevant, list the specific technical skills, concepts, and tools mentioned in the text.
+        3. Organize ONLY those skills into a 3-stage learning roadmap (foundation, intermediate, advanced).
+           Do not add skills that were not in the content.
+        
+        Call the record_learning_path tool with the result.
+        """
+
+        try:
+            result = await self.bedrock.generate_structured(
+                prompt,
+                tool_name="record_learning_path",
+                description="Records the relevance verdict, extracted skills and staged learning path.",
+                input_schema=LEARNING_PATH_SCHEMA
+            )
+        except (BedrockRequestError, BedrockStructuredOutputError) as e:
+            logger.warning(f"Structured output unavailable ({e}), using two-call path")
+            return None
+
+        if not isinstance(result.get("relevant"), bool) or not all(
+            isinstance(result.get(key), list) for key in ("skills",) + STAGES
+        ):
+            logger.warning("Structured output did not match the schema, using two-call path")
+            return None
+
+        if not result["relevant"]:
+            return [], {}
+
+        skills = list(dict.fromkeys(str(skill).strip() for skill in result["skills"] if str(skill).strip()))
+        # Keep stage assignments to skills the model actually extracted
+        known = set(skills)
+        learning_path = {
+            stage: [skill for skill in result[stage] if skill in known]
+            for stage in STAGES
+        }
+        return skills, learning_path
+
+    async def run(self, goal_context: Dict[str, Any]) -> Dict[str, Any]:
         """
         Main execution method.
         """
         query = goal_context.get("raw_input")
 
         # Step 1: Retrieve grounded knowledge
-        retrieved_docs = self.kb.search(query)
+        retrieved_docs = await self.kb.search(query)
 
         if not retrieved_docs:
             return {
@@ -113,8 +195,17 @@ class EducationAgent:
                 "learning_path": None
             }
 
-        # Step 2: Extract skills using LLM (with Relevance Check)
-        skills = self._extract_skills(retrieved_docs, query)
+        # Step 2: Extract skills using LLM (with Relevance Check), in one
+        # structured call when the model supports it
+        structured = None
+        if settings.EDUCATION_STRUCTURED_OUTPUT and self.bedrock.supports_structured_output():
+            structured = await self._extract_and_structure(retrieved_docs, query)
+        annotate(education_mode="single_call" if structured is not None else "two_call")
+
+        if structured is not None:
+            skills, learning_path = structured
+        else:
+            skills = await self._extract_skills(retrieved_docs, query)
 
         # If strict extraction returned nothing (irrelevant content), fail safely.
         if not skills:
@@ -125,7 +216,8 @@ class EducationAgent:
             }
 
         # Step 3: Structure learning stages using LLM
-        learning_path = self._structure_learning_path(skills, query)
+        if structured is None:
+            learning_path = await self._structure_learning_path(skills, query)
 
         return {
             "status": "success",
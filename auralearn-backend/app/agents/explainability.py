@@ -1,13 +1,14 @@
 import json
-import re
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.aws.bedrock_client import BedrockClient
+from app.schemas.llm import ExplanationOutput
+from app.utils.validators import generate_validated
 
 class ExplainabilityAgent:
-    def __init__(self):
-        self.bedrock = BedrockClient()
+    def __init__(self, bedrock: Optional[BedrockClient] = None):
+        self.bedrock = bedrock or BedrockClient()
 
-    def run(self, goal_context: Dict[str, Any], learning_path: Dict[str, Any], cross_domain_impact: Dict[str, str]) -> Dict[str, Any]:
+    async def run(self, goal_context: Dict[str, Any], learning_path: Dict[str, Any], cross_domain_impact: Dict[str, str]) -> Dict[str, Any]:
         """
         Generates a human-understandable explanation for the AI's decisions.
         """
@@ -39,16 +40,12 @@ class ExplainabilityAgent:
         }}
         """
 
-        response = self.bedrock.generate_text(prompt)
-
-        try:
-            match = re.search(r'\{.*\}', response, re.DOTALL)
-            if match:
-                json_str = match.group(0)
-                return json.loads(json_str)
-            else:
-                return json.loads(response)
-        except json.JSONDecodeError:
+        # Not user-facing, so use the plain call: it goes through the response
+        # cache, which only stores streams that run to completion
+        explanation = await generate_validated(self.bedrock, prompt, ExplanationOutput)
+        if explanation is not None:
+            return explanation.model_dump()
+        else:
             return {
                 "summary": "Generated based on top relevance matches in the Knowledge Base.",
                 "assumptions": ["Standard learning progression"],
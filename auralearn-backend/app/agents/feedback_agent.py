@@ -1,8 +1,13 @@
 import json
-import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from app.aws.bedrock_client import BedrockClient
-from app.aws.kb_client import KnowledgeBaseClient
+from app.aws.kb_client import KnowledgeBaseClient, pack_context
+from app.core.logging import get_logger
+from app.memory.state import SessionStore
+from app.schemas.llm import RefinedPathOutput
+from app.utils.validators import generate_validated
+
+logger = get_logger(__name__)
 
 
 class FeedbackAgent:
@@ -11,9 +16,16 @@ class FeedbackAgent:
     Implements the feedback loop for continuous path improvement.
     """
     
-    def __init__(self):
-        self.bedrock = BedrockClient()
-        self.kb = KnowledgeBaseClient()
+    def __init__(
+        self,
+        bedrock: Optional[BedrockClient] = None,
+        kb: Optional[KnowledgeBaseClient] = None,
+        store: Optional[SessionStore] = None
+    ):
+        self.bedrock = bedrock or BedrockClient()
+        self.kb = kb or KnowledgeBaseClient(self.bedrock)
+        # Lets refinements in the same session reuse KB context already fetched
+        self.store = store
     
     def _categorize_feedback(self, feedback: Dict[str, Any]) -> Dict[str, List[str]]:
         """
@@ -43,34 +55,42 @@ class FeedbackAgent:
         
         return categorized
     
-    def _retrieve_additional_content(self, topics: List[str], original_goal: str) -> str:
+    async def _retrieve_additional_content(
+        self,
+        topics: List[str],
+        original_goal: str,
+        session_id: Optional[str] = None
+    ) -> str:
         """
         Retrieves additional content from KB for topics user wants to explore more.
+        Within a session, context for a query already retrieved is reused.
         """
         if not topics:
             return ""
         
         query = f"{original_goal} {' '.join(topics)} advanced techniques best practices"
-        print(f"[FeedbackAgent] Retrieving additional content for: {query[:100]}...")
-        
-        documents = self.kb.search(query)
+        context_key = f"refine:{query}"
+        if self.store and session_id:
+            cached = await self.store.get_context(session_id, context_key)
+            if cached is not None:
+                logger.debug(f"Reusing session KB context for: {query[:100]}...")
+                return cached
         
-        if not documents:
-            return ""
+        logger.info(f"Retrieving additional content for: {query[:100]}...")
         
-        context_parts = []
-        for doc in documents[:3]:
-            content = doc.get("content", "")
-            if content:
-                context_parts.append(content)
+        documents = await self.kb.search(query)
         
-        return "\n\n".join(context_parts)
+        context = pack_context(documents or [])
+        if context and self.store and session_id:
+            await self.store.set_context(session_id, context_key, context)
+        return context
     
-    def run(
+    async def run(
         self, 
         original_path: Dict[str, Any], 
         feedback: Dict[str, Any],
-        original_goal: str
+        original_goal: str,
+        session_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Refines the learning path based on user feedback.
@@ -79,27 +99,30 @@ class FeedbackAgent:
             original_path: The original learning path structure
             feedback: User feedback with skill ratings and comments
             original_goal: The original user goal
+            session_id: Session whose cached KB context may be reused
             
         Returns:
             Refined learning path with explanation of changes
         """
-        print(f"[FeedbackAgent] Processing feedback for goal: {original_goal[:50]}...")
+        logger.info(f"Processing feedback for goal: {original_goal[:50]}...")
         
         # Step 1: Categorize the feedback
         categorized = self._categorize_feedback(feedback)
         
-        print(f"[FeedbackAgent] Feedback categories:")
-        print(f"  - Already known: {len(categorized['already_known'])} skills")
-        print(f"  - Too advanced: {len(categorized['too_advanced'])} skills")
-        print(f"  - Not relevant: {len(categorized['not_relevant'])} skills")
-        print(f"  - Want more: {len(categorized['want_more'])} skills")
+        logger.info(
+            f"Feedback categories: already known {len(categorized['already_known'])}, "
+            f"too advanced {len(categorized['too_advanced'])}, "
+            f"not relevant {len(categorized['not_relevant'])}, "
+            f"want more {len(categorized['want_more'])} skills"
+        )
         
         # Step 2: Get additional KB content if user wants to explore more topics
         additional_context = ""
         if categorized["want_more"]:
-            additional_context = self._retrieve_additional_content(
+            additional_context = await self._retrieve_additional_content(
                 categorized["want_more"], 
-                original_goal
+                original_goal,
+                session_id
             )
         
         # Step 3: Build refinement prompt
@@ -148,16 +171,11 @@ class FeedbackAgent:
         }}
         """
         
-        response = self.bedrock.generate_text(prompt)
+        # Step 4: Generate and validate the refined path (one repair retry on bad JSON)
+        refined = await generate_validated(self.bedrock, prompt, RefinedPathOutput)
         
-        # Step 4: Parse the response
-        try:
-            match = re.search(r'\{.*\}', response, re.DOTALL)
-            if match:
-                json_str = match.group(0)
-                refined_path = json.loads(json_str)
-            else:
-                refined_path = json.loads(response)
+        if refined is not None:
+            refined_path = refined.model_dump()
             
             # Extract changes for transparency
             changes_made = refined_path.pop("changes_made", [])
@@ -173,8 +191,8 @@ class FeedbackAgent:
                 }
             }
             
-        except json.JSONDecodeError as e:
-            print(f"[FeedbackAgent] JSON parsing error: {e}")
+        else:
+            logger.warning("No valid refined path from the model, applying simple removals")
             # Fallback: Apply simple removals
             refined_foundation = [s for s in current_foundation 
                                   if s not in categorized["already_known"] 
@@ -1,8 +1,19 @@
-from typing import Dict, Any, List
+import asyncio
+from typing import AsyncIterator, Callable, Dict, Any, List, Optional, Tuple
 from app.aws.bedrock_client import BedrockClient
+from app.aws.kb_client import KnowledgeBaseClient
 from app.agents.education_agent import EducationAgent
 from app.agents.cross_domain_agent import CrossDomainAgent
 from app.agents.explainability import ExplainabilityAgent
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.tracing import span
+from app.services.planner import PlanExecutor, PlanStep
+
+logger = get_logger(__name__)
+
+# Receives (event, payload) as orchestration stages complete
+EventCallback = Callable[[str, Any], None]
 
 
 class OrchestratorAgent:
@@ -11,13 +22,15 @@ class OrchestratorAgent:
     Owns decision flow, not domain logic.
     """
 
-    def __init__(self):
-        self.bedrock = BedrockClient()
-        self.education_agent = EducationAgent()
-        self.cross_domain_agent = CrossDomainAgent()
-        self.explainability_agent = ExplainabilityAgent()
+    def __init__(self, bedrock: Optional[BedrockClient] = None, kb: Optional[KnowledgeBaseClient] = None):
+        self.bedrock = bedrock or BedrockClient()
+        self.kb = kb or KnowledgeBaseClient(self.bedrock)
+        self.education_agent = EducationAgent(self.bedrock, self.kb)
+        self.cross_domain_agent = CrossDomainAgent(self.bedrock, self.kb)
+        self.explainability_agent = ExplainabilityAgent(self.bedrock)
+        self.executor = PlanExecutor(max_concurrency=settings.ORCHESTRATOR_MAX_CONCURRENCY)
 
-    def interpret_goal(self, user_input: str) -> Dict[str, Any]:
+    async def interpret_goal(self, user_input: str) -> Dict[str, Any]:
         """
         Uses Nova Premier to interpret and structure the user's goal.
         """
@@ -34,53 +47,102 @@ class OrchestratorAgent:
         Return a structured interpretation.
         """
 
-        response = self.bedrock.generate_text(prompt)
+        response = await self.bedrock.generate_text(prompt)
 
         return {
             "raw_input": user_input,
             "interpreted_goal": response
         }
 
-    def plan(self, interpreted_goal: Dict[str, Any]) -> List[str]:
+    def plan(
+        self,
+        user_input: str,
+        on_event: Optional[EventCallback] = None,
+        domains: Optional[List[str]] = None
+    ) -> List[PlanStep]:
         """
-        Creates a high-level execution plan.
+        Creates the execution plan as a dependency graph.
+        EducationAgent only needs the raw input, so goal interpretation and
+        KB retrieval/skill extraction run side by side.
+        `domains` limits cross-domain mapping to those registry entries.
         """
+        def on_domain_complete(domain: str, application: str):
+            if on_event:
+                on_event("cross_domain", {"domain": domain, "application": application})
+
         return [
-            "generate_learning_path",
-            "map_cross_domain_impact",
-            "generate_explanation"
+            PlanStep(
+                name="interpret_goal",
+                run=self.interpret_goal,
+                inputs=["user_input"],
+                output="goal_context"
+            ),
+            PlanStep(
+                name="generate_learning_path",
+                run=lambda user_input: self.education_agent.run({"raw_input": user_input}),
+                inputs=["user_input"],
+                output="learning_path",
+                cancel_downstream=lambda result: result.get("status") == "insufficient_knowledge"
+            ),
+            PlanStep(
+                name="map_cross_domain_impact",
+                run=lambda learning_path: self.cross_domain_agent.run(learning_path, on_domain_complete, domains),
+                inputs=["learning_path"],
+                output="cross_domain_impact",
+                cancelled_output={}
+            ),
+            PlanStep(
+                name="generate_explanation",
+                run=self.explainability_agent.run,
+                inputs=["goal_context", "learning_path", "cross_domain_impact"],
+                output="explanation",
+                cancelled_output={
+                    "summary": "No learning plan was generated because the Knowledge Base does not cover this goal.",
+                    "assumptions": [],
+                    "confidence": "Low"
+                }
+            )
         ]
 
-    def execute(self, user_input: str) -> Dict[str, Any]:
+    async def execute(
+        self,
+        user_input: str,
+        on_event: Optional[EventCallback] = None,
+        domains: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """
         Full orchestration pipeline.
+        `on_event(event, payload)` is called as each stage completes, with the
+        stage's output name as the event (goal_context, learning_path,
+        cross_domain_impact, explanation) plus one `cross_domain` per domain.
+        `domains` selects the cross-domain targets (all enabled by default).
         """
         decision_trace = {}
 
-        # Step 1: Interpret goal
-        goal_context = self.interpret_goal(user_input)
-        decision_trace["goal_interpretation"] = goal_context
+        # Step 1: Plan
+        plan_steps = self.plan(user_input, on_event, domains)
+        decision_trace["plan"] = [step.describe() for step in plan_steps]
 
-        # Step 2: Plan
-        plan_steps = self.plan(goal_context)
-        decision_trace["plan"] = plan_steps
+        def on_step_finished(step: PlanStep, status: str, value: Any):
+            if on_event:
+                on_event(step.output, value)
 
-        # Step 3: Execute Education Agent
-        learning_path = self.education_agent.run(goal_context)
-        decision_trace["education_output"] = learning_path
-
-        # Step 4: Execute Cross-Domain Agent
-        cross_domain_impact = self.cross_domain_agent.run(learning_path)
-        decision_trace["cross_domain_output"] = cross_domain_impact
+        # Step 2: Execute the plan; independent steps run concurrently
+        with span("orchestrate", kind="pipeline") as trace:
+            values, timings = await self.executor.run(plan_steps, {"user_input": user_input}, on_step_finished)
 
-        # Step 5: Explainability
-        explanation = self.explainability_agent.run(
-            goal_context=goal_context,
-            learning_path=learning_path,
-            cross_domain_impact=cross_domain_impact
-        )
+        learning_path = values["learning_path"]
+        cross_domain_impact = values["cross_domain_impact"]
+        explanation = values["explanation"]
 
+        decision_trace["goal_interpretation"] = values["goal_context"]
+        decision_trace["education_output"] = learning_path
+        decision_trace["cross_domain_output"] = cross_domain_impact
         decision_trace["explanation"] = explanation
+        decision_trace["step_timings"] = timings
+        # Per-call timing tree (steps -> Bedrock/KB calls) and what the run cost
+        decision_trace["timing"] = trace.to_dict()
+        decision_trace["usage"] = trace.totals()
 
         return {
             "learning_plan": learning_path,
@@ -88,3 +150,34 @@ class OrchestratorAgent:
             "explanation": explanation,
             "decision_trace": decision_trace
         }
+
+    async def execute_stream(self, user_input: str, domains: Optional[List[str]] = None) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Runs execute() as a background task and yields (event, payload) pairs
+        as stages complete, ending with ("result", full_response) or
+        ("error", {"message": ...}).
+        """
+        events: "asyncio.Queue[Tuple[str, Any]]" = asyncio.Queue()
+
+        async def worker():
+            try:
+                result = await self.execute(
+                    user_input,
+                    on_event=lambda event, payload: events.put_nowait((event, payload)),
+                    domains=domains
+                )
+                events.put_nowait(("result", result))
+            except Exception as e:
+                logger.exception(f"Pipeline failed: {e}")
+                events.put_nowait(("error", {"message": str(e)}))
+
+        task = asyncio.ensure_future(worker())
+        try:
+            while True:
+                event, payload = await events.get()
+                yield event, payload
+                if event in ("result", "error"):
+                    return
+        finally:
+            # Stop the pipeline if the consumer goes away early
+            task.cancel()
@@ -0,0 +1,49 @@
+from typing import Optional
+from fastapi import Request
+from app.aws.bedrock_client import BedrockClient
+from app.aws.kb_client import KnowledgeBaseClient
+from app.memory.state import SessionStore
+from app.services.learn_catalogue import LearnCatalogue
+from app.utils.singleflight import SingleFlight
+
+
+async def get_bedrock_client(request: Request) -> BedrockClient:
+    """
+    Shared Bedrock client created in the app lifespan.
+    """
+    return request.app.state.bedrock
+
+
+async def get_kb_client(request: Request) -> KnowledgeBaseClient:
+    """
+    Shared Knowledge Base client created in the app lifespan.
+    """
+    return request.app.state.kb
+
+
+async def get_sessions(request: Request) -> SessionStore:
+    """
+    Shared session store created in the app lifespan.
+    """
+    return request.app.state.sessions
+
+
+async def get_orchestrations(request: Request) -> SingleFlight:
+    """
+    In-flight /orchestrate runs, keyed by normalised input and domains.
+    """
+    return request.app.state.orchestrations
+
+
+async def get_learn_modules(request: Request) -> SingleFlight:
+    """
+    In-flight /learn generations, keyed by skill, level and context.
+    """
+    return request.app.state.learn_modules
+
+
+async def get_catalogue(request: Request) -> Optional[LearnCatalogue]:
+    """
+    Precomputed /learn modules, or None when the catalogue is disabled.
+    """
+    return request.app.state.learn_catalogue
@@ -0,0 +1,50 @@
+import time
+
+from app.core.logging import get_logger
+from app.core.metrics import HTTP_REQUEST_DURATION
+from app.core.tracing import span
+
+logger = get_logger("http")
+
+
+class RequestTracingMiddleware:
+    """
+    Pure ASGI middleware (so streamed bodies are included in the timing)
+    that opens the root span for each HTTP request and records its latency
+    by route template.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        with span(f"{scope['method']} unmatched", kind="request", http_path=scope["path"]) as request_span:
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                elapsed = time.perf_counter() - start
+                # Label by route template, not raw path, to bound cardinality;
+                # the span is named the same way since SPAN_DURATION labels it by name
+                route = scope.get("route")
+                template = route.path if route is not None else "unmatched"
+                HTTP_REQUEST_DURATION.observe(
+                    elapsed,
+                    method=scope["method"],
+                    route=template,
+                    status=str(status["code"])
+                )
+                request_span.name = f"{scope['method']} {template}"
+                request_span.set(http_status=status["code"])
+                logger.info(f"{scope['method']} {scope['path']} {status['code']} {elapsed * 1000:.1f}ms")
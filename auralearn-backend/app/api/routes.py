@@ -1,45 +1,320 @@
-from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import Dict, Any, Optional
-from app.aws.kb_client import KnowledgeBaseClient
+import copy
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import Awaitable, Callable, Dict, Any, Hashable, List, Optional, TypeVar
+from app.aws.kb_client import KnowledgeBaseClient, normalize_query
 from app.aws.bedrock_client import BedrockClient
 from app.agents.orchestrator import OrchestratorAgent
 from app.agents.feedback_agent import FeedbackAgent
+from app.api.dependencies import (
+    get_bedrock_client,
+    get_catalogue,
+    get_kb_client,
+    get_learn_modules,
+    get_orchestrations,
+    get_sessions
+)
+from app.api.streaming import single_chunk, sse_event, sse_response, stream_text_events
+from app.core.config import settings
+from app.core.metrics import registry as metrics_registry
+from app.memory.conversation import ConversationMemory
+from app.memory.state import SessionStore
+from app.schemas.request import ChatRequest, FeedbackRequest, LearnRequest, OrchestrateRequest
+from app.schemas.response import ChatResponse, LearnResponse, OrchestrateResponse, compact_orchestration
+from app.services.domain_registry import get_domain_registry
+from app.services.learn_catalogue import LearnCatalogue, build_learn_prompt
+from app.utils.singleflight import SingleFlight
 
 router = APIRouter()
 
+T = TypeVar("T")
 
-# Request model for feedback
-class FeedbackRequest(BaseModel):
-    original_path: Dict[str, Any]
-    feedback: Dict[str, Any]
-    original_goal: str
+
+async def coalesced(flight: SingleFlight, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+    """
+    Runs `fn`, or joins an identical run already in flight when
+    REQUEST_COALESCING_ENABLED. The result may be shared between requests;
+    copy it before mutating.
+    """
+    if not settings.REQUEST_COALESCING_ENABLED:
+        return await fn()
+    return await flight.do(key, fn)
+
+
+async def load_session(store: SessionStore, session_id: str) -> Dict[str, Any]:
+    session = await store.get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session '{session_id}'")
+    return session
+
+
+async def save_orchestration(store: SessionStore, session_id: Optional[str], user_input: str, result: Dict[str, Any]) -> str:
+    """
+    Stores the generated plan (without the decision trace) under the given
+    session, or a new one, and returns the session id.
+    """
+    if session_id is None:
+        session_id = await store.create_session(user_input)
+    await store.save_plan(session_id, user_input, {
+        "learning_plan": result.get("learning_plan"),
+        "cross_domain_impact": result.get("cross_domain_impact"),
+        "explanation": result.get("explanation")
+    })
+    return session_id
+
+
+async def chat_history(
+    bedrock: BedrockClient,
+    store: SessionStore,
+    session_id: Optional[str],
+    conversation_history: str
+) -> str:
+    """
+    Token-budgeted history for a chat turn: the session's recent turns plus
+    a summary of older ones when a session is given, otherwise the newest
+    part of whatever the client sent.
+    """
+    memory = ConversationMemory(bedrock, store)
+    if session_id is None:
+        return memory.trim(conversation_history)
+    await load_session(store, session_id)
+    return await memory.history(session_id)
+
+
+async def record_roadmap(catalogue: Optional[LearnCatalogue], result: Dict[str, Any]):
+    """
+    Counts the roadmap's skills as likely /learn requests for the warm-up.
+    """
+    if catalogue is not None:
+        await catalogue.record_roadmap((result.get("learning_plan") or {}).get("learning_path"))
+
+
+async def catalogued_module(catalogue: Optional[LearnCatalogue], request: LearnRequest) -> Optional[str]:
+    """
+    Records the /learn request and returns its precomputed module, if any.
+    Requests with extra context always generate live.
+    """
+    if catalogue is None:
+        return None
+    await catalogue.record_request(request.skill, request.user_level)
+    if request.context.strip():
+        return None
+    return await catalogue.get(request.skill, request.user_level)
+
+
+async def store_module(catalogue: Optional[LearnCatalogue], request: LearnRequest, content: str):
+    """
+    Keeps a live module only for pairs the warm-up would precompute.
+    """
+    if catalogue is not None and content and not request.context.strip():
+        await catalogue.put_if_in_demand(request.skill, request.user_level, content)
+
+
+async def record_turn(store: SessionStore, session_id: Optional[str], message: str, reply: str):
+    if session_id is not None:
+        await store.append_turn(session_id, "user", message)
+        await store.append_turn(session_id, "assistant", reply)
+
+
+def validate_domains(domains: Optional[List[str]]) -> Optional[List[str]]:
+    """
+    Rejects unknown or disabled cross-domain targets before any work starts.
+    """
+    try:
+        get_domain_registry().select(domains)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return domains
+
+
+def build_chat_prompt(message: str, skill_context: str, conversation_history: str) -> str:
+    """
+    Prompt for one tutor chat turn.
+    """
+    return f"""
+    You are AURA, an AI learning tutor. You help students understand technical concepts clearly and patiently.
+    
+    Current Topic/Skill Context: {skill_context if skill_context else "General programming and technology"}
+    
+    Previous Conversation:
+    {conversation_history if conversation_history else "This is the start of the conversation."}
+    
+    Student's Question/Message: {message}
+    
+    Respond helpfully and concisely. If asked to explain something, use simple language and examples.
+    If asked for code, provide working examples with comments.
+    Keep responses focused and under 300 words unless a longer explanation is truly needed.
+    """
 
 
 @router.get("/health")
-def health_check():
+async def health_check():
     return {"status": "ok"}
 
 
-@router.post("/orchestrate")
-def orchestrate(user_input: str):
-    orchestrator = OrchestratorAgent()
-    return orchestrator.execute(user_input)
+@router.get("/domains")
+async def list_domains():
+    """
+    Cross-domain targets from the domain registry, in priority order.
+    Pass any enabled names as `domains` to /orchestrate to select a subset.
+    """
+    return {"domains": get_domain_registry().describe()}
+
+@router.post("/orchestrate", response_model=OrchestrateResponse, response_model_exclude_unset=True)
+async def orchestrate(
+    request: OrchestrateRequest,
+    bedrock: BedrockClient = Depends(get_bedrock_client),
+    kb: KnowledgeBaseClient = Depends(get_kb_client),
+    sessions: SessionStore = Depends(get_sessions),
+    orchestrations: SingleFlight = Depends(get_orchestrations),
+    catalogue: Optional[LearnCatalogue] = Depends(get_catalogue)
+):
+    """
+    Generates a complete learning path. The plan is stored under
+    `session_id` (a new session if omitted), returned as `session_id` for
+    /refine and /chat. `verbose: false` and `fields` trim the response.
+    Concurrent requests with the same input and domains share one run,
+    each getting its own session.
+    """
+    domains = validate_domains(request.domains)
+    if request.session_id is not None:
+        await load_session(sessions, request.session_id)
+    orchestrator = OrchestratorAgent(bedrock, kb)
+    key = (normalize_query(request.user_input), tuple(domains) if domains is not None else None)
+    shared = await coalesced(orchestrations, key, lambda: orchestrator.execute(request.user_input, domains=domains))
+    result = copy.deepcopy(shared)
+    await record_roadmap(catalogue, result)
+    result["session_id"] = await save_orchestration(sessions, request.session_id, request.user_input, result)
+    return compact_orchestration(result, request.verbose, request.fields)
+
+@router.post("/orchestrate/stream")
+async def orchestrate_stream(
+    request: OrchestrateRequest,
+    bedrock: BedrockClient = Depends(get_bedrock_client),
+    kb: KnowledgeBaseClient = Depends(get_kb_client),
+    sessions: SessionStore = Depends(get_sessions),
+    catalogue: Optional[LearnCatalogue] = Depends(get_catalogue)
+):
+    """
+    Streaming variant of /orchestrate.
+    Emits one server-sent event per completed stage:
+    - goal_context: interpreted goal
+    - learning_path: Education Agent output
+    - cross_domain: {"domain", "application"} as each domain finishes
+    - cross_domain_impact: all domains
+    - explanation: Explainability Agent output
+    - result: the /orchestrate response, including `session_id` (or `error` on failure)
+    """
+    domains = validate_domains(request.domains)
+    if request.session_id is not None:
+        await load_session(sessions, request.session_id)
+    orchestrator = OrchestratorAgent(bedrock, kb)
+
+    async def events():
+        async for event, payload in orchestrator.execute_stream(request.user_input, domains):
+            if event == "result":
+                await record_roadmap(catalogue, payload)
+                payload["session_id"] = await save_orchestration(sessions, request.session_id, request.user_input, payload)
+                payload = compact_orchestration(payload, request.verbose, request.fields)
+            yield sse_event(event, payload)
+
+    return sse_response(events())
+
+@router.post("/sessions")
+async def create_session(goal: str = "", sessions: SessionStore = Depends(get_sessions)):
+    """
+    Starts an empty session, e.g. for tutor chat without a generated plan.
+    """
+    return {"session_id": await sessions.create_session(goal)}
+
+@router.get("/sessions/{session_id}")
+async def get_session(session_id: str, sessions: SessionStore = Depends(get_sessions)):
+    """
+    The session's current plan, feedback rounds and chat history.
+    """
+    session = await load_session(sessions, session_id)
+    session["feedback_rounds"] = await sessions.feedback_rounds(session_id)
+    session["chat_history"] = await sessions.history(session_id)
+    return session
+
+@router.put("/sessions/{session_id}/learning_path")
+async def update_session_learning_path(
+    session_id: str,
+    learning_path: Dict[str, Any],
+    sessions: SessionStore = Depends(get_sessions)
+):
+    """
+    Replaces the session plan's learning path, e.g. with an accepted /refine proposal.
+    """
+    session = await load_session(sessions, session_id)
+    plan = session["plan"] or {}
+    plan["learning_plan"] = dict(plan.get("learning_plan") or {}, learning_path=learning_path)
+    await sessions.save_plan(session_id, session["goal"], plan)
+    return {"status": "success", "session_id": session_id}
+
+@router.delete("/sessions/{session_id}")
+async def delete_session(session_id: str, sessions: SessionStore = Depends(get_sessions)):
+    if not await sessions.delete_session(session_id):
+        raise HTTPException(status_code=404, detail=f"Unknown or expired session '{session_id}'")
+    return {"status": "success", "session_id": session_id}
+
+@router.get("/cache/stats")
+async def cache_stats(
+    bedrock: BedrockClient = Depends(get_bedrock_client),
+    kb: KnowledgeBaseClient = Depends(get_kb_client),
+    catalogue: Optional[LearnCatalogue] = Depends(get_catalogue)
+):
+    """
+    Hit/miss counters and sizes for the LLM response and KB retrieval
+    caches, and the size and version of the /learn catalogue.
+    """
+    return {
+        "llm_responses": await bedrock.cache.stats() if bedrock.cache else None,
+        "kb_retrievals": kb.cache.stats() if kb.cache else None,
+        "learn_catalogue": await catalogue.stats() if catalogue else None
+    }
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus text-format metrics: request and per-stage latency histograms,
+    Bedrock token counts, retries and cache lookups.
+    """
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+@router.post("/kb/invalidate")
+async def invalidate_kb_cache(kb_id: Optional[str] = None, kb: KnowledgeBaseClient = Depends(get_kb_client)):
+    """
+    Drops cached KB retrievals. Call after re-syncing the Knowledge Base.
+    """
+    return {
+        "status": "success",
+        "invalidated": kb.invalidate_cache(kb_id)
+    }
 
 @router.get("/test-kb")
-def test_kb(query: str):
-    kb = KnowledgeBaseClient()
-    results = kb.search(query)
+async def test_kb(query: str, kb: KnowledgeBaseClient = Depends(get_kb_client)):
+    results = await kb.search(query)
     return {
         "query": query,
         "results": results
     }
 
 @router.post("/refine")
-def refine_learning_path(request: FeedbackRequest):
+async def refine_learning_path(
+    request: FeedbackRequest,
+    bedrock: BedrockClient = Depends(get_bedrock_client),
+    kb: KnowledgeBaseClient = Depends(get_kb_client),
+    sessions: SessionStore = Depends(get_sessions)
+):
     """
     Refine a learning path based on user feedback.
     
+    Send either `session_id` (the path and goal come from the session and
+    the round is recorded there; PUT the accepted path to
+    /sessions/{session_id}/learning_path) or the full `original_path` and
+    `original_goal`.
+    
     Feedback categories:
     - skill_feedback: Dict mapping skill names to ratings:
         - "already_known": User already knows this skill
@@ -53,91 +328,120 @@ def refine_learning_path(request: FeedbackRequest):
     - changes_made: List of changes with explanations
     - feedback_processed: Summary of feedback categories processed
     """
-    feedback_agent = FeedbackAgent()
+    original_path, original_goal = request.original_path, request.original_goal
+    if request.session_id is not None:
+        session = await load_session(sessions, request.session_id)
+        original_path = original_path or (session["plan"] or {}).get("learning_plan")
+        original_goal = original_goal or session["goal"]
+    if not original_path or original_goal is None:
+        raise HTTPException(status_code=400, detail="Provide session_id or both original_path and original_goal")
+    
+    feedback_agent = FeedbackAgent(bedrock, kb, sessions)
     
-    result = feedback_agent.run(
-        original_path=request.original_path,
+    result = await feedback_agent.run(
+        original_path=original_path,
         feedback=request.feedback,
-        original_goal=request.original_goal
+        original_goal=original_goal,
+        session_id=request.session_id
     )
     
+    if request.session_id is not None:
+        await sessions.add_feedback(request.session_id, request.feedback, result)
+    
     return result
 
-@router.post("/learn")
-def learn_skill(skill: str, user_level: str = "Beginner", context: str = ""):
+@router.post("/learn", response_model=LearnResponse, response_model_exclude_unset=True)
+async def learn_skill(
+    request: LearnRequest,
+    bedrock: BedrockClient = Depends(get_bedrock_client),
+    learn_modules: SingleFlight = Depends(get_learn_modules),
+    catalogue: Optional[LearnCatalogue] = Depends(get_catalogue)
+):
     """
     Generate educational content for a specific skill using Amazon Bedrock LLM.
+    Served from the precomputed catalogue when possible; otherwise generated
+    live, with concurrent requests for the same skill, level and context
+    sharing one generation.
     """
-    bedrock = BedrockClient()
-    
-    prompt = f"""
-    You are an expert educator and mentor. Create a comprehensive yet concise learning module for the following skill.
-    
-    **Skill to Learn:** {skill}
-    **Student Level:** {user_level}
-    **Additional Context:** {context if context else "None provided"}
-    
-    Please provide:
-    
-    1. **Introduction** (2-3 sentences explaining what this skill is and why it matters)
-    
-    2. **Key Concepts** (3-5 core concepts the student must understand, with brief explanations)
-    
-    3. **Practical Example** (A real-world code snippet or scenario demonstrating the skill)
-    
-    4. **Common Mistakes** (2-3 mistakes beginners make and how to avoid them)
-    
-    5. **Next Steps** (What to learn after mastering this skill)
-    
-    Format your response in a clear, structured way that's easy to read and follow.
-    Keep the total response under 800 words for optimal readability.
-    """
-    
-    try:
-        response = bedrock.generate_text(prompt)
+    response = await catalogued_module(catalogue, request)
+    if response is not None:
         return {
             "status": "success",
-            "skill": skill,
-            "level": user_level,
+            "skill": request.skill,
+            "level": request.user_level,
             "content": response
         }
-    except Exception as e:
-        return {
-            "status": "error",
-            "message": str(e),
-            "skill": skill
-        }
 
-@router.post("/chat")
-def chat_with_tutor(message: str, skill_context: str = "", conversation_history: str = ""):
+    prompt = build_learn_prompt(request.skill, request.user_level, request.context)
+    key = (normalize_query(request.skill), normalize_query(request.user_level), request.context.strip())
+    
+    # BedrockErrors propagate to the app's handler (429 with Retry-After, 503 or 502)
+    response = await coalesced(learn_modules, key, lambda: bedrock.generate_text(prompt))
+    await store_module(catalogue, request, response)
+    return {
+        "status": "success",
+        "skill": request.skill,
+        "level": request.user_level,
+        "content": response
+    }
+
+@router.post("/chat", response_model=ChatResponse, response_model_exclude_unset=True)
+async def chat_with_tutor(
+    request: ChatRequest,
+    bedrock: BedrockClient = Depends(get_bedrock_client),
+    sessions: SessionStore = Depends(get_sessions)
+):
     """
     Interactive chat with AI tutor about a specific skill or topic.
+    With `session_id` the history is kept server-side and
+    `conversation_history` is ignored.
     """
-    bedrock = BedrockClient()
-    
-    prompt = f"""
-    You are AURA, an AI learning tutor. You help students understand technical concepts clearly and patiently.
-    
-    Current Topic/Skill Context: {skill_context if skill_context else "General programming and technology"}
-    
-    Previous Conversation:
-    {conversation_history if conversation_history else "This is the start of the conversation."}
+    history = await chat_history(bedrock, sessions, request.session_id, request.conversation_history)
+    prompt = build_chat_prompt(request.message, request.skill_context, history)
     
-    Student's Question/Message: {message}
-    
-    Respond helpfully and concisely. If asked to explain something, use simple language and examples.
-    If asked for code, provide working examples with comments.
-    Keep responses focused and under 300 words unless a longer explanation is truly needed.
+    # Chat turns are conversational; never serve them from the response cache.
+    # BedrockErrors propagate to the app's handler
+    response = await bedrock.generate_text(prompt, use_cache=False)
+    await record_turn(sessions, request.session_id, request.message, response)
+    return {
+        "status": "success",
+        "response": response
+    }
+
+@router.post("/learn/stream")
+async def learn_skill_stream(
+    request: LearnRequest,
+    bedrock: BedrockClient = Depends(get_bedrock_client),
+    catalogue: Optional[LearnCatalogue] = Depends(get_catalogue)
+):
     """
-    
-    try:
-        response = bedrock.generate_text(prompt)
-        return {
-            "status": "success",
-            "response": response
-        }
-    except Exception as e:
-        return {
-            "status": "error",
-            "message": str(e)
-        }
+    Streaming variant of /learn.
+    Emits server-sent `delta` events as the module is generated, then `done`.
+    A catalogued module is sent as a single `delta`.
+    """
+    content = await catalogued_module(catalogue, request)
+    if content is not None:
+        return sse_response(stream_text_events(single_chunk(content)))
+
+    prompt = build_learn_prompt(request.skill, request.user_level, request.context)
+    return sse_response(stream_text_events(
+        bedrock.generate_text_stream(prompt),
+        on_complete=lambda text: store_module(catalogue, request, text)
+    ))
+
+@router.post("/chat/stream")
+async def chat_with_tutor_stream(
+    request: ChatRequest,
+    bedrock: BedrockClient = Depends(get_bedrock_client),
+    sessions: SessionStore = Depends(get_sessions)
+):
+    """
+    Streaming variant of /chat.
+    Emits server-sent `delta` events as the reply is generated, then `done`.
+    """
+    history = await chat_history(bedrock, sessions, request.session_id, request.conversation_history)
+    prompt = build_chat_prompt(request.message, request.skill_context, history)
+    return sse_response(stream_text_events(
+        bedrock.generate_text_stream(prompt, use_cache=False),
+        on_complete=lambda reply: record_turn(sessions, request.session_id, request.message, reply)
+    ))
@@ -0,0 +1,59 @@
+import inspect
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Optional, Union
+from fastapi.responses import StreamingResponse
+
+
+def sse_event(event: str, data: Any) -> str:
+    """
+    Formats a single server-sent event with a JSON payload.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_text_events(
+    chunks: AsyncIterable[str],
+    on_complete: Optional[Callable[[str], Union[None, Awaitable[None]]]] = None
+) -> AsyncIterator[str]:
+    """
+    Wraps a text-delta iterator as SSE: one `delta` event per chunk, then
+    `done`, or `error` if the upstream call fails mid-stream.
+    `on_complete(text)` receives the full text once the stream finishes;
+    it may be a coroutine function.
+    The upstream iterator is closed if the client disconnects first.
+    """
+    parts = []
+    try:
+        async for chunk in chunks:
+            parts.append(chunk)
+            yield sse_event("delta", {"text": chunk})
+    except Exception as e:
+        yield sse_event("error", {"message": str(e)})
+        return
+    finally:
+        if hasattr(chunks, "aclose"):
+            await chunks.aclose()
+    if on_complete:
+        result = on_complete("".join(parts))
+        if inspect.isawaitable(result):
+            await result
+    yield sse_event("done", {})
+
+
+async def single_chunk(text: str) -> AsyncIterator[str]:
+    """
+    Yields `text` as one delta, for content served without a model call.
+    """
+    yield text
+
+
+def sse_response(events: AsyncIterable[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop reverse proxies from buffering the stream
+            "X-Accel-Buffering": "no"
+        }
+    )
@@ -1,114 +1,354 @@
-import boto3
 import json
+from typing import Any, AsyncIterator, Dict, List, Optional
 from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import CACHE_LOOKUPS
+from app.core.tracing import annotate, record_usage, span, start_span
+from app.aws.client_registry import ClientRegistry, get_client_registry
+from app.aws.errors import BedrockStructuredOutputError, classify_error
+from app.aws.model_capabilities import (
+    ModelCapabilities,
+    build_invoke_body,
+    get_capabilities,
+    parse_invoke_body,
+    parse_invoke_usage,
+    probe_capabilities,
+    set_capabilities
+)
+from app.aws.rate_limiter import BedrockRateLimiter, estimate_tokens, get_rate_limiter
+from app.aws.response_cache import ResponseCache, get_response_cache, make_cache_key
+
+logger = get_logger(__name__)
+
+# Inference settings shared by every generate_text call; part of the cache key
+INFERENCE_CONFIG = {
+    "maxTokens": 1024,
+    "temperature": 0.2
+}
 
 
 class BedrockClient:
-    def __init__(self):
-        # Prepare session args if credentials are provided explicitly in .env
-        session_kwargs = {
-            "region_name": settings.AWS_REGION
-        }
-        
-        if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
-            session_kwargs["aws_access_key_id"] = settings.AWS_ACCESS_KEY_ID
-            session_kwargs["aws_secret_access_key"] = settings.AWS_SECRET_ACCESS_KEY
-            if settings.AWS_SESSION_TOKEN:
-                session_kwargs["aws_session_token"] = settings.AWS_SESSION_TOKEN
-
-        self.runtime = boto3.client(
-            service_name="bedrock-runtime",
-            **session_kwargs
-        )
+    """
+    Asyncio-native Bedrock client. Underlying aiobotocore clients come from
+    the shared registry, so constructing a BedrockClient is cheap.
+    Model calls go through the shared rate limiter and raise BedrockError
+    subclasses (see app.aws.errors) once retries are exhausted.
+    """
 
-        self.agent_runtime = boto3.client(
-            service_name="bedrock-agent-runtime",
-            **session_kwargs
-        )
+    def __init__(
+        self,
+        registry: Optional[ClientRegistry] = None,
+        cache: Optional[ResponseCache] = None,
+        limiter: Optional[BedrockRateLimiter] = None
+    ):
+        self.registry = registry or get_client_registry()
+        self.cache = cache or get_response_cache()
+        self.limiter = limiter or get_rate_limiter()
+
+    async def _runtime(self):
+        return await self.registry.get("bedrock-runtime")
+
+    async def _agent_runtime(self):
+        return await self.registry.get("bedrock-agent-runtime")
 
-    def generate_text(self, prompt: str) -> str:
+    def _cache_key(
+        self,
+        prompt: str,
+        use_cache: bool,
+        model_id: Optional[str] = None,
+        inference_config: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        if not use_cache or self.cache is None:
+            return None
+        return make_cache_key(model_id or settings.BEDROCK_MODEL_ID, prompt, inference_config or INFERENCE_CONFIG)
+
+    async def generate_text(
+        self,
+        prompt: str,
+        use_cache: bool = True,
+        model_id: Optional[str] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
         """
         Calls Nova Premier (or Claude/Titan) for orchestration / reasoning.
+        Identical prompts are served from the response cache unless `use_cache` is False.
+        `model_id` and `max_tokens` override the configured model and output
+        limit, e.g. to send housekeeping prompts to a cheaper model.
         """
-        # Method 1: Use the Converse API (Preferred for Nova/Claude)
-        try:
-            response = self.runtime.converse(
-                modelId=settings.BEDROCK_MODEL_ID,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [{"text": prompt}]
-                    }
-                ],
-                inferenceConfig={
-                    "maxTokens": 1024,
-                    "temperature": 0.2
-                }
-            )
-            return response["output"]["message"]["content"][0]["text"]
-            
-        except (AttributeError, Exception) as e:
-            # Fallback for older boto3 or if converse fails for other reasons
-            # Proceed to invoke_model with manual payload
-            print(f"Converse API attempt failed ({e}), falling back to invoke_model.")
-            pass
-
-        # Method 2: Manual invoke_model (Payload customized for Nova/Claude)
-        body = {
-            "messages": [
+        model_id = model_id or settings.BEDROCK_MODEL_ID
+        inference_config = INFERENCE_CONFIG if max_tokens is None else {**INFERENCE_CONFIG, "maxTokens": max_tokens}
+        with span("bedrock.generate_text", kind="llm", model_id=model_id):
+            cache_key = self._cache_key(prompt, use_cache, model_id, inference_config)
+            if cache_key:
+                cached = await self.cache.get(cache_key)
+                annotate(cache_hit=cached is not None)
+                CACHE_LOOKUPS.inc(cache="llm", result="hit" if cached is not None else "miss")
+                if cached is not None:
+                    return cached
+
+            response = await self._generate_uncached(prompt, model_id, inference_config)
+
+            if cache_key:
+                await self.cache.set(cache_key, response)
+            return response
+
+    def supports_structured_output(self) -> bool:
+        return get_capabilities(settings.BEDROCK_MODEL_ID).supports_tool_use
+
+    async def generate_structured(
+        self,
+        prompt: str,
+        tool_name: str,
+        description: str,
+        input_schema: Dict[str, Any],
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Returns JSON matching `input_schema` by forcing the model to call a
+        single Converse tool and reading the tool's input.
+        Raises BedrockStructuredOutputError if the model answers without it.
+        """
+        model_id = settings.BEDROCK_MODEL_ID
+        tool_config = {
+            "tools": [
                 {
-                    "role": "user",
-                    "content": [{"text": prompt}]
+                    "toolSpec": {
+                        "name": tool_name,
+                        "description": description,
+                        "inputSchema": {"json": input_schema}
+                    }
                 }
             ],
-            "inferenceConfig": {
-                "temperature": 0.2,
-                "max_new_tokens": 1024  # Nova uses max_new_tokens, not maxTokens
-            }
+            # With one tool, "any" forces that tool on every tool-use model
+            "toolChoice": {"any": {}}
         }
 
-        try:
-            response = self.runtime.invoke_model(
-                modelId=settings.BEDROCK_MODEL_ID,
+        with span("bedrock.generate_structured", kind="llm", model_id=model_id, tool=tool_name):
+            cache_key = None
+            if use_cache and self.cache is not None:
+                cache_key = make_cache_key(model_id, prompt, {**INFERENCE_CONFIG, "toolConfig": tool_config})
+                cached = await self.cache.get(cache_key)
+                annotate(cache_hit=cached is not None)
+                CACHE_LOOKUPS.inc(cache="llm", result="hit" if cached is not None else "miss")
+                if cached is not None:
+                    return json.loads(cached)
+
+            runtime = await self._runtime()
+            response = await self.limiter.call(
+                model_id,
+                self._reserved_tokens(prompt),
+                lambda: runtime.converse(
+                    modelId=model_id,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [{"text": prompt}]
+                        }
+                    ],
+                    inferenceConfig=INFERENCE_CONFIG,
+                    toolConfig=tool_config
+                ),
+                usage=lambda response: response.get("usage", {}).get("totalTokens")
+            )
+            usage = response.get("usage", {})
+            record_usage(model_id, usage.get("inputTokens"), usage.get("outputTokens"))
+
+            for block in response["output"]["message"]["content"]:
+                tool_use = block.get("toolUse")
+                if tool_use and tool_use.get("name") == tool_name and isinstance(tool_use.get("input"), dict):
+                    if cache_key:
+                        await self.cache.set(cache_key, json.dumps(tool_use["input"]))
+                    return tool_use["input"]
+
+            raise BedrockStructuredOutputError(f"Model did not call tool '{tool_name}' (stopReason: {response.get('stopReason')})")
+
+    def _reserved_tokens(self, prompt: str, inference_config: Optional[Dict[str, Any]] = None) -> int:
+        # Bedrock charges input plus maxTokens against the quota up front
+        return estimate_tokens(prompt) + (inference_config or INFERENCE_CONFIG)["maxTokens"]
+
+    async def detect_capabilities(self, probe: bool = False) -> ModelCapabilities:
+        """
+        Resolves (and caches) how to call the configured model. Run once at
+        startup; `probe` confirms the static guess with a one-token call.
+        """
+        model_id = settings.BEDROCK_MODEL_ID
+        if probe:
+            set_capabilities(await probe_capabilities(await self._runtime(), model_id))
+        capabilities = get_capabilities(model_id)
+        logger.info(f"Model '{model_id}' uses {capabilities.api} (payload: {capabilities.payload})")
+        return capabilities
+
+    async def _generate_uncached(
+        self,
+        prompt: str,
+        model_id: Optional[str] = None,
+        inference_config: Optional[Dict[str, Any]] = None
+    ) -> str:
+        runtime = await self._runtime()
+        model_id = model_id or settings.BEDROCK_MODEL_ID
+        inference_config = inference_config or INFERENCE_CONFIG
+        capabilities = get_capabilities(model_id)
+
+        if capabilities.api == "converse":
+            # Converse API (Preferred for Nova/Claude)
+            response = await self.limiter.call(
+                model_id,
+                self._reserved_tokens(prompt, inference_config),
+                lambda: runtime.converse(
+                    modelId=model_id,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [{"text": prompt}]
+                        }
+                    ],
+                    inferenceConfig=inference_config
+                ),
+                usage=lambda response: response.get("usage", {}).get("totalTokens")
+            )
+            usage = response.get("usage", {})
+            record_usage(model_id, usage.get("inputTokens"), usage.get("outputTokens"))
+            return response["output"]["message"]["content"][0]["text"]
+
+        # invoke_model with the model's native payload
+        body = build_invoke_body(
+            capabilities.payload,
+            prompt,
+            max_tokens=inference_config["maxTokens"],
+            temperature=inference_config["temperature"]
+        )
+
+        async def invoke():
+            response = await runtime.invoke_model(
+                modelId=model_id,
                 contentType="application/json",
                 accept="application/json",
                 body=json.dumps(body)
             )
-            
-            response_body = json.loads(response.get("body").read())
-            
-            # Nova / Claude 3 (Messages API)
-            if "output" in response_body:
-                 return response_body["output"]["message"]["content"][0]["text"]
-            
-            # Claude 3 direct
-            if "content" in response_body and isinstance(response_body["content"], list):
-                return response_body["content"][0]["text"]
-                
-             # Titan / Legacy
-            if "results" in response_body:
-                return response_body["results"][0]["outputText"]
-                
-            return str(response_body)
+            return json.loads(await response.get("body").read())
+
+        response_body = await self.limiter.call(model_id, self._reserved_tokens(prompt, inference_config), invoke)
+        record_usage(model_id, *parse_invoke_usage(response_body))
+        return parse_invoke_body(response_body)
+
+    async def generate_text_stream(self, prompt: str, use_cache: bool = True) -> AsyncIterator[str]:
+        """
+        Streams the completion as text deltas via the ConverseStream API.
+        Models without streaming support yield a single chunk from generate_text.
+        A cached completion is replayed as a single chunk.
+        """
+        cache_key = self._cache_key(prompt, use_cache)
+        if cache_key:
+            cached = await self.cache.get(cache_key)
+            CACHE_LOOKUPS.inc(cache="llm", result="hit" if cached is not None else "miss")
+            if cached is not None:
+                yield cached
+                return
+
+        if not get_capabilities(settings.BEDROCK_MODEL_ID).supports_streaming:
+            yield await self.generate_text(prompt, use_cache=use_cache)
+            return
+
+        runtime = await self._runtime()
+        model_id = settings.BEDROCK_MODEL_ID
+        reserved = self._reserved_tokens(prompt)
+        stream_span = start_span("bedrock.generate_text_stream", kind="llm", model_id=model_id, cache_hit=False)
+        chunks = []
+        response = None
+        try:
+            # The limiter covers opening the stream; errors mid-stream are not retried
+            response = await self.limiter.call(
+                model_id,
+                reserved,
+                lambda: runtime.converse_stream(
+                    modelId=model_id,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [{"text": prompt}]
+                        }
+                    ],
+                    inferenceConfig=INFERENCE_CONFIG
+                )
+            )
 
+            async for event in response["stream"]:
+                delta = event.get("contentBlockDelta", {}).get("delta", {}).get("text")
+                if delta:
+                    if not chunks:
+                        stream_span.set(first_token_ms=stream_span.elapsed_ms())
+                    chunks.append(delta)
+                    yield delta
+                usage = event.get("metadata", {}).get("usage")
+                if usage:
+                    self.limiter.quota(model_id).settle(reserved, usage.get("totalTokens"))
+                    record_usage(model_id, usage.get("inputTokens"), usage.get("outputTokens"), target=stream_span)
         except Exception as e:
-            print(f"Error invoking Bedrock: {e}")
-            return "Error generating response. Please check AWS configuration."
+            stream_span.finish("error")
+            raise classify_error(e) from e
+        finally:
+            # Also runs when the consumer stops early (client disconnect or
+            # aclose()); closing the event stream returns its connection to the pool
+            if response is not None:
+                response["stream"].close()
+            stream_span.finish()
+
+        # Only complete streams are cached
+        if cache_key and chunks:
+            await self.cache.set(cache_key, "".join(chunks))
+
+    async def embed_text(self, text: str, model_id: Optional[str] = None) -> List[float]:
+        """
+        Embeds `text` with a Titan Text Embeddings model (KB_EMBEDDING_MODEL_ID
+        by default), the same model the local KB index was built with.
+        """
+        model_id = model_id or settings.KB_EMBEDDING_MODEL_ID
+        body: Dict[str, Any] = {"inputText": text}
+        if "embed-text-v2" in model_id:
+            body.update(dimensions=settings.KB_EMBEDDING_DIMENSIONS, normalize=True)
+
+        with span("bedrock.embed", kind="embed", model_id=model_id):
+            runtime = await self._runtime()
 
-    def retrieve_from_kb(self, query: str, top_k: int = 5):
+            async def invoke():
+                response = await runtime.invoke_model(
+                    modelId=model_id,
+                    contentType="application/json",
+                    accept="application/json",
+                    body=json.dumps(body)
+                )
+                return json.loads(await response.get("body").read())
+
+            response_body = await self.limiter.call(
+                model_id,
+                estimate_tokens(text),
+                invoke,
+                usage=lambda response: response.get("inputTextTokenCount")
+            )
+            record_usage(model_id, response_body.get("inputTextTokenCount"), None)
+            return response_body["embedding"]
+
+    async def retrieve_from_kb(self, query: str, top_k: int = 5):
         """
         Retrieves grounded documents from Bedrock Knowledge Base.
         """
-        response = self.agent_runtime.retrieve(
-            knowledgeBaseId=settings.BEDROCK_KB_ID,
-            retrievalQuery={
-                "text": query
-            },
-            retrievalConfiguration={
-                "vectorSearchConfiguration": {
-                    "numberOfResults": top_k
-                }
-            }
-        )
+        with span("bedrock.retrieve", kind="retrieve", top_k=top_k):
+            agent_runtime = await self._agent_runtime()
+            # Retrieval has its own quotas, so only the retry policy applies
+            response = await self.limiter.retry_policy.run(
+                lambda: agent_runtime.retrieve(
+                    knowledgeBaseId=settings.BEDROCK_KB_ID,
+                    retrievalQuery={
+                        "text": query
+                    },
+                    retrievalConfiguration={
+                        "vectorSearchConfiguration": {
+                            "numberOfResults": top_k
+                        }
+                    }
+                )
+            )
 
-        return response.get("retrievalResults", [])
+            results = response.get("retrievalResults", [])
+            annotate(results=len(results))
+            return results
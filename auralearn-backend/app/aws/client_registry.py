@@ -0,0 +1,123 @@
+import asyncio
+import threading
+from contextlib import AsyncExitStack
+from typing import Dict, Optional
+
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def configured_endpoint_urls() -> Dict[str, str]:
+    """
+    Endpoint overrides from Settings, keyed by service name.
+    """
+    endpoint_urls = {}
+    if settings.BEDROCK_RUNTIME_ENDPOINT_URL:
+        endpoint_urls["bedrock-runtime"] = settings.BEDROCK_RUNTIME_ENDPOINT_URL
+    if settings.BEDROCK_AGENT_RUNTIME_ENDPOINT_URL:
+        endpoint_urls["bedrock-agent-runtime"] = settings.BEDROCK_AGENT_RUNTIME_ENDPOINT_URL
+    return endpoint_urls
+
+
+class ClientRegistry:
+    """
+    Process-wide cache of aiobotocore clients.
+    Every agent and route shares one client (and one aiohttp connection
+    pool) per service instead of re-parsing the botocore service model on
+    each request. Clients are bound to the event loop that created them.
+    """
+
+    def __init__(
+        self,
+        max_pool_connections: Optional[int] = None,
+        endpoint_urls: Optional[Dict[str, str]] = None
+    ):
+        self.max_pool_connections = max_pool_connections or settings.BEDROCK_MAX_POOL_CONNECTIONS
+        self.endpoint_urls = endpoint_urls or configured_endpoint_urls()
+        self._session = get_session()
+        self._clients = {}
+        self._exit_stack = AsyncExitStack()
+        self._lock = asyncio.Lock()
+
+    def _client_kwargs(self, service_name: str) -> Dict[str, object]:
+        client_kwargs = {
+            "region_name": settings.AWS_REGION,
+            "config": AioConfig(
+                max_pool_connections=self.max_pool_connections,
+                connect_timeout=settings.BEDROCK_CONNECT_TIMEOUT_SECONDS,
+                read_timeout=settings.BEDROCK_READ_TIMEOUT_SECONDS,
+                # Retries are owned by the shared BedrockRateLimiter so throttling
+                # feeds its adaptive limit instead of compounding into a retry storm
+                retries={"mode": "standard", "total_max_attempts": 1}
+            )
+        }
+
+        # Use credentials only if provided explicitly in .env
+        if settings.AWS_ACCESS_KEY_ID and settings.AWS_SECRET_ACCESS_KEY:
+            client_kwargs["aws_access_key_id"] = settings.AWS_ACCESS_KEY_ID
+            client_kwargs["aws_secret_access_key"] = settings.AWS_SECRET_ACCESS_KEY
+            if settings.AWS_SESSION_TOKEN:
+                client_kwargs["aws_session_token"] = settings.AWS_SESSION_TOKEN
+
+        if service_name in self.endpoint_urls:
+            client_kwargs["endpoint_url"] = self.endpoint_urls[service_name]
+
+        return client_kwargs
+
+    async def get(self, service_name: str):
+        """
+        Returns the shared client for a service, creating it on first use.
+        """
+        client = self._clients.get(service_name)
+        if client is not None:
+            return client
+
+        async with self._lock:
+            client = self._clients.get(service_name)
+            if client is None:
+                logger.info(f"Creating '{service_name}' client (pool size {self.max_pool_connections})")
+                client = await self._exit_stack.enter_async_context(
+                    self._session.create_client(service_name, **self._client_kwargs(service_name))
+                )
+                self._clients[service_name] = client
+        return client
+
+    async def close(self):
+        """
+        Closes every client and releases its connection pool.
+        """
+        async with self._lock:
+            await self._exit_stack.aclose()
+            self._exit_stack = AsyncExitStack()
+            self._clients.clear()
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> ClientRegistry:
+    """
+    Returns the process-wide registry, creating a default one if the app
+    lifespan has not installed one yet (scripts, REPL use).
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ClientRegistry()
+    return _registry
+
+
+def set_client_registry(registry: Optional[ClientRegistry]):
+    """
+    Installs the registry returned by get_client_registry().
+    """
+    global _registry
+    with _registry_lock:
+        _registry = registry
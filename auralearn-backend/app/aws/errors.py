@@ -0,0 +1,117 @@
+from typing import Optional
+
+from botocore.exceptions import (
+    ClientError,
+    ConnectionError as BotocoreConnectionError,
+    ConnectTimeoutError,
+    ParamValidationError,
+    ReadTimeoutError
+)
+
+
+class BedrockError(Exception):
+    """
+    Base class for failed Bedrock calls.
+    """
+    retryable = False
+
+    def __init__(self, message: str, code: Optional[str] = None):
+        super().__init__(message)
+        self.code = code
+
+
+class BedrockThrottledError(BedrockError):
+    """
+    Request rate or token quota exceeded.
+    """
+    retryable = True
+
+
+class BedrockTimeoutError(BedrockError):
+    """
+    Connect/read timeout or model timeout.
+    """
+    retryable = True
+
+
+class BedrockUnavailableError(BedrockError):
+    """
+    Transient service-side failure (5xx, connection reset, model not ready).
+    """
+    retryable = True
+
+
+class BedrockRequestError(BedrockError):
+    """
+    Non-retryable client error (validation, access denied, unknown model).
+    """
+
+
+class BedrockStructuredOutputError(BedrockError):
+    """
+    The model answered without the requested tool call / JSON structure.
+    """
+
+
+THROTTLING_CODES = {
+    "ThrottlingException",
+    "TooManyRequestsException"
+}
+
+# Hard account quota: waiting doesn't help, so these are not retried
+QUOTA_CODES = {
+    "ServiceQuotaExceededException"
+}
+
+TIMEOUT_CODES = {
+    "ModelTimeoutException",
+    "RequestTimeout",
+    "RequestTimeoutException"
+}
+
+UNAVAILABLE_CODES = {
+    "ServiceUnavailableException",
+    "InternalServerException",
+    "ModelNotReadyException",
+    "ModelErrorException"
+}
+
+
+def classify_error(exc: Exception) -> BedrockError:
+    """
+    Maps botocore/transport exceptions onto the typed Bedrock errors.
+    """
+    if isinstance(exc, BedrockError):
+        return exc
+
+    if isinstance(exc, ClientError):
+        error = exc.response.get("Error", {})
+        code = error.get("Code", "")
+        status = exc.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        message = error.get("Message") or str(exc)
+
+        # Known codes win over the status: ModelNotReadyException comes with a 429
+        if code in QUOTA_CODES:
+            return BedrockRequestError(message, code)
+        if code in THROTTLING_CODES:
+            return BedrockThrottledError(message, code)
+        if code in TIMEOUT_CODES:
+            return BedrockTimeoutError(message, code)
+        if code in UNAVAILABLE_CODES:
+            return BedrockUnavailableError(message, code)
+        if status == 429:
+            return BedrockThrottledError(message, code)
+        if status == 408:
+            return BedrockTimeoutError(message, code)
+        if status >= 500:
+            return BedrockUnavailableError(message, code)
+        return BedrockRequestError(message, code)
+
+    if isinstance(exc, ParamValidationError):
+        return BedrockRequestError(str(exc))
+    if isinstance(exc, (ReadTimeoutError, ConnectTimeoutError)):
+        return BedrockTimeoutError(str(exc))
+    if isinstance(exc, BotocoreConnectionError):
+        return BedrockUnavailableError(str(exc))
+
+    return BedrockError(str(exc))
@@ -1,14 +1,239 @@
+import asyncio
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
 from app.aws.bedrock_client import BedrockClient
+from app.aws.rate_limiter import estimate_tokens
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import CACHE_LOOKUPS
+from app.core.tracing import annotate, span
+from app.services.vector_index import LocalKnowledgeBase, get_local_knowledge_base
+from app.utils.cache import TTLCache
+from app.utils.singleflight import SingleFlight
+
+logger = get_logger(__name__)
+
+# Local index searches over at least this many chunks run in a worker thread;
+# smaller ones finish faster than the hand-off
+LOCAL_SEARCH_THREAD_MIN_CHUNKS = 5000
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a retrieval query for cache lookups: case-folded,
+    whitespace collapsed, surrounding punctuation stripped.
+    """
+    query = re.sub(r"\s+", " ", query.casefold())
+    return query.strip(" \t\n.,;:!?\"'")
+
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how i in into is it of on or that the this to "
+    "want with what you your my me can do".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [term for term in re.findall(r"[a-z0-9]+", text.casefold()) if term not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a small set of chunk texts, built per search to score
+    the retrieved candidates lexically.
+    """
+
+    def __init__(self, texts: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.documents = [Counter(tokenize(text)) for text in texts]
+        self.lengths = [sum(terms.values()) for terms in self.documents]
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        document_frequency = Counter(term for terms in self.documents for term in terms)
+        count = len(self.documents)
+        self.idf = {
+            term: math.log(1 + (count - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequency.items()
+        }
+
+    def scores(self, query: str) -> List[float]:
+        terms = set(tokenize(query))
+        scores = []
+        for document, length in zip(self.documents, self.lengths):
+            score = 0.0
+            for term in terms:
+                frequency = document.get(term, 0)
+                if frequency:
+                    norm = 1 - self.b + self.b * length / (self.average_length or 1.0)
+                    score += self.idf[term] * frequency * (self.k1 + 1) / (frequency + self.k1 * norm)
+            scores.append(score)
+        return scores
+
+
+def _normalized(values: List[float]) -> List[float]:
+    """
+    Min-max scaled to [0, 1]; all ones when the values are equal but non-zero.
+    """
+    if not values:
+        return []
+    low, high = min(values), max(values)
+    if high == low:
+        return [1.0 if high > 0 else 0.0 for _ in values]
+    return [(value - low) / (high - low) for value in values]
+
+
+def _near_duplicate(a: str, b: str, threshold: float) -> bool:
+    a_terms, b_terms = set(tokenize(a)), set(tokenize(b))
+    union = a_terms | b_terms
+    return bool(union) and len(a_terms & b_terms) / len(union) >= threshold
+
+
+def rerank(query: str, documents: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+    """
+    Orders retrieved documents by a hybrid of the vector score and BM25 over
+    their text (weighted by KB_RERANK_VECTOR_WEIGHT), drops near-identical
+    chunks (word Jaccard >= KB_DEDUP_THRESHOLD) and keeps the best `top_k`.
+    Each kept document gets its hybrid score as "relevance".
+    """
+    if not documents:
+        return []
+    weight = settings.KB_RERANK_VECTOR_WEIGHT
+    vector = _normalized([float(doc.get("score") or 0.0) for doc in documents])
+    lexical = _normalized(BM25Index([doc.get("content", "") for doc in documents]).scores(query))
+    ranked = sorted(
+        (dict(doc, relevance=round(weight * v + (1 - weight) * l, 4)) for doc, v, l in zip(documents, vector, lexical)),
+        key=lambda doc: doc["relevance"],
+        reverse=True
+    )
+
+    kept: List[Dict[str, Any]] = []
+    duplicates = 0
+    for doc in ranked:
+        if len(kept) == top_k:
+            break
+        if any(_near_duplicate(doc.get("content", ""), other.get("content", ""), settings.KB_DEDUP_THRESHOLD) for other in kept):
+            duplicates += 1
+            continue
+        kept.append(doc)
+    annotate(rerank_candidates=len(documents), duplicates_dropped=duplicates)
+    return kept
+
+
+def pack_context(documents: List[Dict[str, Any]], token_budget: Optional[int] = None) -> str:
+    """
+    Joins document contents in rank order while they fit in `token_budget`
+    (KB_CONTEXT_TOKEN_BUDGET by default); chunks that would overflow are
+    skipped in favour of smaller ones further down. The best chunk is
+    always included, truncated if it alone is over budget.
+    """
+    budget = token_budget or settings.KB_CONTEXT_TOKEN_BUDGET
+    parts: List[str] = []
+    used = 0
+    for doc in documents:
+        content = doc.get("content", "")
+        if not content:
+            continue
+        cost = estimate_tokens(content)
+        if used + cost > budget:
+            if not parts:
+                parts.append(content[:budget * 4])
+                used = budget
+            continue
+        parts.append(content)
+        used += cost
+    return "\n\n".join(parts)
 
 
 class KnowledgeBaseClient:
-    def __init__(self):
-        self.bedrock = BedrockClient()
+    """
+    Knowledge Base search through the Bedrock Retrieve API, or through the
+    in-process vector index when KB_RETRIEVAL_BACKEND is "local".
+    """
 
-    def search(self, query: str):
-        print(f"[KB Search] Query: {query}")
-        results = self.bedrock.retrieve_from_kb(query)
-        print(f"[KB Search] Retrieved {len(results)} raw results.")
+    def __init__(
+        self,
+        bedrock: Optional[BedrockClient] = None,
+        cache: Optional[TTLCache] = None,
+        local_index: Optional[LocalKnowledgeBase] = None,
+        inflight: Optional[SingleFlight] = None
+    ):
+        self.bedrock = bedrock or BedrockClient()
+        # An empty TTLCache is falsy, so test for None explicitly
+        self.cache = cache if cache is not None else get_retrieval_cache()
+        self.local_index = local_index or get_local_knowledge_base()
+        # Concurrent searches for the same normalised query share one
+        # retrieval, across every client in the process (like the cache)
+        self.inflight = inflight if inflight is not None else get_retrieval_singleflight()
+
+    async def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        with span("kb.search", kind="retrieve", top_k=top_k):
+            return await self._search(query, top_k)
+
+    async def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        semaphore: Optional[asyncio.Semaphore] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Runs a batch of searches concurrently, at most `max_concurrency`
+        (KB_SEARCH_MAX_CONCURRENCY) at a time, and returns the documents
+        keyed by query. Repeated queries are searched once. A query that
+        fails or exceeds `timeout` seconds once started maps to an empty
+        list, so callers can fall back per query. Pass a `semaphore` to
+        share one bound across several concurrent batches.
+        """
+        unique = list(dict.fromkeys(queries))
+        semaphore = semaphore or asyncio.Semaphore(max_concurrency or settings.KB_SEARCH_MAX_CONCURRENCY)
+
+        async def one(query: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(self.search(query, top_k), timeout=timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Timed out after {timeout}s: {query[:100]}")
+                except Exception as e:
+                    logger.warning(f"Search failed ({e}): {query[:100]}")
+                return []
+
+        with span("kb.search_many", kind="retrieve", queries=len(unique), top_k=top_k):
+            results = await asyncio.gather(*(one(query) for query in unique))
+        return dict(zip(unique, results))
+
+    @property
+    def backend(self) -> str:
+        """
+        "remote", or the local index's identity; part of the cache key so
+        switching backends or reloading the index doesn't serve stale results.
+        """
+        return self.local_index.identity if self.local_index is not None else "remote"
+
+    async def _search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        cache_key = (settings.BEDROCK_KB_ID, self.backend, top_k, normalize_query(query))
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            annotate(cache_hit=cached is not None)
+            CACHE_LOOKUPS.inc(cache="kb", result="hit" if cached is not None else "miss")
+            if cached is not None:
+                logger.debug(f"Cache hit: {query[:100]}")
+                # Copies so callers can't mutate the cached documents
+                return [dict(doc) for doc in cached]
+
+        documents = await self.inflight.do(cache_key, lambda: self._fetch(query, top_k, cache_key))
+        # Copies so callers sharing an in-flight search can't affect each other
+        return [dict(doc) for doc in documents]
+
+    async def _fetch(self, query: str, top_k: int, cache_key: Tuple[str, str, int, str]) -> List[Dict[str, Any]]:
+        logger.debug(f"Query: {query}")
+        # Over-fetch so re-ranking and de-duplication have candidates to choose from
+        fetch_k = max(top_k, settings.KB_RERANK_CANDIDATES) if settings.KB_RERANK_ENABLED else top_k
+        results = await self._retrieve(query, fetch_k)
+        logger.debug(f"Retrieved {len(results)} raw results")
 
         documents = []
         for item in results:
@@ -17,5 +242,83 @@ class KnowledgeBaseClient:
                 "score": item.get("score", 0.0),
                 "source": item.get("location", {})
             })
+        if settings.KB_RERANK_ENABLED:
+            documents = rerank(query, documents, top_k)
+
+        if self.cache is not None:
+            self.cache.set(cache_key, [dict(doc) for doc in documents])
 
         return documents
+
+    async def _retrieve(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """
+        Raw retrieval results in the Retrieve API's shape.
+        """
+        if self.local_index is None:
+            return await self.bedrock.retrieve_from_kb(query, top_k=top_k)
+
+        # Only the query embedding leaves the process
+        query_vector = await self.bedrock.embed_text(query)
+        with span("kb.local_search", kind="retrieve", index=self.local_index.index_type, top_k=top_k):
+            if len(self.local_index.chunks) >= LOCAL_SEARCH_THREAD_MIN_CHUNKS:
+                # numpy releases the GIL, so large searches don't stall the event loop
+                results = await asyncio.to_thread(self.local_index.search, query_vector, top_k)
+            else:
+                results = self.local_index.search(query_vector, top_k)
+            annotate(results=len(results))
+            return results
+
+    def invalidate_cache(self, kb_id: Optional[str] = None) -> int:
+        """
+        Drops cached retrievals, e.g. after the Knowledge Base is re-synced.
+        Only entries for `kb_id` are dropped when given. Returns the number removed.
+        """
+        if self.cache is None:
+            return 0
+        if kb_id is None:
+            removed = len(self.cache)
+            self.cache.clear()
+        else:
+            removed = self.cache.discard_matching(lambda key: key[0] == kb_id)
+        logger.info(f"Invalidated {removed} cached retrievals")
+        return removed
+
+
+_retrieval_cache: Optional[TTLCache] = None
+_retrieval_cache_lock = threading.Lock()
+
+
+def get_retrieval_cache() -> Optional[TTLCache]:
+    """
+    Returns the process-wide retrieval cache built from settings,
+    or None when KB_CACHE_ENABLED is off.
+    """
+    global _retrieval_cache
+    if not settings.KB_CACHE_ENABLED:
+        return None
+
+    if _retrieval_cache is None:
+        with _retrieval_cache_lock:
+            if _retrieval_cache is None:
+                _retrieval_cache = TTLCache(
+                    max_entries=settings.KB_CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.KB_CACHE_TTL_SECONDS
+                )
+    return _retrieval_cache
+
+
+_retrieval_singleflight: Optional[SingleFlight] = None
+_retrieval_singleflight_lock = threading.Lock()
+
+
+def get_retrieval_singleflight() -> SingleFlight:
+    """
+    Returns the process-wide in-flight retrieval group, so agents that
+    build their own KnowledgeBaseClient still share identical searches.
+    """
+    global _retrieval_singleflight
+    if _retrieval_singleflight is None:
+        with _retrieval_singleflight_lock:
+            if _retrieval_singleflight is None:
+                _retrieval_singleflight = SingleFlight("kb")
+    return _retrieval_singleflight
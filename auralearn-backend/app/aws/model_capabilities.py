@@ -0,0 +1,219 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Request payload shapes understood by invoke_model
+PAYLOAD_NOVA = "nova"
+PAYLOAD_ANTHROPIC = "anthropic"
+PAYLOAD_TITAN = "titan"
+
+# Cross-region inference profiles prefix the model id with a geography
+INFERENCE_PROFILE_PREFIXES = ("us.", "eu.", "apac.", "us-gov.", "global.")
+
+# Model families that support the Converse / ConverseStream APIs
+CONVERSE_FAMILIES = (
+    "amazon.nova",
+    "amazon.titan-text",
+    "anthropic.claude",
+    "meta.llama",
+    "mistral.",
+    "cohere.command-r",
+    "ai21.jamba",
+    "deepseek.",
+    "writer.palmyra"
+)
+
+# Model families that accept Converse toolConfig (structured output via tool use)
+TOOL_USE_FAMILIES = (
+    "amazon.nova",
+    "anthropic.claude-3",
+    "anthropic.claude-sonnet",
+    "anthropic.claude-opus",
+    "anthropic.claude-haiku",
+    "mistral.mistral-large",
+    "cohere.command-r",
+    "meta.llama3-1",
+    "meta.llama3-3",
+    "meta.llama4",
+    "ai21.jamba"
+)
+
+
+@dataclass(frozen=True)
+class ModelCapabilities:
+    """
+    How to call a model: which API it supports, whether it can return
+    structured output through tool use and, for invoke_model, which request
+    body shape it expects.
+    """
+    model_id: str
+    api: str  # "converse" or "invoke_model"
+    payload: str
+    supports_streaming: bool
+    supports_tool_use: bool = False
+
+
+def base_model_id(model_id: str) -> str:
+    """
+    Strips ARNs and inference-profile prefixes, e.g.
+    "us.amazon.nova-premier-v1:0" -> "amazon.nova-premier-v1:0".
+    """
+    model_id = model_id.split("/")[-1]
+    for prefix in INFERENCE_PROFILE_PREFIXES:
+        if model_id.startswith(prefix):
+            return model_id[len(prefix):]
+    return model_id
+
+
+def detect_capabilities(model_id: str) -> ModelCapabilities:
+    """
+    Static capability lookup by model family.
+    Unknown families go through invoke_model with the Nova messages payload.
+    """
+    base = base_model_id(model_id)
+
+    if base.startswith("anthropic."):
+        payload = PAYLOAD_ANTHROPIC
+    elif base.startswith("amazon.titan"):
+        payload = PAYLOAD_TITAN
+    else:
+        payload = PAYLOAD_NOVA
+
+    if base.startswith(CONVERSE_FAMILIES):
+        return ModelCapabilities(
+            model_id, "converse", payload,
+            supports_streaming=True,
+            supports_tool_use=base.startswith(TOOL_USE_FAMILIES)
+        )
+    return ModelCapabilities(model_id, "invoke_model", payload, supports_streaming=False)
+
+
+async def probe_capabilities(runtime, model_id: str) -> ModelCapabilities:
+    """
+    Confirms the static guess with a one-token Converse call. A validation
+    error means the model doesn't support Converse, so invoke_model is used.
+    """
+    capabilities = detect_capabilities(model_id)
+    try:
+        await runtime.converse(
+            modelId=model_id,
+            messages=[{"role": "user", "content": [{"text": "ping"}]}],
+            inferenceConfig={"maxTokens": 1}
+        )
+        return ModelCapabilities(
+            model_id, "converse", capabilities.payload,
+            supports_streaming=True,
+            supports_tool_use=capabilities.supports_tool_use
+        )
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") == "ValidationException":
+            logger.warning(f"'{model_id}' rejected Converse ({e}), using invoke_model")
+            return ModelCapabilities(model_id, "invoke_model", capabilities.payload, supports_streaming=False)
+        raise
+
+
+def build_invoke_body(payload: str, prompt: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+    """
+    Request body for invoke_model in the model's native shape.
+    """
+    if payload == PAYLOAD_ANTHROPIC:
+        return {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [{"type": "text", "text": prompt}]
+                }
+            ]
+        }
+
+    if payload == PAYLOAD_TITAN:
+        return {
+            "inputText": prompt,
+            "textGenerationConfig": {
+                "maxTokenCount": max_tokens,
+                "temperature": temperature
+            }
+        }
+
+    return {
+        "messages": [
+            {
+                "role": "user",
+                "content": [{"text": prompt}]
+            }
+        ],
+        "inferenceConfig": {
+            "temperature": temperature,
+            "max_new_tokens": max_tokens  # Nova uses max_new_tokens, not maxTokens
+        }
+    }
+
+
+def parse_invoke_body(response_body: Dict[str, Any]) -> str:
+    """
+    Extracts the completion text from an invoke_model response body.
+    """
+    # Nova / Claude 3 (Messages API)
+    if "output" in response_body:
+        return response_body["output"]["message"]["content"][0]["text"]
+
+    # Claude 3 direct
+    if "content" in response_body and isinstance(response_body["content"], list):
+        return response_body["content"][0]["text"]
+
+    # Titan / Legacy
+    if "results" in response_body:
+        return response_body["results"][0]["outputText"]
+
+    return str(response_body)
+
+
+def parse_invoke_usage(response_body: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    (input_tokens, output_tokens) from an invoke_model response body, where reported.
+    """
+    usage = response_body.get("usage")
+    if isinstance(usage, dict):
+        # Nova uses camelCase, Anthropic snake_case
+        return (
+            usage.get("inputTokens", usage.get("input_tokens")),
+            usage.get("outputTokens", usage.get("output_tokens"))
+        )
+
+    if "results" in response_body:
+        return response_body.get("inputTextTokenCount"), response_body["results"][0].get("tokenCount")
+
+    return None, None
+
+
+_capabilities: Dict[str, ModelCapabilities] = {}
+_capabilities_lock = threading.Lock()
+
+
+def get_capabilities(model_id: str) -> ModelCapabilities:
+    """
+    Cached capabilities for a model id; detected once per process.
+    """
+    capabilities = _capabilities.get(model_id)
+    if capabilities is None:
+        with _capabilities_lock:
+            capabilities = _capabilities.setdefault(model_id, detect_capabilities(model_id))
+    return capabilities
+
+
+def set_capabilities(capabilities: ModelCapabilities):
+    """
+    Records capabilities found at startup (e.g. by probe_capabilities).
+    """
+    with _capabilities_lock:
+        _capabilities[capabilities.model_id] = capabilities
+
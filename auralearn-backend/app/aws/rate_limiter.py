@@ -0,0 +1,263 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from app.aws.errors import BedrockThrottledError, classify_error
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.metrics import BEDROCK_CONCURRENCY_LIMIT, BEDROCK_RETRIES
+from app.core.tracing import increment
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (~4 characters per token) used to reserve quota up front.
+    """
+    return max(1, len(text) // 4)
+
+
+class AIMDLimiter:
+    """
+    Adaptive concurrency limit shared by every Bedrock caller.
+    The limit grows by one after a full window of successes (additive
+    increase) and halves on throttling (multiplicative decrease), so
+    throughput settles just under the service's real ceiling.
+    """
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 64):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = max(minimum, min(initial, maximum))
+        BEDROCK_CONCURRENCY_LIMIT.set(self.limit)
+        self.in_flight = 0
+        self._successes = 0
+        self._condition: Optional[asyncio.Condition] = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Created lazily so the limiter binds to the serving event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def acquire(self):
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self):
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+
+    def on_success(self):
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.maximum:
+            self.limit += 1
+            self._successes = 0
+            BEDROCK_CONCURRENCY_LIMIT.set(self.limit)
+
+    def on_throttle(self):
+        self.limit = max(self.minimum, self.limit // 2)
+        self._successes = 0
+        BEDROCK_CONCURRENCY_LIMIT.set(self.limit)
+
+    def stats(self) -> Dict[str, int]:
+        return {"limit": self.limit, "in_flight": self.in_flight}
+
+
+class TokenBucket:
+    """
+    Refills `rate_per_minute` units per minute up to the same capacity.
+    `consume` may drive the balance negative to settle actual usage after
+    the fact; later callers then wait until the debt is paid off.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = rate_per_minute
+        self.rate_per_second = rate_per_minute / 60.0
+        self.tokens = rate_per_minute
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    async def acquire(self, amount: float):
+        # Never ask for more than the bucket can ever hold
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate_per_second
+            await asyncio.sleep(wait)
+
+    def consume(self, amount: float):
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+
+
+class ModelQuota:
+    """
+    Requests-per-minute and tokens-per-minute budget for one model id.
+    A rate of 0 means unlimited.
+    """
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    async def acquire(self, estimated_tokens: int):
+        if self.requests:
+            await self.requests.acquire(1)
+        if self.tokens:
+            await self.tokens.acquire(estimated_tokens)
+
+    def settle(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        if self.tokens and actual_tokens is not None:
+            self.tokens.consume(actual_tokens - estimated_tokens)
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter for retryable Bedrock errors.
+    """
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs `call` until it succeeds, fails with a non-retryable error, or
+        attempts run out. Raises the typed BedrockError.
+        """
+        for attempt in range(self.max_attempts):
+            try:
+                return await call()
+            except Exception as e:
+                error = classify_error(e)
+                if not error.retryable or attempt == self.max_attempts - 1:
+                    raise error from e
+                increment("retries")
+                BEDROCK_RETRIES.inc(error=type(error).__name__)
+                delay = self.delay(attempt)
+                logger.warning(f"{type(error).__name__} ({error}); retry {attempt + 1}/{self.max_attempts - 1} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+
+class BedrockRateLimiter:
+    """
+    Shared admission control for model calls: per-model quotas, then the
+    adaptive concurrency limit, with retries that feed throttling signals
+    back into the limit.
+    """
+
+    def __init__(
+        self,
+        concurrency: AIMDLimiter,
+        retry_policy: RetryPolicy,
+        quotas: Optional[Dict[str, Dict[str, float]]] = None
+    ):
+        self.concurrency = concurrency
+        self.retry_policy = retry_policy
+        self._quota_config = quotas or {}
+        self._quotas: Dict[str, ModelQuota] = {}
+        self.throttled = 0
+
+    def quota(self, model_id: str) -> ModelQuota:
+        quota = self._quotas.get(model_id)
+        if quota is None:
+            config = self._quota_config.get(model_id, {})
+            quota = self._quotas.setdefault(model_id, ModelQuota(
+                requests_per_minute=config.get("requests_per_minute", settings.BEDROCK_DEFAULT_REQUESTS_PER_MINUTE),
+                tokens_per_minute=config.get("tokens_per_minute", settings.BEDROCK_DEFAULT_TOKENS_PER_MINUTE)
+            ))
+        return quota
+
+    def _on_throttle(self):
+        self.throttled += 1
+        increment("throttled")
+        self.concurrency.on_throttle()
+
+    async def call(
+        self,
+        model_id: str,
+        estimated_tokens: int,
+        call: Callable[[], Awaitable[T]],
+        usage: Optional[Callable[[T], Optional[int]]] = None
+    ) -> T:
+        """
+        Runs one model call under the quota, concurrency limit and retry policy.
+        `usage(result)` returns the call's actual token count, if known.
+        """
+        quota = self.quota(model_id)
+
+        async def attempt() -> T:
+            await quota.acquire(estimated_tokens)
+            await self.concurrency.acquire()
+            try:
+                result = await call()
+            except Exception as e:
+                if isinstance(classify_error(e), BedrockThrottledError):
+                    self._on_throttle()
+                raise
+            finally:
+                await self.concurrency.release()
+            self.concurrency.on_success()
+            quota.settle(estimated_tokens, usage(result) if usage else None)
+            return result
+
+        return await self.retry_policy.run(attempt)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency.stats(),
+            "throttled": self.throttled
+        }
+
+
+_rate_limiter: Optional[BedrockRateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> BedrockRateLimiter:
+    """
+    Returns the process-wide limiter shared by every BedrockClient.
+    """
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = BedrockRateLimiter(
+                    concurrency=AIMDLimiter(
+                        initial=settings.BEDROCK_MAX_CONCURRENCY,
+                        minimum=settings.BEDROCK_MIN_CONCURRENCY,
+                        maximum=settings.BEDROCK_MAX_CONCURRENCY
+                    ),
+                    retry_policy=RetryPolicy(
+                        max_attempts=settings.BEDROCK_MAX_ATTEMPTS,
+                        base_delay=settings.BEDROCK_RETRY_BASE_DELAY_SECONDS,
+                        max_delay=settings.BEDROCK_RETRY_MAX_DELAY_SECONDS
+                    ),
+                    quotas=json.loads(settings.BEDROCK_MODEL_QUOTAS or "{}")
+                )
+    return _rate_limiter
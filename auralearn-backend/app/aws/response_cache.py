@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+from app.utils.threads import on_executor, single_thread_executor
+
+
+def make_cache_key(model_id: str, prompt: str, inference_config: Dict[str, Any]) -> str:
+    """
+    Content address for an LLM call: identical model, prompt and inference
+    settings always produce the same completion key.
+    """
+    payload = json.dumps(
+        {"model_id": model_id, "prompt": prompt, "inference_config": inference_config},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteResponseStore:
+    """
+    On-disk tier for the response cache, shared across processes and restarts.
+    Queries run on one dedicated thread, off the event loop. Access times for LRU eviction are kept in memory and written in batches
+    of `access_flush_batch`, or before the next eviction, so hits don't
+    commit.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 10000,
+        ttl_seconds: Optional[float] = None,
+        access_flush_batch: int = 100
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.access_flush_batch = access_flush_batch
+        self._accessed: Dict[str, float] = {}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._executor = single_thread_executor("response-cache")
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @on_executor
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        row = self._conn.execute(
+            "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None or (self.ttl_seconds is not None and now - row[1] > self.ttl_seconds):
+            if row is not None:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+            self.misses += 1
+            return None
+
+        self._accessed[key] = now
+        if len(self._accessed) >= self.access_flush_batch:
+            self._flush_accessed()
+            self._conn.commit()
+        self.hits += 1
+        return row[0]
+
+    def _flush_accessed(self):
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._accessed.items()]
+            )
+            self._accessed.clear()
+
+    @on_executor
+    def set(self, key: str, value: str):
+        now = time.time()
+        self._accessed.pop(key, None)
+        self._flush_accessed()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+            (key, value, now, now)
+        )
+        # Size-based eviction: keep only the most recently used rows
+        self._conn.execute(
+            """
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,)
+        )
+        self._conn.commit()
+
+    @on_executor
+    def clear(self):
+        self._accessed.clear()
+        self._conn.execute("DELETE FROM responses")
+        self._conn.commit()
+
+    @on_executor
+    def stats(self) -> Dict[str, Any]:
+        entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "path": self.path,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+class ResponseCache:
+    """
+    Two-tier cache for LLM completions: an in-memory LRU in front of an
+    optional SQLite store. Disk hits are promoted into memory. The disk tier
+    runs on its own thread so it never blocks the event loop.
+    """
+
+    def __init__(self, memory: TTLCache, disk: Optional[SQLiteResponseStore] = None):
+        self.memory = memory
+        self.disk = disk
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        if self.disk is not None:
+            value = await self.disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+                return value
+
+        return None
+
+    async def set(self, key: str, value: str):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            await self.disk.set(key, value)
+
+    async def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            await self.disk.clear()
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "disk": await self.disk.stats() if self.disk is not None else None
+        }
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Returns the process-wide response cache built from settings,
+    or None when LLM_CACHE_ENABLED is off.
+    """
+    global _response_cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                memory = TTLCache(
+                    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS
+                )
+                disk = None
+                if settings.LLM_CACHE_SQLITE_PATH:
+                    disk = SQLiteResponseStore(
+                        settings.LLM_CACHE_SQLITE_PATH,
+                        max_entries=settings.LLM_CACHE_SQLITE_MAX_ENTRIES,
+                        ttl_seconds=settings.LLM_CACHE_TTL_SECONDS
+                    )
+                _response_cache = ResponseCache(memory, disk)
+    return _response_cache
@@ -3,6 +3,9 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# auralearn-backend/, so default data paths don't depend on the working directory
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 class Settings:
     AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
     BEDROCK_MODEL_ID = os.getenv("BEDROCK_MODEL_ID", "").strip()
@@ -12,4 +15,117 @@ class Settings:
     AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
     AWS_SESSION_TOKEN = os.getenv("AWS_SESSION_TOKEN")
 
+    # Local databases and the local KB index are created here unless their own path is set
+    DATA_DIR = os.getenv("DATA_DIR", "").strip() or os.path.join(BACKEND_DIR, "data")
+
+    # Override the Bedrock endpoints, e.g. to point at benchmarks/fake_bedrock.py (empty = AWS)
+    BEDROCK_RUNTIME_ENDPOINT_URL = os.getenv("BEDROCK_RUNTIME_ENDPOINT_URL", "").strip()
+    BEDROCK_AGENT_RUNTIME_ENDPOINT_URL = os.getenv("BEDROCK_AGENT_RUNTIME_ENDPOINT_URL", "").strip()
+
+    # Size of the HTTP connection pool held by each shared Bedrock client
+    BEDROCK_MAX_POOL_CONNECTIONS = int(os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "50"))
+
+    # Retry policy and timeouts for Bedrock calls (exponential backoff with full jitter)
+    BEDROCK_MAX_ATTEMPTS = int(os.getenv("BEDROCK_MAX_ATTEMPTS", "4"))
+    BEDROCK_RETRY_BASE_DELAY_SECONDS = float(os.getenv("BEDROCK_RETRY_BASE_DELAY_SECONDS", "0.5"))
+    BEDROCK_RETRY_MAX_DELAY_SECONDS = float(os.getenv("BEDROCK_RETRY_MAX_DELAY_SECONDS", "20"))
+    BEDROCK_CONNECT_TIMEOUT_SECONDS = float(os.getenv("BEDROCK_CONNECT_TIMEOUT_SECONDS", "5"))
+    BEDROCK_READ_TIMEOUT_SECONDS = float(os.getenv("BEDROCK_READ_TIMEOUT_SECONDS", "120"))
+    # Confirm the model's API with a one-token call at startup
+    BEDROCK_PROBE_CAPABILITIES = os.getenv("BEDROCK_PROBE_CAPABILITIES", "false").lower() == "true"
+
+    # Adaptive (AIMD) limit on concurrent model calls across all agents
+    BEDROCK_MAX_CONCURRENCY = int(os.getenv("BEDROCK_MAX_CONCURRENCY", "16"))
+    BEDROCK_MIN_CONCURRENCY = int(os.getenv("BEDROCK_MIN_CONCURRENCY", "1"))
+    # Per-model quotas as JSON, e.g. {"amazon.nova-premier-v1:0": {"requests_per_minute": 50, "tokens_per_minute": 200000}};
+    # models not listed use the defaults below (0 = unlimited)
+    BEDROCK_MODEL_QUOTAS = os.getenv("BEDROCK_MODEL_QUOTAS", "").strip()
+    BEDROCK_DEFAULT_REQUESTS_PER_MINUTE = float(os.getenv("BEDROCK_DEFAULT_REQUESTS_PER_MINUTE", "0"))
+    BEDROCK_DEFAULT_TOKENS_PER_MINUTE = float(os.getenv("BEDROCK_DEFAULT_TOKENS_PER_MINUTE", "0"))
+
+    # Cross-domain fan-out: concurrent model calls (batched or per domain) and the deadline for each
+    # domain's retrieval and for each generation call (timed-out domains get a conservative line)
+    CROSS_DOMAIN_MAX_CONCURRENCY = int(os.getenv("CROSS_DOMAIN_MAX_CONCURRENCY", "3"))
+    CROSS_DOMAIN_TIMEOUT_SECONDS = float(os.getenv("CROSS_DOMAIN_TIMEOUT_SECONDS", "10"))
+    # Generate every domain's application in one call (per-domain calls fill any gaps)
+    CROSS_DOMAIN_BATCHED = os.getenv("CROSS_DOMAIN_BATCHED", "true").lower() == "true"
+    # Domains per batched call; larger domain sets are split into concurrent batches
+    CROSS_DOMAIN_BATCH_SIZE = int(os.getenv("CROSS_DOMAIN_BATCH_SIZE", "4"))
+    # JSON list of domain definitions (empty uses health, finance and agriculture)
+    CROSS_DOMAIN_REGISTRY_PATH = os.getenv("CROSS_DOMAIN_REGISTRY_PATH", "").strip()
+
+    # LLM response cache: in-memory LRU plus an optional SQLite tier (empty path disables it)
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+    LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+    LLM_CACHE_SQLITE_PATH = os.getenv("LLM_CACHE_SQLITE_PATH", "").strip()
+    LLM_CACHE_SQLITE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_SQLITE_MAX_ENTRIES", "10000"))
+
+    # Knowledge Base retrieval cache keyed on normalised query text
+    KB_CACHE_ENABLED = os.getenv("KB_CACHE_ENABLED", "true").lower() == "true"
+    KB_CACHE_MAX_ENTRIES = int(os.getenv("KB_CACHE_MAX_ENTRIES", "1024"))
+    KB_CACHE_TTL_SECONDS = float(os.getenv("KB_CACHE_TTL_SECONDS", "900"))
+    # Searches in flight at once for one search_many batch
+    KB_SEARCH_MAX_CONCURRENCY = int(os.getenv("KB_SEARCH_MAX_CONCURRENCY", "4"))
+
+    # Re-ranking of retrieved chunks: KB_RERANK_CANDIDATES are fetched, scored
+    # by vector score blended with BM25 (KB_RERANK_VECTOR_WEIGHT on the vector
+    # side), near-duplicates dropped, and agent prompts get the best chunks
+    # that fit in KB_CONTEXT_TOKEN_BUDGET
+    KB_RERANK_ENABLED = os.getenv("KB_RERANK_ENABLED", "true").lower() == "true"
+    KB_RERANK_CANDIDATES = int(os.getenv("KB_RERANK_CANDIDATES", "10"))
+    KB_RERANK_VECTOR_WEIGHT = float(os.getenv("KB_RERANK_VECTOR_WEIGHT", "0.6"))
+    KB_DEDUP_THRESHOLD = float(os.getenv("KB_DEDUP_THRESHOLD", "0.85"))
+    KB_CONTEXT_TOKEN_BUDGET = int(os.getenv("KB_CONTEXT_TOKEN_BUDGET", "900"))
+
+    # Knowledge Base retrieval backend: "remote" (Bedrock Retrieve API) or
+    # "local" (in-process vector index built by `python -m app.services.kb_ingest`)
+    KB_RETRIEVAL_BACKEND = os.getenv("KB_RETRIEVAL_BACKEND", "remote").strip().lower()
+    KB_LOCAL_INDEX_PATH = os.getenv("KB_LOCAL_INDEX_PATH", "").strip() or os.path.join(DATA_DIR, "kb_index")
+    # "brute" (exact) or "ivf" (inverted-file, probes KB_LOCAL_IVF_PROBES clusters)
+    KB_LOCAL_INDEX_TYPE = os.getenv("KB_LOCAL_INDEX_TYPE", "brute").strip().lower()
+    KB_LOCAL_IVF_PROBES = int(os.getenv("KB_LOCAL_IVF_PROBES", "8"))
+    # Embedding model for the local index and its queries
+    KB_EMBEDDING_MODEL_ID = os.getenv("KB_EMBEDDING_MODEL_ID", "amazon.titan-embed-text-v2:0").strip()
+    KB_EMBEDDING_DIMENSIONS = int(os.getenv("KB_EMBEDDING_DIMENSIONS", "1024"))
+
+    # Education Agent: relevance check, skill extraction and staging in one
+    # tool-use call (falls back to two calls if the model can't do it)
+    EDUCATION_STRUCTURED_OUTPUT = os.getenv("EDUCATION_STRUCTURED_OUTPUT", "true").lower() == "true"
+
+    # Server-side sessions (plans, feedback rounds, chat history): "sqlite" or "memory"
+    SESSION_STORE_BACKEND = os.getenv("SESSION_STORE_BACKEND", "sqlite").strip().lower()
+    SESSION_STORE_PATH = os.getenv("SESSION_STORE_PATH", "").strip() or os.path.join(DATA_DIR, "sessions.db")
+    # Idle sessions are purged after this long (0 keeps them forever)
+    SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "604800"))
+
+    # Tutor chat history budget; older turns are summarised by a cheaper model
+    # (CHAT_SUMMARY_MODEL_ID defaults to Nova Micro; set it empty to use BEDROCK_MODEL_ID)
+    CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1500"))
+    CHAT_SUMMARY_MODEL_ID = os.getenv("CHAT_SUMMARY_MODEL_ID", "amazon.nova-micro-v1:0").strip()
+    CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "256"))
+
+    # Precomputed /learn modules for the most-requested (skill, level) pairs,
+    # refreshed in the background (interval 0 leaves warm-up to the CLI)
+    LEARN_CATALOGUE_ENABLED = os.getenv("LEARN_CATALOGUE_ENABLED", "true").lower() == "true"
+    LEARN_CATALOGUE_PATH = os.getenv("LEARN_CATALOGUE_PATH", "").strip() or os.path.join(DATA_DIR, "learn_catalogue.db")
+    LEARN_CATALOGUE_WARMUP_TOP_N = int(os.getenv("LEARN_CATALOGUE_WARMUP_TOP_N", "50"))
+    LEARN_CATALOGUE_WARMUP_INTERVAL_SECONDS = float(os.getenv("LEARN_CATALOGUE_WARMUP_INTERVAL_SECONDS", "900"))
+    # Demand counts idle this long are dropped (0 = never), and only the
+    # most-requested LEARN_CATALOGUE_DEMAND_MAX_ROWS pairs are kept
+    LEARN_CATALOGUE_DEMAND_MAX_AGE_DAYS = float(os.getenv("LEARN_CATALOGUE_DEMAND_MAX_AGE_DAYS", "30"))
+    LEARN_CATALOGUE_DEMAND_MAX_ROWS = int(os.getenv("LEARN_CATALOGUE_DEMAND_MAX_ROWS", "10000"))
+
+    # Concurrent identical /orchestrate and /learn requests share one run
+    REQUEST_COALESCING_ENABLED = os.getenv("REQUEST_COALESCING_ENABLED", "true").lower() == "true"
+
+    # Plan steps the orchestrator may run concurrently
+    ORCHESTRATOR_MAX_CONCURRENCY = int(os.getenv("ORCHESTRATOR_MAX_CONCURRENCY", "4"))
+
+    # Responses at least this many bytes are gzip-compressed when the client accepts it
+    GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1000"))
+
+    # Level for the `auralearn` application loggers
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").strip()
+
 settings = Settings()
@@ -0,0 +1,38 @@
+import logging
+
+from app.core.config import settings
+from app.core.tracing import current_span
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] [trace=%(trace_id)s] %(message)s"
+
+
+class TraceIdFilter(logging.Filter):
+    """
+    Stamps each record with the active trace id so log lines from one
+    request can be correlated with its decision_trace timing tree.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        active = current_span()
+        record.trace_id = active.trace_id if active else "-"
+        return True
+
+
+def configure_logging(level: str = None):
+    """
+    Installs the application log format on the `auralearn` logger.
+    Safe to call more than once.
+    """
+    logger = logging.getLogger("auralearn")
+    logger.setLevel((level or settings.LOG_LEVEL).upper())
+    if not any(getattr(handler, "_auralearn", False) for handler in logger.handlers):
+        handler = logging.StreamHandler()
+        handler._auralearn = True
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handler.addFilter(TraceIdFilter())
+        logger.addHandler(handler)
+        logger.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"auralearn.{name}")
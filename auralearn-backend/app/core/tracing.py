@@ -0,0 +1,159 @@
+import asyncio
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.core.metrics import BEDROCK_TOKENS, SPAN_DURATION
+
+
+class Span:
+    """
+    One timed operation in a request's trace.
+    Spans opened while another is active become its children, so a request
+    yields a timing tree: request -> plan steps -> Bedrock/KB calls.
+    """
+
+    def __init__(self, name: str, kind: str = "internal", parent: Optional["Span"] = None, **attributes: Any):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.attributes: Dict[str, Any] = dict(attributes)
+        self.children: List["Span"] = []
+        self.status = "ok"
+        self.started_at = time.time()
+        self.duration_ms: Optional[float] = None
+        self._start = time.perf_counter()
+        if parent is not None:
+            parent.children.append(self)
+
+    def set(self, **attributes: Any):
+        self.attributes.update(attributes)
+
+    def increment(self, key: str, amount: int = 1):
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self._start) * 1000, 1)
+
+    def finish(self, status: Optional[str] = None):
+        if self.duration_ms is not None:
+            return
+        if status:
+            self.status = status
+        elapsed = time.perf_counter() - self._start
+        self.duration_ms = round(elapsed * 1000, 1)
+        SPAN_DURATION.observe(elapsed, kind=self.kind, name=self.name, status=self.status)
+
+    def walk(self) -> Iterator["Span"]:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def totals(self) -> Dict[str, int]:
+        """
+        Bedrock calls, cache hits, retries and tokens summed over this subtree.
+        """
+        totals = {"model_calls": 0, "retrieval_calls": 0, "cache_hits": 0, "retries": 0, "input_tokens": 0, "output_tokens": 0}
+        for node in self.walk():
+            if node.attributes.get("cache_hit"):
+                totals["cache_hits"] += 1
+            elif node.kind == "llm":
+                totals["model_calls"] += 1
+            elif node.name == "bedrock.retrieve":
+                totals["retrieval_calls"] += 1
+            for key in ("retries", "input_tokens", "output_tokens"):
+                totals[key] += node.attributes.get(key) or 0
+        return totals
+
+    def to_dict(self, origin: Optional[float] = None) -> Dict[str, Any]:
+        """
+        The span and its children as nested dicts, with start offsets in ms
+        relative to this (or the given) origin.
+        """
+        origin = self.started_at if origin is None else origin
+        node = {
+            "name": self.name,
+            "kind": self.kind,
+            "status": self.status,
+            "start_ms": round((self.started_at - origin) * 1000, 1),
+            "duration_ms": self.duration_ms
+        }
+        node.update(self.attributes)
+        if self.children:
+            node["children"] = [child.to_dict(origin) for child in self.children]
+        return node
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Span]:
+    """
+    Times the enclosed block as a child of the active span and makes it the
+    active span. Context variables are copied into new asyncio tasks, so
+    concurrent steps each attach to the span that launched them.
+    """
+    active = Span(name, kind, current_span(), **attributes)
+    token = _current_span.set(active)
+    try:
+        yield active
+    except asyncio.CancelledError:
+        active.finish("cancelled")
+        raise
+    except Exception as e:
+        active.set(error=type(e).__name__)
+        active.finish("error")
+        raise
+    finally:
+        _current_span.reset(token)
+        active.finish()
+
+
+def start_span(name: str, kind: str = "internal", **attributes: Any) -> Span:
+    """
+    Child of the active span that is NOT made active; the caller must call
+    finish(). For async generators, which can't safely reset context
+    variables across yields.
+    """
+    return Span(name, kind, current_span(), **attributes)
+
+
+def annotate(**attributes: Any):
+    """
+    Sets attributes on the active span, if any.
+    """
+    active = current_span()
+    if active is not None:
+        active.set(**attributes)
+
+
+def increment(key: str, amount: int = 1):
+    """
+    Increments a counter attribute on the active span, if any.
+    """
+    active = current_span()
+    if active is not None:
+        active.increment(key, amount)
+
+
+def record_usage(model_id: str, input_tokens: Optional[int], output_tokens: Optional[int], target: Optional[Span] = None):
+    """
+    Records token usage on a span (the active one by default) and in the
+    token counters.
+    """
+    target = target or current_span()
+    if input_tokens is not None:
+        BEDROCK_TOKENS.inc(input_tokens, model_id=model_id, direction="input")
+        if target is not None:
+            target.set(input_tokens=input_tokens)
+    if output_tokens is not None:
+        BEDROCK_TOKENS.inc(output_tokens, model_id=model_id, direction="output")
+        if target is not None:
+            target.set(output_tokens=output_tokens)
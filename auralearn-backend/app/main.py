@@ -4,17 +4,101 @@ import os
 # Add the parent directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+from app.api.middleware import RequestTracingMiddleware
 from app.api.routes import router
+from app.aws.bedrock_client import BedrockClient
+from app.aws.client_registry import ClientRegistry, set_client_registry
+from app.aws.errors import BedrockError, BedrockThrottledError
+from app.aws.kb_client import KnowledgeBaseClient
+from app.core.config import settings
+from app.core.logging import configure_logging
+from app.memory.state import SessionNotFoundError, get_session_store
+from app.services.learn_catalogue import get_learn_catalogue, warm_up_forever
+from app.utils.singleflight import SingleFlight
 import uvicorn
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the AWS clients once per process and share them across requests
+    registry = ClientRegistry()
+    set_client_registry(registry)
+    app.state.bedrock = BedrockClient(registry)
+    app.state.kb = KnowledgeBaseClient(app.state.bedrock)
+    app.state.sessions = get_session_store()
+    # In-flight /orchestrate and /learn runs that identical requests can join
+    app.state.orchestrations = SingleFlight("orchestrate")
+    app.state.learn_modules = SingleFlight("learn")
+    app.state.learn_catalogue = get_learn_catalogue()
+
+    # Decide once which API the configured model speaks
+    await app.state.bedrock.detect_capabilities(probe=settings.BEDROCK_PROBE_CAPABILITIES)
+
+    warmup = None
+    if app.state.learn_catalogue is not None and settings.LEARN_CATALOGUE_WARMUP_INTERVAL_SECONDS > 0:
+        warmup = asyncio.create_task(warm_up_forever(
+            app.state.bedrock, app.state.learn_catalogue, settings.LEARN_CATALOGUE_WARMUP_INTERVAL_SECONDS
+        ))
+
+    yield
+
+    if warmup is not None:
+        warmup.cancel()
+        with suppress(asyncio.CancelledError):
+            await warmup
+    await registry.close()
+    set_client_registry(None)
+
+
+configure_logging()
+
 app = FastAPI(
     title="AURA-Learn Backend",
     description="Agentic AI backend using Amazon Bedrock",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 app.include_router(router)
+# Compress large JSON bodies; event streams are passed through uncompressed
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MIN_SIZE)
+app.add_middleware(RequestTracingMiddleware)
+
+
+@app.exception_handler(BedrockError)
+async def bedrock_error_handler(request: Request, exc: BedrockError):
+    # Bedrock failures that outlived the retry policy: 429 when throttled,
+    # 503 for other transient errors, 502 for rejected requests
+    if isinstance(exc, BedrockThrottledError):
+        status_code = 429
+    elif exc.retryable:
+        status_code = 503
+    else:
+        status_code = 502
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "status": "error",
+            "error_type": type(exc).__name__,
+            "message": str(exc)
+        },
+        headers={"Retry-After": "5"} if exc.retryable else None
+    )
+
+
+@app.exception_handler(SessionNotFoundError)
+async def session_not_found_handler(request: Request, exc: SessionNotFoundError):
+    # The session expired between the route loading it and a later write;
+    # same answer as load_session gives for a missing session
+    return JSONResponse(
+        status_code=404,
+        content={"detail": f"Unknown or expired session '{exc.args[0]}'"}
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,129 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.aws.bedrock_client import BedrockClient
+from app.aws.rate_limiter import estimate_tokens
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.tracing import annotate
+from app.memory.state import SessionStore, format_history
+
+logger = get_logger(__name__)
+
+SUMMARY_CONTEXT_KEY = "chat_summary"
+
+
+def build_summary_prompt(summary: str, transcript: str) -> str:
+    return f"""
+    Summarise the conversation between a student and their tutor so the tutor can continue it.
+    Keep the topics covered, what the student understood or struggled with, and any open questions.
+    Write at most 120 words of plain prose.
+
+    Summary so far:
+    {summary if summary else "None."}
+
+    Newer conversation to fold in:
+    {transcript}
+
+    Return only the updated summary.
+    """
+
+
+class ConversationMemory:
+    """
+    Chat history for the tutor prompt, kept within CHAT_HISTORY_TOKEN_BUDGET.
+    Recent turns are included verbatim; older turns are folded into a
+    running summary written by a cheap model and cached in the session
+    store, so it is only extended when turns fall out of the window.
+    """
+
+    def __init__(
+        self,
+        bedrock: BedrockClient,
+        store: SessionStore,
+        token_budget: Optional[int] = None,
+        summary_model_id: Optional[str] = None
+    ):
+        self.bedrock = bedrock
+        self.store = store
+        self.token_budget = token_budget or settings.CHAT_HISTORY_TOKEN_BUDGET
+        self.summary_model_id = summary_model_id or settings.CHAT_SUMMARY_MODEL_ID or settings.BEDROCK_MODEL_ID
+
+    def _newest_within(self, turns: List[Dict[str, Any]], budget: int) -> int:
+        """
+        How many of the newest turns fit in `budget` tokens.
+        """
+        used, count = 0, 0
+        for turn in reversed(turns):
+            used += estimate_tokens(format_history([turn]))
+            if used > budget:
+                break
+            count += 1
+        return count
+
+    async def _load_summary(self, session_id: str) -> Tuple[str, int]:
+        cached = await self.store.get_context(session_id, SUMMARY_CONTEXT_KEY)
+        if not cached:
+            return "", 0
+        state = json.loads(cached)
+        return state.get("summary", ""), state.get("covered", 0)
+
+    async def _summarise(self, summary: str, turns: List[Dict[str, Any]]) -> str:
+        prompt = build_summary_prompt(summary, format_history(turns))
+        return (await self.bedrock.generate_text(
+            prompt,
+            model_id=self.summary_model_id,
+            max_tokens=settings.CHAT_SUMMARY_MAX_TOKENS
+        )).strip()
+
+    def _render(self, summary: str, turns: List[Dict[str, Any]]) -> str:
+        history = format_history(turns)
+        if summary:
+            return f"Summary of earlier conversation: {summary}\n\n{history}".strip()
+        return history
+
+    async def history(self, session_id: str) -> str:
+        """
+        The session's conversation history for the next prompt. Turns
+        already folded into the summary are not loaded.
+        """
+        summary, covered = await self._load_summary(session_id)
+        recent = await self.store.history(session_id, offset=covered)
+
+        if estimate_tokens(self._render(summary, recent)) <= self.token_budget:
+            annotate(history_turns=len(recent), history_summarised=covered)
+            return self._render(summary, recent)
+
+        # Fold older turns until the recent window uses half the budget, so
+        # the summary is extended every few turns rather than on every turn
+        keep = self._newest_within(recent, self.token_budget // 2)
+        folded, recent = recent[:len(recent) - keep], recent[len(recent) - keep:]
+        try:
+            summary = await self._summarise(summary, folded)
+            covered += len(folded)
+            await self.store.set_context(session_id, SUMMARY_CONTEXT_KEY, json.dumps({"summary": summary, "covered": covered}))
+            logger.info(f"Folded {len(folded)} turns into the summary for session {session_id}")
+        except Exception as e:
+            # Without a fresh summary, drop the oldest turns rather than overflow the prompt
+            logger.warning(f"Summarisation failed ({e}), dropping {len(folded)} older turns")
+
+        annotate(history_turns=len(recent), history_summarised=covered)
+        return self._render(summary, recent)
+
+    def trim(self, conversation_history: str) -> str:
+        """
+        Budgets client-supplied free-text history by keeping its newest
+        lines. No summary: stateless history has nowhere to cache one.
+        """
+        if estimate_tokens(conversation_history) <= self.token_budget:
+            return conversation_history
+        lines = conversation_history.splitlines()
+        kept: List[str] = []
+        used = 0
+        for line in reversed(lines):
+            used += estimate_tokens(line) + 1
+            if used > self.token_budget:
+                break
+            kept.append(line)
+        annotate(history_truncated=len(lines) - len(kept))
+        return "\n".join(["(Earlier conversation omitted.)"] + list(reversed(kept)))
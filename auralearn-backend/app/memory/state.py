@@ -0,0 +1,368 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.utils.threads import on_executor, single_thread_executor
+
+
+class SessionNotFoundError(KeyError):
+    """
+    A write to a session that doesn't exist or has expired, e.g. one that
+    expired after the route loaded it. The app maps it to 404.
+    """
+
+
+class SessionStore(ABC):
+    """
+    Server-side state for one learner session: the generated plan and goal,
+    feedback rounds, chat turns and KB context fetched during refinement.
+    Clients keep only the session id and send deltas. Methods are
+    coroutines so backends can do I/O without blocking the event loop.
+    """
+
+    @abstractmethod
+    async def create_session(self, goal: str = "") -> str:
+        ...
+
+    @abstractmethod
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        {"session_id", "goal", "plan", "created_at", "updated_at"}, or None
+        if the session is unknown or expired.
+        """
+
+    @abstractmethod
+    async def save_plan(self, session_id: str, goal: str, plan: Dict[str, Any]):
+        ...
+
+    @abstractmethod
+    async def add_feedback(self, session_id: str, feedback: Dict[str, Any], result: Dict[str, Any]):
+        ...
+
+    @abstractmethod
+    async def feedback_rounds(self, session_id: str) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def append_turn(self, session_id: str, role: str, content: str):
+        ...
+
+    @abstractmethod
+    async def history(self, session_id: str, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Chat turns oldest first, skipping the first `offset`; `limit` keeps
+        only the most recent ones.
+        """
+
+    @abstractmethod
+    async def get_context(self, session_id: str, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def set_context(self, session_id: str, key: str, value: str):
+        ...
+
+    @abstractmethod
+    async def delete_session(self, session_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def stats(self) -> Dict[str, Any]:
+        ...
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Process-local store; sessions are lost on restart. For development and
+    single-worker deployments.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds
+        self._sessions: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, session_id: str) -> Optional[Dict[str, Any]]:
+        session = self._sessions.get(session_id)
+        if session is not None and self.ttl_seconds is not None and time.time() - session["updated_at"] > self.ttl_seconds:
+            del self._sessions[session_id]
+            return None
+        return session
+
+    def _require(self, session_id: str) -> Dict[str, Any]:
+        session = self._live(session_id)
+        if session is None:
+            raise SessionNotFoundError(session_id)
+        session["updated_at"] = time.time()
+        return session
+
+    async def create_session(self, goal: str = "") -> str:
+        session_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._sessions[session_id] = {
+                "goal": goal, "plan": None, "created_at": now, "updated_at": now,
+                "feedback": [], "turns": [], "context": {}
+            }
+        return session_id
+
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            session = self._live(session_id)
+            if session is None:
+                return None
+            return {
+                "session_id": session_id,
+                "goal": session["goal"],
+                "plan": session["plan"],
+                "created_at": session["created_at"],
+                "updated_at": session["updated_at"]
+            }
+
+    async def save_plan(self, session_id: str, goal: str, plan: Dict[str, Any]):
+        with self._lock:
+            session = self._require(session_id)
+            session["goal"] = goal
+            session["plan"] = plan
+
+    async def add_feedback(self, session_id: str, feedback: Dict[str, Any], result: Dict[str, Any]):
+        with self._lock:
+            self._require(session_id)["feedback"].append(
+                {"feedback": feedback, "result": result, "created_at": time.time()}
+            )
+
+    async def feedback_rounds(self, session_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            session = self._live(session_id)
+            return list(session["feedback"]) if session else []
+
+    async def append_turn(self, session_id: str, role: str, content: str):
+        with self._lock:
+            self._require(session_id)["turns"].append(
+                {"role": role, "content": content, "created_at": time.time()}
+            )
+
+    async def history(self, session_id: str, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            session = self._live(session_id)
+            turns = list(session["turns"][offset:]) if session else []
+        return turns[-limit:] if limit else turns
+
+    async def get_context(self, session_id: str, key: str) -> Optional[str]:
+        with self._lock:
+            session = self._live(session_id)
+            return session["context"].get(key) if session else None
+
+    async def set_context(self, session_id: str, key: str, value: str):
+        with self._lock:
+            self._require(session_id)["context"][key] = value
+
+    async def delete_session(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    async def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": "memory", "sessions": len(self._sessions)}
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite-backed store shared across workers and restarts. Sessions idle
+    for longer than `ttl_seconds` are purged lazily. Queries run on one
+    dedicated thread, so they never block the event loop and the
+    connection is never used concurrently.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._executor = single_thread_executor("session-store")
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                goal TEXT NOT NULL,
+                plan TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS feedback_rounds (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL REFERENCES sessions(session_id) ON DELETE CASCADE,
+                feedback TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS chat_turns (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL REFERENCES sessions(session_id) ON DELETE CASCADE,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS session_context (
+                session_id TEXT NOT NULL REFERENCES sessions(session_id) ON DELETE CASCADE,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (session_id, key)
+            );
+            CREATE INDEX IF NOT EXISTS idx_feedback_session ON feedback_rounds(session_id);
+            CREATE INDEX IF NOT EXISTS idx_turns_session ON chat_turns(session_id);
+            """
+        )
+        self._conn.commit()
+
+    def _purge_expired(self):
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.ttl_seconds,))
+
+    def _touch(self, session_id: str):
+        cursor = self._conn.execute(
+            "UPDATE sessions SET updated_at = ? WHERE session_id = ?", (time.time(), session_id)
+        )
+        if cursor.rowcount == 0:
+            raise SessionNotFoundError(session_id)
+
+    @on_executor
+    def create_session(self, goal: str = "") -> str:
+        session_id = uuid.uuid4().hex
+        now = time.time()
+        self._purge_expired()
+        self._conn.execute(
+            "INSERT INTO sessions (session_id, goal, plan, created_at, updated_at) VALUES (?, ?, NULL, ?, ?)",
+            (session_id, goal, now, now)
+        )
+        self._conn.commit()
+        return session_id
+
+    @on_executor
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        self._purge_expired()
+        self._conn.commit()
+        row = self._conn.execute(
+            "SELECT goal, plan, created_at, updated_at FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            "session_id": session_id,
+            "goal": row[0],
+            "plan": json.loads(row[1]) if row[1] else None,
+            "created_at": row[2],
+            "updated_at": row[3]
+        }
+
+    @on_executor
+    def save_plan(self, session_id: str, goal: str, plan: Dict[str, Any]):
+        self._touch(session_id)
+        self._conn.execute(
+            "UPDATE sessions SET goal = ?, plan = ? WHERE session_id = ?",
+            (goal, json.dumps(plan), session_id)
+        )
+        self._conn.commit()
+
+    @on_executor
+    def add_feedback(self, session_id: str, feedback: Dict[str, Any], result: Dict[str, Any]):
+        self._touch(session_id)
+        self._conn.execute(
+            "INSERT INTO feedback_rounds (session_id, feedback, result, created_at) VALUES (?, ?, ?, ?)",
+            (session_id, json.dumps(feedback), json.dumps(result), time.time())
+        )
+        self._conn.commit()
+
+    @on_executor
+    def feedback_rounds(self, session_id: str) -> List[Dict[str, Any]]:
+        rows = self._conn.execute(
+            "SELECT feedback, result, created_at FROM feedback_rounds WHERE session_id = ? ORDER BY id",
+            (session_id,)
+        ).fetchall()
+        return [{"feedback": json.loads(row[0]), "result": json.loads(row[1]), "created_at": row[2]} for row in rows]
+
+    @on_executor
+    def append_turn(self, session_id: str, role: str, content: str):
+        self._touch(session_id)
+        self._conn.execute(
+            "INSERT INTO chat_turns (session_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+            (session_id, role, content, time.time())
+        )
+        self._conn.commit()
+
+    @on_executor
+    def history(self, session_id: str, limit: Optional[int] = None, offset: int = 0) -> List[Dict[str, Any]]:
+        rows = self._conn.execute(
+            """
+            SELECT role, content, created_at FROM (
+                SELECT id, role, content, created_at FROM chat_turns WHERE session_id = ? ORDER BY id LIMIT -1 OFFSET ?
+            ) ORDER BY id DESC LIMIT ?
+            """,
+            (session_id, offset, limit if limit else -1)
+        ).fetchall()
+        return [{"role": row[0], "content": row[1], "created_at": row[2]} for row in reversed(rows)]
+
+    @on_executor
+    def get_context(self, session_id: str, key: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT value FROM session_context WHERE session_id = ? AND key = ?", (session_id, key)
+        ).fetchone()
+        return row[0] if row else None
+
+    @on_executor
+    def set_context(self, session_id: str, key: str, value: str):
+        self._touch(session_id)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO session_context (session_id, key, value) VALUES (?, ?, ?)",
+            (session_id, key, value)
+        )
+        self._conn.commit()
+
+    @on_executor
+    def delete_session(self, session_id: str) -> bool:
+        cursor = self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        self._conn.commit()
+        return cursor.rowcount > 0
+
+    @on_executor
+    def stats(self) -> Dict[str, Any]:
+        sessions = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        turns = self._conn.execute("SELECT COUNT(*) FROM chat_turns").fetchone()[0]
+        return {"backend": "sqlite", "path": self.path, "sessions": sessions, "chat_turns": turns}
+
+
+def format_history(turns: List[Dict[str, Any]]) -> str:
+    """
+    Renders stored chat turns in the free-text form /chat prompts expect.
+    """
+    labels = {"user": "Student", "assistant": "AURA"}
+    return "\n".join(f"{labels.get(turn['role'], turn['role'])}: {turn['content']}" for turn in turns)
+
+
+_session_store: Optional[SessionStore] = None
+_session_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """
+    Returns the process-wide session store selected by SESSION_STORE_BACKEND.
+    """
+    global _session_store
+    if _session_store is None:
+        with _session_store_lock:
+            if _session_store is None:
+                ttl = settings.SESSION_TTL_SECONDS or None
+                if settings.SESSION_STORE_BACKEND == "memory":
+                    _session_store = MemorySessionStore(ttl_seconds=ttl)
+                elif settings.SESSION_STORE_BACKEND == "sqlite":
+                    _session_store = SQLiteSessionStore(settings.SESSION_STORE_PATH, ttl_seconds=ttl)
+                else:
+                    raise ValueError(f"Unknown SESSION_STORE_BACKEND '{settings.SESSION_STORE_BACKEND}'")
+    return _session_store
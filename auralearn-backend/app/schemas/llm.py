@@ -0,0 +1,26 @@
+from typing import Dict, List
+
+from pydantic import BaseModel, RootModel
+
+# Shapes the agents ask the model to return as JSON; validated by
+# app.utils.validators.generate_validated before use.
+
+
+class LearningPathOutput(BaseModel):
+    foundation: List[str]
+    intermediate: List[str]
+    advanced: List[str]
+
+
+class ExplanationOutput(BaseModel):
+    summary: str
+    assumptions: List[str]
+    confidence: str
+
+
+class RefinedPathOutput(LearningPathOutput):
+    changes_made: List[str] = []
+
+
+class DomainApplicationsOutput(RootModel[Dict[str, str]]):
+    pass
@@ -0,0 +1,48 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+# Top-level /orchestrate response fields that `fields` may select
+ORCHESTRATE_FIELDS = ("learning_plan", "cross_domain_impact", "explanation", "decision_trace", "session_id")
+
+
+class OrchestrateRequest(BaseModel):
+    user_input: str = Field(..., min_length=1)
+    # Cross-domain targets (all enabled registry domains when omitted)
+    domains: Optional[List[str]] = None
+    session_id: Optional[str] = None
+    # False drops decision_trace and learning_plan.source_documents
+    verbose: bool = True
+    # Top-level response fields to return (all when omitted)
+    fields: Optional[List[str]] = None
+
+    @field_validator("fields")
+    @classmethod
+    def known_fields(cls, fields: Optional[List[str]]) -> Optional[List[str]]:
+        unknown = [name for name in fields or [] if name not in ORCHESTRATE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields {unknown}; choose from {list(ORCHESTRATE_FIELDS)}")
+        return fields
+
+
+# With a session_id the path and goal are loaded from the session store,
+# so only the feedback needs to be sent.
+class FeedbackRequest(BaseModel):
+    feedback: Dict[str, Any]
+    original_path: Optional[Dict[str, Any]] = None
+    original_goal: Optional[str] = None
+    session_id: Optional[str] = None
+
+
+class LearnRequest(BaseModel):
+    skill: str = Field(..., min_length=1)
+    user_level: str = "Beginner"
+    context: str = ""
+
+
+class ChatRequest(BaseModel):
+    message: str = Field(..., min_length=1)
+    skill_context: str = ""
+    # Free-text history for stateless clients; ignored when session_id is set
+    conversation_history: str = ""
+    session_id: Optional[str] = None
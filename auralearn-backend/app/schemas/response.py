@@ -0,0 +1,58 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class LearningPlan(BaseModel):
+    """
+    Education Agent output. Agents may add keys, which are passed through.
+    """
+    model_config = ConfigDict(extra="allow")
+
+    status: str
+    goal: Optional[str] = None
+    message: Optional[str] = None
+    skills_identified: Optional[List[str]] = None
+    learning_path: Optional[Dict[str, Any]] = None
+    source_documents: Optional[List[Dict[str, Any]]] = None
+
+
+class OrchestrateResponse(BaseModel):
+    """
+    Routes return this with exclude_unset, so fields dropped by `fields` or
+    `verbose=false` are left out of the body rather than sent as null.
+    """
+    learning_plan: Optional[LearningPlan] = None
+    cross_domain_impact: Optional[Dict[str, str]] = None
+    explanation: Optional[Dict[str, Any]] = None
+    decision_trace: Optional[Dict[str, Any]] = None
+    session_id: Optional[str] = None
+
+
+class LearnResponse(BaseModel):
+    status: str
+    skill: str
+    level: Optional[str] = None
+    content: Optional[str] = None
+    message: Optional[str] = None
+
+
+class ChatResponse(BaseModel):
+    status: str
+    response: Optional[str] = None
+    message: Optional[str] = None
+
+
+def compact_orchestration(result: Dict[str, Any], verbose: bool = True, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Trims an /orchestrate result to the requested top-level `fields` and,
+    unless `verbose`, drops the decision trace and source documents.
+    """
+    if fields:
+        result = {name: result[name] for name in fields if name in result}
+    if not verbose:
+        result = {name: value for name, value in result.items() if name != "decision_trace"}
+        learning_plan = result.get("learning_plan")
+        if isinstance(learning_plan, dict) and "source_documents" in learning_plan:
+            result["learning_plan"] = {name: value for name, value in learning_plan.items() if name != "source_documents"}
+    return result
@@ -0,0 +1,130 @@
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+DEFAULT_QUERY_TEMPLATE = "education to {domain} applications skills transfer {skills}"
+
+DEFAULT_PROMPT_TEMPLATE = """
+            You are a cross-domain career analyst. Your task is to explain how educational skills
+            can be applied to the {domain_upper} domain.
+
+            USER'S SKILLS:
+            {skills}
+
+            KNOWLEDGE BASE REFERENCE (Use this as your primary source):
+            {context}
+
+            Based ONLY on the knowledge base content above, provide a specific, concise explanation
+            (2-3 sentences max) of how these skills apply to {domain}.
+
+            Focus on concrete applications mentioned in the knowledge base.
+            Do NOT make up information. If the knowledge base doesn't mention something, don't include it.
+            """
+
+
+@dataclass
+class DomainSpec:
+    """
+    One target domain for cross-domain mapping.
+    `query_template` may use {domain} and {skills}; `prompt_template` may
+    use {domain}, {domain_upper}, {skills} and {context}.
+    Disabled domains can't be selected; higher priority runs first.
+    """
+    name: str
+    query_template: str = DEFAULT_QUERY_TEMPLATE
+    prompt_template: str = DEFAULT_PROMPT_TEMPLATE
+    enabled: bool = True
+    priority: int = 0
+
+    def query(self, skills: List[str]) -> str:
+        return self.query_template.format(domain=self.name, skills=" ".join(skills))
+
+    def prompt(self, skills: List[str], context: str) -> str:
+        return self.prompt_template.format(
+            domain=self.name,
+            domain_upper=self.name.upper(),
+            skills=", ".join(skills),
+            context=context
+        )
+
+
+DEFAULT_DOMAINS = [
+    DomainSpec("health", "education to health healthcare medical applications skills transfer {skills}", priority=30),
+    DomainSpec("finance", "education to finance financial banking applications skills transfer {skills}", priority=20),
+    DomainSpec("agriculture", "education to agriculture farming crop applications skills transfer {skills}", priority=10)
+]
+
+
+class DomainRegistry:
+    """
+    The domains CrossDomainAgent can map skills to, in priority order.
+    """
+
+    def __init__(self, domains: List[DomainSpec]):
+        self._domains: Dict[str, DomainSpec] = {}
+        for domain in domains:
+            if domain.name in self._domains:
+                raise ValueError(f"Domain '{domain.name}' is defined more than once")
+            self._domains[domain.name] = domain
+
+    @classmethod
+    def from_config(cls, entries: List[Dict[str, Any]]) -> "DomainRegistry":
+        return cls([DomainSpec(**entry) for entry in entries])
+
+    @classmethod
+    def load(cls, path: str) -> "DomainRegistry":
+        """
+        Loads a JSON list of domain objects with the DomainSpec fields.
+        """
+        with open(path, encoding="utf-8") as f:
+            return cls.from_config(json.load(f))
+
+    def enabled(self) -> List[DomainSpec]:
+        return sorted(
+            (domain for domain in self._domains.values() if domain.enabled),
+            key=lambda domain: -domain.priority
+        )
+
+    def select(self, names: Optional[List[str]] = None) -> List[DomainSpec]:
+        """
+        Enabled domains, or just the requested ones (in priority order).
+        Raises ValueError for unknown or disabled names.
+        """
+        enabled = self.enabled()
+        if not names:
+            return enabled
+
+        available = {domain.name for domain in enabled}
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValueError(f"Unknown or disabled domains: {unknown}. Available: {sorted(available)}")
+        return [domain for domain in enabled if domain.name in names]
+
+    def describe(self) -> List[Dict[str, Any]]:
+        return [
+            {"name": domain.name, "enabled": domain.enabled, "priority": domain.priority}
+            for domain in sorted(self._domains.values(), key=lambda domain: -domain.priority)
+        ]
+
+
+_registry: Optional[DomainRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_domain_registry() -> DomainRegistry:
+    """
+    Returns the process-wide registry: CROSS_DOMAIN_REGISTRY_PATH if set,
+    otherwise health, finance and agriculture.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                if settings.CROSS_DOMAIN_REGISTRY_PATH:
+                    _registry = DomainRegistry.load(settings.CROSS_DOMAIN_REGISTRY_PATH)
+                else:
+                    _registry = DomainRegistry(list(DEFAULT_DOMAINS))
+    return _registry
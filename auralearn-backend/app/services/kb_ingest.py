@@ -0,0 +1,137 @@
+"""
+Builds the local Knowledge Base index (see app.services.vector_index).
+
+Bedrock Knowledge Bases don't export their stored vectors, so the source
+documents the KB was synced from are re-chunked and re-embedded with
+KB_EMBEDDING_MODEL_ID. Sources are a local directory or the KB's S3 data
+source; .txt and .md files are read.
+
+Run from auralearn-backend/:
+    python -m app.services.kb_ingest --source ./kb_docs
+    python -m app.services.kb_ingest --s3-uri s3://bucket/prefix --ivf-lists 0
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.aws.bedrock_client import BedrockClient
+from app.aws.client_registry import get_client_registry
+from app.core.config import settings
+from app.core.logging import configure_logging, get_logger
+from app.services.vector_index import LocalKnowledgeBase
+
+logger = get_logger(__name__)
+
+TEXT_EXTENSIONS = (".txt", ".md")
+
+
+def chunk_text(text: str, max_words: int = 220, overlap: float = 0.2) -> List[str]:
+    """
+    Fixed-size word windows (about 300 tokens) with `overlap`, close to the
+    Knowledge Base's default chunking.
+    """
+    words = text.split()
+    if not words:
+        return []
+    step = max(1, int(max_words * (1 - overlap)))
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + max_words]))
+        if start + max_words >= len(words):
+            break
+    return chunks
+
+
+def read_directory(path: str) -> List[Tuple[str, Dict[str, Any]]]:
+    documents = []
+    for root, _, files in os.walk(path):
+        for name in sorted(files):
+            if name.lower().endswith(TEXT_EXTENSIONS):
+                file_path = os.path.join(root, name)
+                with open(file_path, encoding="utf-8", errors="replace") as f:
+                    documents.append((f.read(), {"type": "LOCAL", "localLocation": {"path": file_path}}))
+    return documents
+
+
+async def read_s3(uri: str) -> List[Tuple[str, Dict[str, Any]]]:
+    bucket, _, prefix = uri[len("s3://"):].partition("/")
+    s3 = await get_client_registry().get("s3")
+    documents = []
+    paginator = s3.get_paginator("list_objects_v2")
+    async for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for item in page.get("Contents", []):
+            key = item["Key"]
+            if key.lower().endswith(TEXT_EXTENSIONS):
+                response = await s3.get_object(Bucket=bucket, Key=key)
+                async with response["Body"] as body:
+                    text = (await body.read()).decode("utf-8", errors="replace")
+                documents.append((text, {"type": "S3", "s3Location": {"uri": f"s3://{bucket}/{key}"}}))
+    return documents
+
+
+async def embed_all(bedrock: BedrockClient, texts: List[str], concurrency: int) -> List[List[float]]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def embed(text: str) -> List[float]:
+        async with semaphore:
+            return await bedrock.embed_text(text)
+
+    return await asyncio.gather(*(embed(text) for text in texts))
+
+
+async def ingest(
+    output: str,
+    source: Optional[str] = None,
+    s3_uri: Optional[str] = None,
+    ivf_lists: Optional[int] = None,
+    concurrency: int = 8
+) -> Dict[str, Any]:
+    documents = read_directory(source) if source else await read_s3(s3_uri)
+    chunks = [
+        {"text": chunk, "location": location}
+        for text, location in documents
+        for chunk in chunk_text(text)
+    ]
+    if not chunks:
+        raise ValueError("No text documents found to ingest")
+
+    logger.info(f"Embedding {len(chunks)} chunks from {len(documents)} documents with {settings.KB_EMBEDDING_MODEL_ID}")
+    start = time.perf_counter()
+    vectors = await embed_all(BedrockClient(), [chunk["text"] for chunk in chunks], concurrency)
+    meta = {
+        "embedding_model_id": settings.KB_EMBEDDING_MODEL_ID,
+        "kb_id": settings.BEDROCK_KB_ID,
+        "source": source or s3_uri,
+        "created_at": time.time()
+    }
+    LocalKnowledgeBase.save(output, chunks, vectors, meta, ivf_lists=ivf_lists)
+    logger.info(f"Wrote {len(chunks)} chunks to {output} in {time.perf_counter() - start:.1f}s")
+    return meta
+
+
+async def main_async(args):
+    try:
+        await ingest(args.output, args.source, args.s3_uri, args.ivf_lists, args.concurrency)
+    finally:
+        await get_client_registry().close()
+
+
+def main():
+    configure_logging()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sources = parser.add_mutually_exclusive_group(required=True)
+    sources.add_argument("--source", help="Directory of .txt/.md source documents")
+    sources.add_argument("--s3-uri", help="The Knowledge Base's S3 data source, s3://bucket/prefix")
+    parser.add_argument("--output", default=settings.KB_LOCAL_INDEX_PATH, help="Index directory to write")
+    parser.add_argument(
+        "--ivf-lists", type=int, default=None,
+        help="Also train IVF clusters for KB_LOCAL_INDEX_TYPE=ivf (0 for sqrt of the chunk count)"
+    )
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent embedding calls")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""
+Precomputed /learn modules.
+
+Every /learn request is counted per (skill, level), and skills from
+generated roadmaps are counted as likely requests. A warm-up job generates
+modules for the LEARN_CATALOGUE_WARMUP_TOP_N most-requested pairs ahead of
+time, so /learn serves them without a model call; live answers are kept
+only for pairs in that set. Modules are stored with the catalogue version,
+a hash of the prompt template, model id and inference settings, and are
+dropped when it changes or their pair leaves the set.
+
+The warm-up runs in the background every LEARN_CATALOGUE_WARMUP_INTERVAL_SECONDS,
+or once from the command line (run from auralearn-backend/):
+    python -m app.services.learn_catalogue --top 50
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.aws.bedrock_client import INFERENCE_CONFIG, BedrockClient
+from app.aws.client_registry import get_client_registry
+from app.aws.errors import BedrockError, BedrockThrottledError
+from app.aws.kb_client import normalize_query
+from app.core.config import settings
+from app.core.logging import configure_logging, get_logger
+from app.core.metrics import CACHE_LOOKUPS
+from app.utils.threads import on_executor, single_thread_executor
+
+logger = get_logger(__name__)
+
+# Level recorded for roadmap skills: the Classroom's default depth
+ROADMAP_LEVEL = "Beginner"
+
+# Demand writes between prunes of stale or excess demand rows and modules
+PRUNE_EVERY_WRITES = 1000
+
+# Pairs ranked most requested first
+DEMAND_ORDER = "requests DESC, roadmap_mentions DESC, last_requested DESC"
+
+
+def build_learn_prompt(skill: str, user_level: str, context: str) -> str:
+    """
+    Prompt for a learning module on a single skill.
+    """
+    return f"""
+    You are an expert educator and mentor. Create a comprehensive yet concise learning module for the following skill.
+    
+    **Skill to Learn:** {skill}
+    **Student Level:** {user_level}
+    **Additional Context:** {context if context else "None provided"}
+    
+    Please provide:
+    
+    1. **Introduction** (2-3 sentences explaining what this skill is and why it matters)
+    
+    2. **Key Concepts** (3-5 core concepts the student must understand, with brief explanations)
+    
+    3. **Practical Example** (A real-world code snippet or scenario demonstrating the skill)
+    
+    4. **Common Mistakes** (2-3 mistakes beginners make and how to avoid them)
+    
+    5. **Next Steps** (What to learn after mastering this skill)
+    
+    Format your response in a clear, structured way that's easy to read and follow.
+    Keep the total response under 800 words for optimal readability.
+    """
+
+
+def catalogue_version(model_id: Optional[str] = None) -> str:
+    """
+    Changes whenever the /learn prompt template, model or inference
+    settings do, invalidating every stored module.
+    """
+    payload = json.dumps({
+        "template": build_learn_prompt("{skill}", "{user_level}", ""),
+        "model_id": model_id or settings.BEDROCK_MODEL_ID,
+        "inference_config": INFERENCE_CONFIG
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class LearnCatalogue:
+    """
+    SQLite-backed modules and request counts, shared across workers and
+    restarts. Only requests without extra context are served from it,
+    since context changes the prompt. Queries run on one dedicated thread,
+    off the event loop.
+
+    Only the `top_n` most-requested pairs keep modules. The catalogue is
+    pruned on start-up, before each warm-up and every PRUNE_EVERY_WRITES
+    writes: demand rows idle for `demand_max_age_days` go, then all but the
+    `demand_max_rows` most requested, then modules outside the top `top_n`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        version: Optional[str] = None,
+        top_n: Optional[int] = None,
+        demand_max_rows: Optional[int] = None,
+        demand_max_age_days: Optional[float] = None
+    ):
+        self.path = path
+        self.version = version or catalogue_version()
+        self.top_n = top_n or settings.LEARN_CATALOGUE_WARMUP_TOP_N
+        self.demand_max_rows = demand_max_rows or settings.LEARN_CATALOGUE_DEMAND_MAX_ROWS
+        self.demand_max_age_days = (
+            demand_max_age_days if demand_max_age_days is not None else settings.LEARN_CATALOGUE_DEMAND_MAX_AGE_DAYS
+        )
+        self._writes = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._executor = single_thread_executor("learn-catalogue")
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS modules (
+                skill_key TEXT NOT NULL,
+                level_key TEXT NOT NULL,
+                version TEXT NOT NULL,
+                skill TEXT NOT NULL,
+                level TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (skill_key, level_key)
+            );
+            CREATE TABLE IF NOT EXISTS demand (
+                skill_key TEXT NOT NULL,
+                level_key TEXT NOT NULL,
+                skill TEXT NOT NULL,
+                level TEXT NOT NULL,
+                requests INTEGER NOT NULL DEFAULT 0,
+                roadmap_mentions INTEGER NOT NULL DEFAULT 0,
+                last_requested REAL,
+                PRIMARY KEY (skill_key, level_key)
+            );
+            """
+        )
+        removed = self._conn.execute("DELETE FROM modules WHERE version != ?", (self.version,)).rowcount
+        self._prune()
+        self._conn.commit()
+        if removed:
+            logger.info(f"Dropped {removed} modules from an older catalogue version")
+
+    @staticmethod
+    def _key(skill: str, level: str) -> Tuple[str, str]:
+        return normalize_query(skill), normalize_query(level)
+
+    def _prune(self) -> Tuple[int, int]:
+        demand = 0
+        if self.demand_max_age_days:
+            demand += self._conn.execute(
+                "DELETE FROM demand WHERE last_requested < ?",
+                (time.time() - self.demand_max_age_days * 86400,)
+            ).rowcount
+        demand += self._conn.execute(
+            f"DELETE FROM demand WHERE rowid NOT IN (SELECT rowid FROM demand ORDER BY {DEMAND_ORDER} LIMIT ?)",
+            (self.demand_max_rows,)
+        ).rowcount
+        modules = self._conn.execute(
+            f"""
+            DELETE FROM modules WHERE (skill_key, level_key) NOT IN (
+                SELECT skill_key, level_key FROM demand ORDER BY {DEMAND_ORDER} LIMIT ?
+            )
+            """,
+            (self.top_n,)
+        ).rowcount
+        self._writes = 0
+        return demand, modules
+
+    def _in_demand(self, skill_key: str, level_key: str) -> bool:
+        row = self._conn.execute(
+            f"""
+            SELECT 1 FROM (SELECT skill_key, level_key FROM demand ORDER BY {DEMAND_ORDER} LIMIT ?)
+            WHERE skill_key = ? AND level_key = ?
+            """,
+            (self.top_n, skill_key, level_key)
+        ).fetchone()
+        return row is not None
+
+    def _count(self, skill: str, level: str, column: str):
+        self._writes += 1
+        skill_key, level_key = self._key(skill, level)
+        self._conn.execute(
+            "INSERT OR IGNORE INTO demand (skill_key, level_key, skill, level) VALUES (?, ?, ?, ?)",
+            (skill_key, level_key, skill.strip(), level.strip())
+        )
+        self._conn.execute(
+            f"UPDATE demand SET {column} = {column} + 1, last_requested = ? WHERE skill_key = ? AND level_key = ?",
+            (time.time(), skill_key, level_key)
+        )
+
+    def _commit_counts(self):
+        if self._writes >= PRUNE_EVERY_WRITES:
+            self._prune()
+        self._conn.commit()
+
+    @on_executor
+    def record_request(self, skill: str, level: str):
+        self._count(skill, level, "requests")
+        self._commit_counts()
+
+    @on_executor
+    def record_roadmap(self, learning_path: Optional[Dict[str, Any]]):
+        """
+        Counts every skill in a generated roadmap as a likely /learn request.
+        """
+        skills = [skill for stage in (learning_path or {}).values() if isinstance(stage, list) for skill in stage]
+        for skill in skills:
+            if isinstance(skill, str) and skill.strip():
+                self._count(skill, ROADMAP_LEVEL, "roadmap_mentions")
+        self._commit_counts()
+
+    @on_executor
+    def prune(self) -> Tuple[int, int]:
+        """
+        Drops stale and excess demand rows and modules no longer in the top
+        `top_n`; returns how many of each went.
+        """
+        removed = self._prune()
+        self._conn.commit()
+        if any(removed):
+            logger.info(f"Pruned {removed[0]} demand rows and {removed[1]} modules")
+        return removed
+
+    @on_executor
+    def get(self, skill: str, level: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT content FROM modules WHERE skill_key = ? AND level_key = ? AND version = ?",
+            self._key(skill, level) + (self.version,)
+        ).fetchone()
+        CACHE_LOOKUPS.inc(cache="learn_catalogue", result="hit" if row else "miss")
+        return row[0] if row else None
+
+    def _put(self, skill: str, level: str, content: str):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO modules (skill_key, level_key, version, skill, level, content, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            self._key(skill, level) + (self.version, skill.strip(), level.strip(), content, time.time())
+        )
+        self._conn.commit()
+
+    @on_executor
+    def put(self, skill: str, level: str, content: str):
+        self._put(skill, level, content)
+
+    @on_executor
+    def put_if_in_demand(self, skill: str, level: str, content: str) -> bool:
+        """
+        Keeps a live answer only if its pair is in the top `top_n`, so
+        arbitrary request text can't grow the catalogue. Returns whether
+        it was stored.
+        """
+        if not self._in_demand(*self._key(skill, level)):
+            return False
+        self._put(skill, level, content)
+        return True
+
+    @on_executor
+    def missing(self, top_n: int) -> List[Tuple[str, str]]:
+        """
+        The `top_n` most-requested (skill, level) pairs that have no module
+        for the current version, most requested first.
+        """
+        rows = self._conn.execute(
+            f"""
+            SELECT d.skill, d.level FROM (
+                SELECT * FROM demand ORDER BY {DEMAND_ORDER} LIMIT ?
+            ) AS d
+            LEFT JOIN modules AS m
+                ON m.skill_key = d.skill_key AND m.level_key = d.level_key AND m.version = ?
+            WHERE m.skill_key IS NULL
+            ORDER BY d.requests DESC, d.roadmap_mentions DESC, d.last_requested DESC
+            """,
+            (top_n, self.version)
+        ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    @on_executor
+    def stats(self) -> Dict[str, Any]:
+        modules = self._conn.execute("SELECT COUNT(*) FROM modules").fetchone()[0]
+        pairs = self._conn.execute("SELECT COUNT(*) FROM demand").fetchone()[0]
+        return {"path": self.path, "version": self.version, "modules": modules, "requested_pairs": pairs}
+
+
+async def warm_up(bedrock: BedrockClient, catalogue: LearnCatalogue, top_n: Optional[int] = None) -> int:
+    """
+    Generates modules for the most-requested pairs the catalogue lacks, one
+    at a time so live traffic keeps most of the model quota. Stops early
+    when throttled. Returns the number of modules added.
+    """
+    await catalogue.prune()
+    pairs = await catalogue.missing(top_n or catalogue.top_n)
+    added = 0
+    for skill, level in pairs:
+        try:
+            content = await bedrock.generate_text(build_learn_prompt(skill, level, ""))
+        except BedrockThrottledError:
+            logger.warning(f"Throttled after {added} modules, resuming next warm-up")
+            break
+        except BedrockError as e:
+            logger.warning(f"Skipping '{skill}' ({level}): {e}")
+            continue
+        await catalogue.put(skill, level, content)
+        added += 1
+    if pairs:
+        logger.info(f"Warm-up added {added} of {len(pairs)} missing modules")
+    return added
+
+
+async def warm_up_forever(bedrock: BedrockClient, catalogue: LearnCatalogue, interval_seconds: float):
+    """
+    Background warm-up loop started by the app lifespan.
+    """
+    while True:
+        try:
+            await warm_up(bedrock, catalogue)
+        except Exception as e:
+            logger.exception(f"Warm-up failed: {e}")
+        await asyncio.sleep(interval_seconds)
+
+
+_catalogue: Optional[LearnCatalogue] = None
+_catalogue_lock = threading.Lock()
+
+
+def get_learn_catalogue() -> Optional[LearnCatalogue]:
+    """
+    Returns the process-wide catalogue, or None when LEARN_CATALOGUE_ENABLED is off.
+    """
+    global _catalogue
+    if not settings.LEARN_CATALOGUE_ENABLED:
+        return None
+
+    if _catalogue is None:
+        with _catalogue_lock:
+            if _catalogue is None:
+                _catalogue = LearnCatalogue(settings.LEARN_CATALOGUE_PATH)
+    return _catalogue
+
+
+async def main_async(args):
+    catalogue = LearnCatalogue(args.path, top_n=args.top)
+    bedrock = BedrockClient()
+    try:
+        await bedrock.detect_capabilities(probe=settings.BEDROCK_PROBE_CAPABILITIES)
+        await warm_up(bedrock, catalogue, args.top)
+    finally:
+        await get_client_registry().close()
+    stats = await catalogue.stats()
+    logger.info(f"Catalogue {stats['path']} (version {stats['version']}): {stats['modules']} modules, {stats['requested_pairs']} requested pairs")
+
+
+def main():
+    configure_logging()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=settings.LEARN_CATALOGUE_PATH, help="Catalogue database")
+    parser.add_argument("--top", type=int, default=settings.LEARN_CATALOGUE_WARMUP_TOP_N, help="Most-requested pairs to precompute")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from app.core.tracing import span
+
+
+@dataclass
+class PlanStep:
+    """
+    A single node of an execution plan.
+    `run` is a coroutine function called with one keyword argument per
+    declared input; its result is published under `output` for downstream steps.
+    """
+    name: str
+    run: Callable[..., Any]
+    inputs: List[str] = field(default_factory=list)
+    output: str = ""
+    # Returns True when the step's result means dependent steps should not run
+    cancel_downstream: Optional[Callable[[Any], bool]] = None
+    # Value published for `output` when this step is cancelled
+    cancelled_output: Any = None
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "inputs": self.inputs,
+            "output": self.output
+        }
+
+
+class PlanExecutor:
+    """
+    Runs a list of PlanSteps as a dependency graph.
+    Steps start as soon as all of their inputs are available, so independent
+    steps run concurrently (at most `max_concurrency` at a time).
+    """
+
+    def __init__(self, max_concurrency: int = 4):
+        self.max_concurrency = max_concurrency
+
+    def _validate(self, steps: List[PlanStep], initial: Dict[str, Any]):
+        available = set(initial)
+        producers = {}
+        for step in steps:
+            if step.output in producers or step.output in available:
+                raise ValueError(f"Output '{step.output}' of step '{step.name}' is produced more than once")
+            producers[step.output] = step.name
+
+        for step in steps:
+            missing = [name for name in step.inputs if name not in available and name not in producers]
+            if missing:
+                raise ValueError(f"Step '{step.name}' depends on unknown inputs: {missing}")
+
+    async def _run_step(self, step: PlanStep, kwargs: Dict[str, Any]) -> Any:
+        with span(step.name, kind="step"):
+            return await step.run(**kwargs)
+
+    def _dependents(self, steps: List[PlanStep], root: PlanStep) -> Set[str]:
+        """
+        Returns the names of every step that transitively consumes `root`'s output.
+        """
+        blocked_outputs = {root.output}
+        dependents = set()
+        changed = True
+        while changed:
+            changed = False
+            for step in steps:
+                if step.name in dependents:
+                    continue
+                if any(name in blocked_outputs for name in step.inputs):
+                    dependents.add(step.name)
+                    blocked_outputs.add(step.output)
+                    changed = True
+        return dependents
+
+    async def run(
+        self,
+        steps: List[PlanStep],
+        initial: Dict[str, Any],
+        on_step_finished: Optional[Callable[[PlanStep, str, Any], None]] = None
+    ):
+        """
+        Executes the plan.
+        `on_step_finished(step, status, value)` is called as each step
+        completes or is cancelled.
+
+        Returns:
+            (values, timings): every published value keyed by output name, and a
+            per-step record with status, start/end timestamps and duration.
+        """
+        self._validate(steps, initial)
+
+        values = dict(initial)
+        timings: Dict[str, Dict[str, Any]] = {}
+        pending = {step.name: step for step in steps}
+        running = {}
+
+        try:
+            while pending or running:
+                # Launch every step whose inputs are ready
+                for name, step in list(pending.items()):
+                    if len(running) >= self.max_concurrency:
+                        break
+                    if all(key in values for key in step.inputs):
+                        del pending[name]
+                        timings[name] = {"status": "running", "started_at": time.time()}
+                        kwargs = {key: values[key] for key in step.inputs}
+                        running[asyncio.ensure_future(self._run_step(step, kwargs))] = step
+
+                if not running:
+                    raise RuntimeError(f"Plan cannot make progress; blocked steps: {list(pending)}")
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    record = timings[step.name]
+                    record["finished_at"] = time.time()
+                    record["duration_ms"] = round((record["finished_at"] - record["started_at"]) * 1000, 1)
+
+                    try:
+                        result = future.result()
+                    except Exception:
+                        record["status"] = "failed"
+                        raise
+
+                    record["status"] = "completed"
+                    values[step.output] = result
+                    if on_step_finished:
+                        on_step_finished(step, "completed", result)
+
+                    if step.cancel_downstream and step.cancel_downstream(result):
+                        for name in self._dependents(steps, step):
+                            cancelled = pending.pop(name, None)
+                            if cancelled is None:
+                                continue
+                            values[cancelled.output] = cancelled.cancelled_output
+                            timings[name] = {"status": "cancelled", "cancelled_by": step.name}
+                            if on_step_finished:
+                                on_step_finished(cancelled, "cancelled", cancelled.cancelled_output)
+        finally:
+            # A failed step aborts the plan; don't leave siblings running
+            for task in running:
+                task.cancel()
+
+        return values, timings
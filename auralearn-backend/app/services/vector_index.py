@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+try:
+    import numpy as np
+except ImportError:  # only needed for KB_RETRIEVAL_BACKEND=local
+    np = None
+
+logger = get_logger(__name__)
+
+VECTORS_FILE = "vectors.npy"
+CHUNKS_FILE = "chunks.jsonl"
+META_FILE = "meta.json"
+IVF_FILE = "ivf.npz"
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("The local Knowledge Base index needs numpy: pip install numpy")
+
+
+def normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores, top_k: int) -> Tuple[Any, Any]:
+    k = min(top_k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    order = candidates[np.argsort(-scores[candidates])]
+    return order, scores[order]
+
+
+class BruteForceIndex:
+    """
+    Exact cosine search: one matrix-vector product over every chunk.
+    Fast enough for Knowledge Bases up to a few hundred thousand chunks.
+    """
+
+    kind = "brute"
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def search(self, query, top_k: int) -> Tuple[Any, Any]:
+        return _top_k(self.vectors @ query, top_k)
+
+
+class IVFIndex:
+    """
+    Inverted-file index: chunks are clustered with spherical k-means and a
+    query only scores the chunks in its `n_probe` nearest clusters.
+    """
+
+    kind = "ivf"
+
+    def __init__(self, vectors, centroids, assignments, n_probe: int = 8):
+        self.vectors = vectors
+        self.centroids = centroids
+        self.n_probe = max(1, min(n_probe, len(centroids)))
+        self.lists = [np.flatnonzero(assignments == cluster) for cluster in range(len(centroids))]
+
+    @staticmethod
+    def train(vectors, n_lists: Optional[int] = None, iterations: int = 10, seed: int = 0) -> Tuple[Any, Any]:
+        """
+        Centroids and per-chunk cluster assignments for `vectors`
+        (about sqrt(n) clusters by default).
+        """
+        _require_numpy()
+        count = len(vectors)
+        n_lists = max(1, min(n_lists or int(np.sqrt(count)), count))
+        rng = np.random.default_rng(seed)
+        centroids = np.array(vectors[rng.choice(count, n_lists, replace=False)], dtype=np.float32)
+        assignments = np.zeros(count, dtype=np.int32)
+        for _ in range(iterations):
+            assignments = np.argmax(vectors @ centroids.T, axis=1).astype(np.int32)
+            for cluster in range(n_lists):
+                members = vectors[assignments == cluster]
+                if len(members):
+                    centroids[cluster] = members.sum(axis=0)
+            centroids = normalize_rows(centroids).astype(np.float32)
+        return centroids, assignments
+
+    def search(self, query, top_k: int) -> Tuple[Any, Any]:
+        probes = _top_k(self.centroids @ query, self.n_probe)[0]
+        candidates = np.concatenate([self.lists[cluster] for cluster in probes])
+        order, scores = _top_k(self.vectors[candidates] @ query, top_k)
+        return candidates[order], scores
+
+
+class LocalKnowledgeBase:
+    """
+    Read-only mirror of the Bedrock Knowledge Base: chunk texts plus their
+    unit-length embeddings, memory-mapped from disk. `search` returns the
+    same shape as the Retrieve API so KnowledgeBaseClient can use either.
+
+    Directory layout: vectors.npy (float32, one row per chunk), chunks.jsonl
+    ({"text", "location"} per line), meta.json (embedding model and
+    dimensions) and, for IVF, ivf.npz (centroids and assignments).
+    """
+
+    def __init__(self, path: str, vectors, chunks: List[Dict[str, Any]], meta: Dict[str, Any], index):
+        self.path = path
+        self.vectors = vectors
+        self.chunks = chunks
+        self.meta = meta
+        self.index = index
+
+    @property
+    def index_type(self) -> str:
+        return self.index.kind
+
+    @property
+    def identity(self) -> str:
+        """
+        Changes when the index is rebuilt or searched differently, so cached
+        results from another index aren't reused.
+        """
+        probes = getattr(self.index, "n_probe", None)
+        payload = json.dumps({"meta": self.meta, "index": self.index_type, "n_probe": probes}, sort_keys=True)
+        return f"local:{self.index_type}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]}"
+
+    @classmethod
+    def load(cls, path: str, index_type: str = "brute", n_probe: int = 8) -> "LocalKnowledgeBase":
+        _require_numpy()
+        vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r")
+        with open(os.path.join(path, CHUNKS_FILE), encoding="utf-8") as f:
+            chunks = [json.loads(line) for line in f if line.strip()]
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        if len(chunks) != len(vectors):
+            raise ValueError(f"Local KB index at {path} has {len(vectors)} vectors but {len(chunks)} chunks")
+
+        if index_type == "brute":
+            index = BruteForceIndex(vectors)
+        elif index_type == "ivf":
+            ivf_path = os.path.join(path, IVF_FILE)
+            if not os.path.exists(ivf_path):
+                raise ValueError(f"Local KB index at {path} has no IVF clusters; re-run the ingest with --ivf-lists")
+            ivf = np.load(ivf_path)
+            index = IVFIndex(vectors, ivf["centroids"], ivf["assignments"], n_probe=n_probe)
+        else:
+            raise ValueError(f"Unknown KB_LOCAL_INDEX_TYPE '{index_type}'")
+
+        logger.info(f"Loaded {len(chunks)} chunks ({index_type}) from {path}")
+        return cls(path, vectors, chunks, meta, index)
+
+    @staticmethod
+    def save(
+        path: str,
+        chunks: List[Dict[str, Any]],
+        vectors: Sequence[Sequence[float]],
+        meta: Dict[str, Any],
+        ivf_lists: Optional[int] = None
+    ):
+        """
+        Writes an index directory. Vectors are normalised so dot products are
+        cosine similarities; `ivf_lists` also trains IVF clusters (0 for sqrt(n)).
+        """
+        _require_numpy()
+        os.makedirs(path, exist_ok=True)
+        matrix = normalize_rows(np.asarray(vectors, dtype=np.float32)).astype(np.float32)
+        np.save(os.path.join(path, VECTORS_FILE), matrix)
+        with open(os.path.join(path, CHUNKS_FILE), "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(json.dumps(chunk) + "\n")
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(dict(meta, chunks=len(chunks), dimensions=int(matrix.shape[1])), f, indent=2)
+        if ivf_lists is not None:
+            centroids, assignments = IVFIndex.train(matrix, n_lists=ivf_lists or None)
+            np.savez(os.path.join(path, IVF_FILE), centroids=centroids, assignments=assignments)
+
+    def search(self, query_vector: Sequence[float], top_k: int = 5) -> List[Dict[str, Any]]:
+        query = normalize_rows(np.asarray(query_vector, dtype=np.float32))
+        ids, scores = self.index.search(query, top_k)
+        return [
+            {
+                "content": {"text": self.chunks[i]["text"]},
+                "score": float(score),
+                "location": self.chunks[i].get("location", {})
+            }
+            for i, score in zip(ids.tolist(), scores.tolist())
+        ]
+
+
+_local_kb: Optional[LocalKnowledgeBase] = None
+_local_kb_lock = threading.Lock()
+
+
+def get_local_knowledge_base() -> Optional[LocalKnowledgeBase]:
+    """
+    Returns the process-wide local index, or None when KB_RETRIEVAL_BACKEND
+    is "remote".
+    """
+    global _local_kb
+    if settings.KB_RETRIEVAL_BACKEND == "remote":
+        return None
+    if settings.KB_RETRIEVAL_BACKEND != "local":
+        raise ValueError(f"Unknown KB_RETRIEVAL_BACKEND '{settings.KB_RETRIEVAL_BACKEND}'")
+
+    if _local_kb is None:
+        with _local_kb_lock:
+            if _local_kb is None:
+                local_kb = LocalKnowledgeBase.load(
+                    settings.KB_LOCAL_INDEX_PATH,
+                    index_type=settings.KB_LOCAL_INDEX_TYPE,
+                    n_probe=settings.KB_LOCAL_IVF_PROBES
+                )
+                # Query vectors from another model would match nothing useful
+                if local_kb.meta.get("embedding_model_id") != settings.KB_EMBEDDING_MODEL_ID:
+                    raise ValueError(
+                        f"Local KB index was built with {local_kb.meta.get('embedding_model_id')}, "
+                        f"but KB_EMBEDDING_MODEL_ID is {settings.KB_EMBEDDING_MODEL_ID}"
+                    )
+                _local_kb = local_kb
+    return _local_kb
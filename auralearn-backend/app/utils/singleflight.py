@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from app.core.metrics import SINGLEFLIGHT_CALLS
+from app.core.tracing import annotate
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller runs the
+    work as a task and later callers await that task instead of repeating
+    it. Keys are forgotten once the call finishes, so this deduplicates
+    in-flight work only; caching results is left to the caller.
+
+    The work runs in its own task, so a cancelled caller doesn't cancel it
+    for the others. Callers receive the same result object and must copy
+    it before mutating.
+    """
+
+    def __init__(self, group: str):
+        self.group = group
+        self._calls: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[Any]"):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception retrieved if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            SINGLEFLIGHT_CALLS.inc(group=self.group, role="leader")
+        else:
+            SINGLEFLIGHT_CALLS.inc(group=self.group, role="shared")
+            annotate(singleflight_shared=True)
+        return await asyncio.shield(task)
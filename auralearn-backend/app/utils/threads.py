@@ -0,0 +1,24 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+
+def single_thread_executor(name: str) -> ThreadPoolExecutor:
+    """
+    One worker thread, so blocking work queued on it (e.g. a SQLite
+    connection's queries) runs in order and never concurrently.
+    """
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+
+def on_executor(method):
+    """
+    Turns a blocking method into a coroutine that runs it on the
+    instance's `_executor`, keeping the event loop free.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(method, self, *args, **kwargs)
+        )
+    return wrapper
@@ -0,0 +1,140 @@
+import json
+from typing import Any, AsyncIterable, Iterator, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class JSONObjectScanner:
+    """
+    Incremental balanced-brace scanner. Feed it model output as it arrives
+    and it returns each complete top-level {...} span, ignoring braces inside
+    strings, so prose or a second object around the JSON can't corrupt it.
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[str]:
+        objects = []
+        for char in chunk:
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._buffer = [char]
+                continue
+
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    objects.append("".join(self._buffer))
+                    self._buffer = []
+        return objects
+
+
+def iter_json_objects(text: str) -> Iterator[Any]:
+    """
+    Every top-level JSON object in `text` that decodes, in order.
+    """
+    for candidate in JSONObjectScanner().feed(text):
+        try:
+            yield json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+
+
+def parse_model(text: str, schema: Type[T]) -> Tuple[Optional[T], Optional[str]]:
+    """
+    The first object in `text` that validates against `schema`, or None and
+    a description of why nothing did (for a repair prompt).
+    """
+    error = "no JSON object found"
+    for candidate in iter_json_objects(text):
+        try:
+            return schema.model_validate(candidate), None
+        except ValidationError as e:
+            error = str(e)
+    return None, error
+
+
+async def parse_model_stream(chunks: AsyncIterable[str], schema: Type[T]) -> Tuple[Optional[T], str]:
+    """
+    Validates objects as soon as they close in a text stream. Returns the
+    first valid one without waiting for the rest of the stream, plus the
+    text consumed so far.
+    """
+    scanner = JSONObjectScanner()
+    consumed: List[str] = []
+    try:
+        async for chunk in chunks:
+            consumed.append(chunk)
+            for candidate in scanner.feed(chunk):
+                try:
+                    return schema.model_validate(json.loads(candidate)), "".join(consumed)
+                except (json.JSONDecodeError, ValidationError):
+                    continue
+    finally:
+        # Stop the upstream stream when returning early
+        if hasattr(chunks, "aclose"):
+            await chunks.aclose()
+    return None, "".join(consumed)
+
+
+def build_repair_prompt(response: str, error: str, schema: Type[BaseModel]) -> str:
+    return f"""
+    Your previous answer could not be used because it was not valid JSON for the required schema.
+
+    Problem:
+    {error[:1000]}
+
+    Previous answer:
+    {response[:4000]}
+
+    Return ONLY a corrected JSON object that matches this JSON schema, with no other text:
+    {json.dumps(schema.model_json_schema())}
+    """
+
+
+async def generate_validated(bedrock, prompt: str, schema: Type[T], stream: bool = False) -> Optional[T]:
+    """
+    Generates and validates a JSON answer against `schema`, with one repair
+    retry that shows the model its output and the validation error.
+    Returns None if both attempts fail so callers can use their fallback.
+    With `stream`, parsing happens as the completion arrives and the first
+    valid object is returned without waiting for trailing text; a stream
+    closed early is not cached, so prefer the plain call for repeatable prompts.
+    """
+    if stream:
+        parsed, response = await parse_model_stream(bedrock.generate_text_stream(prompt), schema)
+        error = None if parsed is not None else parse_model(response, schema)[1]
+    else:
+        response = await bedrock.generate_text(prompt)
+        parsed, error = parse_model(response, schema)
+    if parsed is not None:
+        return parsed
+
+    logger.warning(f"{schema.__name__} output invalid ({error.splitlines()[0]}), retrying with a repair prompt")
+    repaired, error = parse_model(await bedrock.generate_text(build_repair_prompt(response, error, schema)), schema)
+    if repaired is None:
+        logger.warning(f"{schema.__name__} repair failed: {error.splitlines()[0]}")
+    return repaired
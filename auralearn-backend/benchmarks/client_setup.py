@@ -0,0 +1,100 @@
+"""
+Per-request client setup cost: one boto3 client pair per agent (the old
+wiring) versus the shared ClientRegistry.
+
+Run from auralearn-backend/:
+    python -m benchmarks.client_setup --requests 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# The fake does not check signatures, but botocore still needs credentials to sign
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "fake")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "fake")
+os.environ.setdefault("BEDROCK_MODEL_ID", "amazon.nova-lite-v1:0")
+os.environ.setdefault("BEDROCK_KB_ID", "STUBKB0001")
+# Every request must reach the fake, not the response/retrieval caches
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+os.environ.setdefault("KB_CACHE_ENABLED", "false")
+
+from app.agents.orchestrator import OrchestratorAgent
+from app.aws.bedrock_client import BedrockClient
+from app.aws.client_registry import ClientRegistry
+from app.aws.kb_client import KnowledgeBaseClient
+from benchmarks.fake_bedrock import start_fake_bedrock
+
+# OrchestratorAgent, EducationAgent, CrossDomainAgent, ExplainabilityAgent and
+# the two KnowledgeBaseClients each used to build their own BedrockClient.
+LEGACY_CLIENTS_PER_REQUEST = 6
+
+
+async def legacy_request(endpoint_urls):
+    registries = [ClientRegistry(endpoint_urls=endpoint_urls) for _ in range(LEGACY_CLIENTS_PER_REQUEST)]
+    clients = [BedrockClient(registry) for registry in registries]
+    for client in clients:
+        # Client construction used to happen eagerly in every constructor
+        await client._runtime()
+        await client._agent_runtime()
+    await clients[0].generate_text("ping")
+    await KnowledgeBaseClient(clients[1]).search("ping")
+    for registry in registries:
+        await registry.close()
+
+
+async def pooled_request(bedrock, kb):
+    orchestrator = OrchestratorAgent(bedrock, kb)
+    await orchestrator.bedrock.generate_text("ping")
+    await orchestrator.kb.search("ping")
+
+
+async def measure(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<10} mean {statistics.mean(timings):8.2f} ms   p50 {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms")
+
+
+async def run(iterations):
+    server = start_fake_bedrock()
+    host, port = server.server_address
+    endpoint_url = f"http://{host}:{port}"
+    endpoint_urls = {
+        "bedrock-runtime": endpoint_url,
+        "bedrock-agent-runtime": endpoint_url
+    }
+
+    registry = ClientRegistry(endpoint_urls=endpoint_urls)
+    bedrock = BedrockClient(registry)
+    kb = KnowledgeBaseClient(bedrock)
+
+    try:
+        # Warm up imports and the shared pool before timing either variant
+        await pooled_request(bedrock, kb)
+
+        summarize("before", await measure(lambda: legacy_request(endpoint_urls), iterations))
+        summarize("after", await measure(lambda: pooled_request(bedrock, kb), iterations))
+    finally:
+        await registry.close()
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Load test for the async routes: fires N concurrent /learn requests at the
+FastAPI app while the fake Bedrock endpoint holds every call for a fixed
+latency. With sync handlers each request pinned a Starlette threadpool
+worker, so wall time grew in steps of the threadpool size; with async
+handlers it stays close to a single call's latency.
+
+Run from auralearn-backend/:
+    python -m benchmarks.concurrency --requests 200 --latency 1.0
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "fake")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "fake")
+os.environ.setdefault("BEDROCK_MODEL_ID", "amazon.nova-lite-v1:0")
+os.environ.setdefault("BEDROCK_KB_ID", "STUBKB0001")
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+os.environ.setdefault("KB_CACHE_ENABLED", "false")
+os.environ.setdefault("REQUEST_COALESCING_ENABLED", "false")
+os.environ.setdefault("BEDROCK_MAX_CONCURRENCY", "1000")
+
+import httpx
+from anyio import to_thread
+
+from app.aws.bedrock_client import BedrockClient
+from app.aws.client_registry import ClientRegistry
+from app.aws.kb_client import KnowledgeBaseClient
+from app.memory.state import MemorySessionStore
+from app.utils.singleflight import SingleFlight
+from app.main import app
+from benchmarks.fake_bedrock import FakeBedrockConfig, parse_latency, start_fake_bedrock
+
+
+async def run(requests: int, latency: float):
+    server = start_fake_bedrock(config=FakeBedrockConfig(latency=parse_latency(str(latency))))
+    host, port = server.server_address
+    endpoint_url = f"http://{host}:{port}"
+    registry = ClientRegistry(
+        max_pool_connections=requests,
+        endpoint_urls={"bedrock-runtime": endpoint_url, "bedrock-agent-runtime": endpoint_url}
+    )
+
+    # Wire the app state the way the lifespan does, but against the fake
+    app.state.bedrock = BedrockClient(registry)
+    app.state.kb = KnowledgeBaseClient(app.state.bedrock)
+    app.state.sessions = MemorySessionStore()
+    app.state.orchestrations = SingleFlight("orchestrate")
+    app.state.learn_modules = SingleFlight("learn")
+    # Every /learn must reach the fake, not the precomputed catalogue
+    app.state.learn_catalogue = None
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            await client.post("/learn", json={"skill": "warm-up"})
+
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[
+                client.post("/learn", json={"skill": f"skill-{i}"})
+                for i in range(requests)
+            ])
+            elapsed = time.perf_counter() - start
+    finally:
+        await registry.close()
+        server.shutdown()
+
+    ok = sum(1 for response in responses if response.status_code == 200)
+    threadpool_size = to_thread.current_default_thread_limiter().total_tokens
+    print(f"requests            {requests} ({ok} ok)")
+    print(f"fake latency        {latency:.2f} s")
+    print(f"wall time           {elapsed:.2f} s")
+    print(f"effective parallel  {requests * latency / elapsed:.1f} (threadpool size {threadpool_size:g})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.latency))
+
+
+if __name__ == "__main__":
+    main()
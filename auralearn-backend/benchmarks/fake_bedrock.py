@@ -0,0 +1,499 @@
+"""
+Local stand-in for the Bedrock HTTP endpoints, for offline load testing.
+
+Implements the wire protocol botocore speaks for:
+- bedrock-runtime: converse, converse_stream (AWS event-stream framing),
+  invoke_model (including Titan text embeddings, as hashed bag-of-words vectors)
+- bedrock-agent-runtime: retrieve
+
+Responses come from a JSON script of regex rules matched against the prompt
+(see fake_bedrock_script.json), so the agents receive output they can parse.
+Rules with a "tool_input" answer Converse toolConfig requests with a toolUse
+block; without one the fake replies in text, as a model ignoring the tool would.
+Latency, throttling and 5xx errors are injectable and seeded for
+reproducible runs. Call counts and token totals are served at /_fake/stats.
+
+Point the app at it with:
+    python -m benchmarks.fake_bedrock --port 8787 --latency lognormal:0.8,0.4
+    BEDROCK_RUNTIME_ENDPOINT_URL=http://127.0.0.1:8787 \\
+    BEDROCK_AGENT_RUNTIME_ENDPOINT_URL=http://127.0.0.1:8787 \\
+    AWS_ACCESS_KEY_ID=fake AWS_SECRET_ACCESS_KEY=fake uvicorn app.main:app
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+DEFAULT_SCRIPT_PATH = os.path.join(os.path.dirname(__file__), "fake_bedrock_script.json")
+
+MODEL_PATH = re.compile(r"^/model/(?P<model_id>[^/]+)/(?P<action>converse|converse-stream|invoke)$")
+RETRIEVE_PATH = re.compile(r"^/knowledgebases/(?P<kb_id>[^/]+)/retrieve$")
+
+LatencyDistribution = Callable[[random.Random], float]
+
+
+def parse_latency(spec: str) -> LatencyDistribution:
+    """
+    Parses a latency spec in seconds:
+    "0.5" or "fixed:0.5", "uniform:low,high", "normal:mean,stddev",
+    "lognormal:median,sigma" (long right tail, like real model latency).
+    """
+    kind, _, args = spec.partition(":")
+    if not args:
+        kind, args = "fixed", kind
+    values = [float(value) for value in args.split(",")]
+
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1]) if values[0] > 0 else 0.0
+    raise ValueError(f"Unknown latency distribution '{kind}'")
+
+
+def count_tokens(text: str) -> int:
+    # Same ~4 characters per token heuristic the client uses for quotas
+    return max(1, len(text) // 4)
+
+
+class ScriptedResponses:
+    """
+    First-match regex rules over the prompt (completions) or query (retrievals).
+    """
+
+    def __init__(self, script: Dict[str, Any]):
+        self.completions = [
+            (re.compile(rule["match"], re.IGNORECASE), rule)
+            for rule in script.get("completions", [])
+        ]
+        self.default_completion = script.get("default_completion", "Fake Bedrock response.")
+        self.retrievals = [
+            (re.compile(rule["match"], re.IGNORECASE), rule["documents"])
+            for rule in script.get("retrievals", [])
+        ]
+        self.default_documents = script.get("default_documents", [])
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_SCRIPT_PATH) -> "ScriptedResponses":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def _rule(self, prompt: str) -> Dict[str, Any]:
+        for pattern, rule in self.completions:
+            if pattern.search(prompt):
+                return rule
+        return {}
+
+    def completion(self, prompt: str) -> str:
+        return self._rule(prompt).get("text", self.default_completion)
+
+    def tool_input(self, prompt: str) -> Optional[Dict[str, Any]]:
+        return self._rule(prompt).get("tool_input")
+
+    def documents(self, query: str, top_k: int) -> List[str]:
+        for pattern, documents in self.retrievals:
+            if pattern.search(query):
+                return documents[:top_k]
+        return self.default_documents[:top_k]
+
+
+@dataclass
+class FakeBedrockConfig:
+    script: ScriptedResponses = field(default_factory=ScriptedResponses.load)
+    # Delay before a model answers (or before the first streamed event)
+    latency: LatencyDistribution = field(default_factory=lambda: parse_latency("0"))
+    retrieve_latency: LatencyDistribution = field(default_factory=lambda: parse_latency("0"))
+    # Delay between streamed deltas
+    stream_chunk_delay: float = 0.0
+    # Fraction of calls answered with ThrottlingException / a 5xx error
+    throttle_rate: float = 0.0
+    error_rate: float = 0.0
+    # Server-side request quota over a sliding minute (0 = unlimited)
+    requests_per_minute: int = 0
+    seed: Optional[int] = None
+
+
+class FakeBedrockStats:
+    """
+    Thread-safe call and token counters, per operation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.operations: Dict[str, Dict[str, int]] = {}
+
+    def record(self, operation: str, outcome: str = "ok", input_tokens: int = 0, output_tokens: int = 0):
+        with self._lock:
+            counters = self.operations.setdefault(operation, {
+                "calls": 0, "ok": 0, "throttled": 0, "errors": 0, "input_tokens": 0, "output_tokens": 0
+            })
+            counters["calls"] += 1
+            counters[outcome] += 1
+            counters["input_tokens"] += input_tokens
+            counters["output_tokens"] += output_tokens
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            operations = {name: dict(counters) for name, counters in self.operations.items()}
+        totals = {}
+        for counters in operations.values():
+            for key, value in counters.items():
+                totals[key] = totals.get(key, 0) + value
+        return {"operations": operations, "totals": totals}
+
+
+def _event_header(name: str, value: str) -> bytes:
+    name_bytes = name.encode("utf-8")
+    value_bytes = value.encode("utf-8")
+    # Header value type 7 = string
+    return struct.pack(">B", len(name_bytes)) + name_bytes + struct.pack(">BH", 7, len(value_bytes)) + value_bytes
+
+
+def encode_event(event_type: str, payload: Dict[str, Any]) -> bytes:
+    """
+    One message in the AWS event-stream framing used by ConverseStream:
+    prelude (total length, headers length, CRC32), headers, payload, CRC32.
+    """
+    headers = (
+        _event_header(":event-type", event_type)
+        + _event_header(":content-type", "application/json")
+        + _event_header(":message-type", "event")
+    )
+    body = json.dumps(payload).encode("utf-8")
+    prelude = struct.pack(">II", 16 + len(headers) + len(body), len(headers))
+    message = prelude + struct.pack(">I", zlib.crc32(prelude)) + headers + body
+    return message + struct.pack(">I", zlib.crc32(message))
+
+
+def split_chunks(text: str) -> List[str]:
+    # Word-sized deltas, whitespace kept so the joined text is unchanged
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+def _prompt_from_messages(messages: List[Dict[str, Any]]) -> str:
+    return "\n".join(
+        block.get("text", "")
+        for message in messages
+        for block in message.get("content", [])
+        if isinstance(block, dict)
+    )
+
+
+class FakeBedrockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; avoid delayed-ACK stalls on keep-alive
+    disable_nagle_algorithm = True
+
+    # Set per server by start_fake_bedrock()
+    config: FakeBedrockConfig
+    stats: FakeBedrockStats
+    rng: random.Random
+    state_lock: threading.Lock
+    recent_requests: deque
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload: Any, status: int = 200, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, code: str, message: str):
+        # botocore's rest-json parser reads the error code from this header
+        self._send_json({"message": message}, status=status, headers={"x-amzn-ErrorType": code})
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _sample(self, distribution: LatencyDistribution) -> float:
+        with self.state_lock:
+            return distribution(self.rng)
+
+    def _injected_failure(self) -> Optional[Tuple[int, str]]:
+        """
+        Decides whether this call is throttled or fails, before any latency.
+        """
+        config = self.config
+        with self.state_lock:
+            if config.requests_per_minute:
+                now = time.monotonic()
+                while self.recent_requests and now - self.recent_requests[0] > 60:
+                    self.recent_requests.popleft()
+                if len(self.recent_requests) >= config.requests_per_minute:
+                    return 429, "ThrottlingException"
+                self.recent_requests.append(now)
+
+            roll = self.rng.random()
+        if roll < config.throttle_rate:
+            return 429, "ThrottlingException"
+        if roll < config.throttle_rate + config.error_rate:
+            return 500, "InternalServerException"
+        return None
+
+    def do_GET(self):
+        if self.path == "/_fake/stats":
+            self._send_json(self.stats.snapshot())
+        else:
+            self._send_json({"message": f"Unknown path {self.path}"}, status=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length)
+        path = unquote(self.path.split("?")[0])
+
+        if path == "/_fake/reset":
+            self.stats.reset()
+            self._send_json({"status": "reset"})
+            return
+
+        try:
+            request = json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            self._send_error(400, "ValidationException", "Malformed JSON body")
+            return
+
+        model_match = MODEL_PATH.match(path)
+        retrieve_match = RETRIEVE_PATH.match(path)
+        if model_match:
+            operation = {
+                "converse": "converse",
+                "converse-stream": "converse_stream",
+                "invoke": "invoke_model"
+            }[model_match.group("action")]
+        elif retrieve_match:
+            operation = "retrieve"
+        else:
+            self._send_json({"message": f"Unknown path {self.path}"}, status=404)
+            return
+
+        failure = self._injected_failure()
+        if failure:
+            status, code = failure
+            self.stats.record(operation, "throttled" if status == 429 else "errors")
+            self._send_error(status, code, f"Injected {code}")
+            return
+
+        if operation == "retrieve":
+            self._retrieve(request)
+        elif operation == "converse":
+            self._converse(request)
+        elif operation == "converse_stream":
+            self._converse_stream(request)
+        else:
+            self._invoke_model(request, model_match.group("model_id"))
+
+    def _retrieve(self, request: Dict[str, Any]):
+        time.sleep(self._sample(self.config.retrieve_latency))
+        query = request.get("retrievalQuery", {}).get("text", "")
+        top_k = request.get("retrievalConfiguration", {}).get("vectorSearchConfiguration", {}).get("numberOfResults", 5)
+        documents = self.config.script.documents(query, top_k)
+        self.stats.record("retrieve", input_tokens=count_tokens(query))
+        self._send_json({
+            "retrievalResults": [
+                {
+                    "content": {"text": text},
+                    "score": round(0.9 - 0.05 * rank, 4),
+                    "location": {"type": "S3", "s3Location": {"uri": f"s3://fake-kb/doc-{rank}.txt"}}
+                }
+                for rank, text in enumerate(documents)
+            ]
+        })
+
+    def _converse(self, request: Dict[str, Any]):
+        start = time.monotonic()
+        time.sleep(self._sample(self.config.latency))
+        prompt = _prompt_from_messages(request.get("messages", []))
+        tools = request.get("toolConfig", {}).get("tools", [])
+        tool_input = self.config.script.tool_input(prompt) if tools else None
+
+        if tool_input is not None:
+            text = json.dumps(tool_input)
+            content = [{"toolUse": {
+                "toolUseId": f"tooluse_{self._sample(lambda rng: rng.getrandbits(32)):08x}",
+                "name": tools[0]["toolSpec"]["name"],
+                "input": tool_input
+            }}]
+            stop_reason = "tool_use"
+        else:
+            text = self.config.script.completion(prompt)
+            content = [{"text": text}]
+            stop_reason = "end_turn"
+
+        input_tokens, output_tokens = count_tokens(prompt), count_tokens(text)
+        self.stats.record("converse", input_tokens=input_tokens, output_tokens=output_tokens)
+        self._send_json({
+            "output": {"message": {"role": "assistant", "content": content}},
+            "stopReason": stop_reason,
+            "usage": {"inputTokens": input_tokens, "outputTokens": output_tokens, "totalTokens": input_tokens + output_tokens},
+            "metrics": {"latencyMs": int((time.monotonic() - start) * 1000)}
+        })
+
+    def _converse_stream(self, request: Dict[str, Any]):
+        start = time.monotonic()
+        time.sleep(self._sample(self.config.latency))
+        prompt = _prompt_from_messages(request.get("messages", []))
+        text = self.config.script.completion(prompt)
+        input_tokens, output_tokens = count_tokens(prompt), count_tokens(text)
+        self.stats.record("converse_stream", input_tokens=input_tokens, output_tokens=output_tokens)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/vnd.amazon.eventstream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        self._write_chunk(encode_event("messageStart", {"role": "assistant"}))
+        for chunk in split_chunks(text):
+            if self.config.stream_chunk_delay:
+                time.sleep(self.config.stream_chunk_delay)
+            self._write_chunk(encode_event("contentBlockDelta", {"contentBlockIndex": 0, "delta": {"text": chunk}}))
+        self._write_chunk(encode_event("contentBlockStop", {"contentBlockIndex": 0}))
+        self._write_chunk(encode_event("messageStop", {"stopReason": "end_turn"}))
+        self._write_chunk(encode_event("metadata", {
+            "usage": {"inputTokens": input_tokens, "outputTokens": output_tokens, "totalTokens": input_tokens + output_tokens},
+            "metrics": {"latencyMs": int((time.monotonic() - start) * 1000)}
+        }))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _invoke_model(self, request: Dict[str, Any], model_id: str = ""):
+        if "embed" in model_id:
+            self._embed(request)
+            return
+
+        time.sleep(self._sample(self.config.latency))
+
+        if "inputText" in request:
+            prompt = request["inputText"]
+        else:
+            prompt = _prompt_from_messages(request.get("messages", []))
+        text = self.config.script.completion(prompt)
+        input_tokens, output_tokens = count_tokens(prompt), count_tokens(text)
+        self.stats.record("invoke_model", input_tokens=input_tokens, output_tokens=output_tokens)
+
+        # Answer in the native shape of the payload that was sent
+        if "anthropic_version" in request:
+            body = {
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens}
+            }
+        elif "inputText" in request:
+            body = {"results": [{"outputText": text, "tokenCount": output_tokens}]}
+        else:
+            body = {
+                "output": {"message": {"role": "assistant", "content": [{"text": text}]}},
+                "stopReason": "end_turn",
+                "usage": {"inputTokens": input_tokens, "outputTokens": output_tokens}
+            }
+        self._send_json(body)
+
+    def _embed(self, request: Dict[str, Any]):
+        time.sleep(self._sample(self.config.retrieve_latency))
+        text = request.get("inputText", "")
+        tokens = count_tokens(text)
+        self.stats.record("invoke_model", input_tokens=tokens)
+        self._send_json({"embedding": hashed_embedding(text, request.get("dimensions", 1024)), "inputTextTokenCount": tokens})
+
+
+def hashed_embedding(text: str, dimensions: int) -> List[float]:
+    """
+    Deterministic unit vector from hashed words, so texts sharing words are
+    close and local-index recall can be exercised offline.
+    """
+    vector = [0.0] * dimensions
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        digest = zlib.crc32(word.encode("utf-8"))
+        vector[digest % dimensions] += 1.0 if digest & 0x80000000 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+def start_fake_bedrock(
+    host: str = "127.0.0.1",
+    port: int = 0,
+    config: Optional[FakeBedrockConfig] = None
+) -> ThreadingHTTPServer:
+    """
+    Starts the fake server on a background thread and returns it.
+    Use `server.server_address` to build the endpoint URL and
+    `server.stats` to read counters in-process.
+    """
+    config = config or FakeBedrockConfig()
+    stats = FakeBedrockStats()
+    handler = type("FakeBedrockHandler", (FakeBedrockHandler,), {
+        "config": config,
+        "stats": stats,
+        "rng": random.Random(config.seed),
+        "state_lock": threading.Lock(),
+        "recent_requests": deque()
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.stats = stats
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def endpoint_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--script", default=DEFAULT_SCRIPT_PATH, help="JSON file of scripted responses")
+    parser.add_argument("--latency", default="0", help="Model latency spec, e.g. lognormal:0.8,0.4")
+    parser.add_argument("--retrieve-latency", default="0", help="Retrieve latency spec")
+    parser.add_argument("--stream-chunk-delay", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--requests-per-minute", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = start_fake_bedrock(args.host, args.port, FakeBedrockConfig(
+        script=ScriptedResponses.load(args.script),
+        latency=parse_latency(args.latency),
+        retrieve_latency=parse_latency(args.retrieve_latency),
+        stream_chunk_delay=args.stream_chunk_delay,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        requests_per_minute=args.requests_per_minute,
+        seed=args.seed
+    ))
+    print(f"Fake Bedrock listening on {endpoint_url(server)} (stats at {endpoint_url(server)}/_fake/stats)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
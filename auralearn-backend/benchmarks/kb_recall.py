@@ -0,0 +1,210 @@
+"""
+Recall and latency of the local Knowledge Base index.
+
+For each query it compares:
+- local (brute force) against the remote Retrieve API: recall@k of the
+  remote passages, matched by word overlap since the local index is
+  chunked independently of the KB;
+- IVF against brute force, when the index has IVF clusters: recall@k of
+  the exact neighbours;
+and reports per-query latency of the remote call, the query embedding and
+each local index search.
+
+Run from auralearn-backend/ against a real KB and an index built by
+app.services.kb_ingest:
+    python -m benchmarks.kb_recall --queries queries.txt --k 5
+or fully offline, building a throwaway index from the fake server's documents
+plus random filler chunks:
+    python -m benchmarks.kb_recall --fake --filler 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List, Set
+
+from app.aws.bedrock_client import BedrockClient
+from app.aws.client_registry import ClientRegistry
+from app.core.config import settings
+from app.services.kb_ingest import chunk_text, embed_all
+from app.services.vector_index import LocalKnowledgeBase, np
+
+DEFAULT_QUERIES = [
+    "Python programming fundamentals",
+    "REST API design best practices",
+    "SQL joins and indexing",
+    "Docker containers for beginners",
+    "unit testing with pytest",
+    "Git branching workflow",
+    "machine learning model evaluation",
+    "data pipelines for agriculture"
+]
+
+
+def words(text: str) -> Set[str]:
+    return set(text.lower().split())
+
+
+def same_passage(a: str, b: str, threshold: float = 0.8) -> bool:
+    """
+    Whether two chunks cover the same text: at least `threshold` of the
+    smaller one's words appear in the other.
+    """
+    a_words, b_words = words(a), words(b)
+    smaller = min(len(a_words), len(b_words))
+    return smaller > 0 and len(a_words & b_words) / smaller >= threshold
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(percentile(values, 50), 3),
+        "p95_ms": round(percentile(values, 95), 3),
+        "mean_ms": round(statistics.fmean(values), 3) if values else 0.0
+    }
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+async def build_fake_index(bedrock: BedrockClient, path: str, filler: int, seed: int = 0):
+    from benchmarks.fake_bedrock import ScriptedResponses
+
+    script = ScriptedResponses.load()
+    texts = list(script.default_documents)
+    for _, documents in script.retrievals:
+        texts.extend(documents)
+    # Random filler so the index has a realistic number of rows to search
+    rng = random.Random(seed)
+    vocabulary = sorted({word for text in texts for word in text.lower().split()}) or ["filler"]
+    texts.extend(" ".join(rng.choices(vocabulary, k=60)) for _ in range(filler))
+
+    chunks = [
+        {"text": chunk, "location": {"type": "LOCAL", "localLocation": {"path": f"doc-{i}.txt"}}}
+        for i, text in enumerate(texts)
+        for chunk in chunk_text(text)
+    ]
+    vectors = await embed_all(bedrock, [chunk["text"] for chunk in chunks], concurrency=16)
+    meta = {"embedding_model_id": settings.KB_EMBEDDING_MODEL_ID, "kb_id": settings.BEDROCK_KB_ID, "source": "fake"}
+    LocalKnowledgeBase.save(path, chunks, vectors, meta, ivf_lists=0)
+
+
+async def evaluate(bedrock: BedrockClient, index_path: str, queries: List[str], k: int, n_probe: int, remote: bool) -> Dict[str, Any]:
+    brute = LocalKnowledgeBase.load(index_path, "brute")
+    ivf = None
+    if os.path.exists(os.path.join(index_path, "ivf.npz")):
+        ivf = LocalKnowledgeBase.load(index_path, "ivf", n_probe=n_probe)
+
+    remote_recall, ivf_recall = [], []
+    timings: Dict[str, List[float]] = {"remote": [], "embed": [], "brute": [], "ivf": []}
+    for query in queries:
+        start = time.perf_counter()
+        query_vector = np.asarray(await bedrock.embed_text(query), dtype=np.float32)
+        timings["embed"].append((time.perf_counter() - start) * 1000)
+
+        local_results, elapsed = timed(brute.search, query_vector, k)
+        timings["brute"].append(elapsed)
+        local_texts = [result["content"]["text"] for result in local_results]
+
+        if remote:
+            start = time.perf_counter()
+            remote_results = await bedrock.retrieve_from_kb(query, top_k=k)
+            timings["remote"].append((time.perf_counter() - start) * 1000)
+            remote_texts = [result.get("content", {}).get("text", "") for result in remote_results]
+            if remote_texts:
+                found = sum(any(same_passage(text, local) for local in local_texts) for text in remote_texts)
+                remote_recall.append(found / len(remote_texts))
+
+        if ivf is not None:
+            ivf_results, elapsed = timed(ivf.search, query_vector, k)
+            timings["ivf"].append(elapsed)
+            exact = {result["content"]["text"] for result in local_results}
+            if exact:
+                approx = {result["content"]["text"] for result in ivf_results}
+                ivf_recall.append(len(exact & approx) / len(exact))
+
+    report: Dict[str, Any] = {
+        "index": index_path,
+        "chunks": len(brute.chunks),
+        "dimensions": int(brute.vectors.shape[1]),
+        "queries": len(queries),
+        "k": k,
+        "latency": {name: latency_summary(values) for name, values in timings.items() if values}
+    }
+    if remote_recall:
+        report[f"local_vs_remote_recall@{k}"] = round(statistics.fmean(remote_recall), 4)
+    if ivf_recall:
+        report["ivf_probes"] = ivf.index.n_probe
+        report["ivf_lists"] = len(ivf.index.centroids)
+        report[f"ivf_vs_brute_recall@{k}"] = round(statistics.fmean(ivf_recall), 4)
+    return report
+
+
+async def run(args) -> Dict[str, Any]:
+    endpoint_urls = None
+    server = None
+    if args.fake:
+        from benchmarks.fake_bedrock import endpoint_url, start_fake_bedrock
+
+        server = start_fake_bedrock()
+        url = endpoint_url(server)
+        endpoint_urls = {"bedrock-runtime": url, "bedrock-agent-runtime": url}
+        settings.BEDROCK_KB_ID = settings.BEDROCK_KB_ID or "FAKEKB0001"
+
+    registry = ClientRegistry(endpoint_urls=endpoint_urls)
+    bedrock = BedrockClient(registry)
+    try:
+        if args.queries:
+            with open(args.queries, encoding="utf-8") as f:
+                queries = [line.strip() for line in f if line.strip()]
+        else:
+            queries = DEFAULT_QUERIES
+
+        if args.fake:
+            with tempfile.TemporaryDirectory() as index_path:
+                await build_fake_index(bedrock, index_path, args.filler)
+                return await evaluate(bedrock, index_path, queries, args.k, args.n_probe, remote=True)
+        return await evaluate(bedrock, args.index, queries, args.k, args.n_probe, remote=not args.no_remote)
+    finally:
+        await registry.close()
+        if server is not None:
+            server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index", default=settings.KB_LOCAL_INDEX_PATH, help="Index directory from app.services.kb_ingest")
+    parser.add_argument("--queries", help="File of queries, one per line (a built-in set otherwise)")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--n-probe", type=int, default=settings.KB_LOCAL_IVF_PROBES, help="IVF clusters probed per query")
+    parser.add_argument("--no-remote", action="store_true", help="Skip the remote KB comparison")
+    parser.add_argument("--fake", action="store_true", help="Run against the fake Bedrock server with a throwaway index")
+    parser.add_argument("--filler", type=int, default=1000, help="Random filler chunks in the --fake index")
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    if args.fake:
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "fake")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "fake")
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+End-to-end benchmark for the agent pipeline.
+
+Drives /orchestrate, /refine, /learn and /chat through the FastAPI app
+against the fake Bedrock server with fixed latencies. For each scenario it
+runs N concurrent users in a closed loop and reports p50/p95/p99 latency,
+throughput, and Bedrock calls and prompt tokens per request (from the fake
+server's counters). Results are written as JSON with stable keys so runs
+can be diffed between commits; --compare prints the change against an
+earlier result file.
+
+Run from auralearn-backend/:
+    python -m benchmarks.pipeline --users 10 --requests-per-user 5 --output results.json
+    python -m benchmarks.pipeline --compare results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "fake")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "fake")
+os.environ.setdefault("BEDROCK_MODEL_ID", "amazon.nova-lite-v1:0")
+os.environ.setdefault("BEDROCK_KB_ID", "FAKEKB0001")
+# Every request must reach the fake, not the response/retrieval caches
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+os.environ.setdefault("KB_CACHE_ENABLED", "false")
+os.environ.setdefault("REQUEST_COALESCING_ENABLED", "false")
+# The fake never throttles unless asked to, so don't cap concurrency client-side
+os.environ.setdefault("BEDROCK_MAX_CONCURRENCY", "1000")
+
+import httpx
+
+from app.aws.bedrock_client import BedrockClient
+from app.aws.client_registry import ClientRegistry
+from app.aws.kb_client import KnowledgeBaseClient
+from app.memory.state import MemorySessionStore
+from app.utils.singleflight import SingleFlight
+from app.main import app
+from benchmarks.fake_bedrock import FakeBedrockConfig, endpoint_url, parse_latency, start_fake_bedrock
+
+REFINE_PATH = {
+    "status": "success",
+    "learning_path": {
+        "foundation": ["Python", "Git"],
+        "intermediate": ["REST APIs", "SQL"],
+        "advanced": ["Docker", "Unit Testing"]
+    }
+}
+
+
+def orchestrate_request(i: int) -> Dict[str, Any]:
+    return {"method": "POST", "url": "/orchestrate", "json": {"user_input": f"I want to become a backend developer ({i})", "verbose": False}}
+
+
+def refine_request(i: int) -> Dict[str, Any]:
+    return {
+        "method": "POST",
+        "url": "/refine",
+        "json": {
+            "original_path": REFINE_PATH,
+            "feedback": {
+                "skill_feedback": {"Git": "already_known", "Docker": "want_more"},
+                "general_feedback": f"More practical projects please ({i})"
+            },
+            "original_goal": "Become a backend developer"
+        }
+    }
+
+
+def learn_request(i: int) -> Dict[str, Any]:
+    return {"method": "POST", "url": "/learn", "json": {"skill": f"REST APIs ({i})", "user_level": "Beginner"}}
+
+
+def chat_request(i: int) -> Dict[str, Any]:
+    return {"method": "POST", "url": "/chat", "json": {"message": f"How do I design a REST endpoint? ({i})", "skill_context": "REST APIs"}}
+
+
+SCENARIOS: Dict[str, Callable[[int], Dict[str, Any]]] = {
+    "orchestrate": orchestrate_request,
+    "refine": refine_request,
+    "learn": learn_request,
+    "chat": chat_request
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    server,
+    build_request: Callable[[int], Dict[str, Any]],
+    users: int,
+    requests_per_user: int
+) -> Dict[str, Any]:
+    # One untimed request so client creation and capability lookup aren't measured
+    await client.request(**build_request(-1))
+    server.stats.reset()
+
+    latencies: List[float] = []
+    failures = 0
+    response_bytes = 0
+
+    async def user(user_index: int):
+        nonlocal failures, response_bytes
+        for n in range(requests_per_user):
+            start = time.perf_counter()
+            response = await client.request(**build_request(user_index * requests_per_user + n))
+            latencies.append((time.perf_counter() - start) * 1000)
+            response_bytes += len(response.content)
+            if response.status_code != 200 or response.json().get("status") == "error":
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[user(i) for i in range(users)])
+    elapsed = time.perf_counter() - start
+
+    total = len(latencies)
+    latencies.sort()
+    bedrock = server.stats.snapshot()
+    totals = bedrock["totals"]
+    return {
+        "requests": total,
+        "failures": failures,
+        "wall_time_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2)
+        },
+        "bedrock_calls_per_request": round(totals.get("calls", 0) / total, 2),
+        "prompt_tokens_per_request": round(totals.get("input_tokens", 0) / total, 1),
+        "output_tokens_per_request": round(totals.get("output_tokens", 0) / total, 1),
+        "response_bytes_per_request": round(response_bytes / total),
+        "bedrock_calls_by_operation": {
+            name: counters["calls"] for name, counters in sorted(bedrock["operations"].items())
+        }
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> Dict[str, Any]:
+    server = start_fake_bedrock(config=FakeBedrockConfig(
+        latency=parse_latency(str(args.latency)),
+        retrieve_latency=parse_latency(str(args.retrieve_latency)),
+        seed=0
+    ))
+    url = endpoint_url(server)
+    registry = ClientRegistry(
+        max_pool_connections=max(args.users * 4, 10),
+        endpoint_urls={"bedrock-runtime": url, "bedrock-agent-runtime": url}
+    )
+
+    # Wire the app state the way the lifespan does, but against the fake
+    app.state.bedrock = BedrockClient(registry)
+    app.state.kb = KnowledgeBaseClient(app.state.bedrock)
+    app.state.sessions = MemorySessionStore()
+    app.state.orchestrations = SingleFlight("orchestrate")
+    app.state.learn_modules = SingleFlight("learn")
+    # Every /learn must reach the fake, not the precomputed catalogue
+    app.state.learn_catalogue = None
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for name in args.scenarios:
+                print(f"[Benchmark] {name}: {args.users} users x {args.requests_per_user} requests")
+                results[name] = await run_scenario(client, server, SCENARIOS[name], args.users, args.requests_per_user)
+    finally:
+        await registry.close()
+        server.shutdown()
+
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            "users": args.users,
+            "requests_per_user": args.requests_per_user,
+            "model_latency_s": args.latency,
+            "retrieve_latency_s": args.retrieve_latency,
+            "model_id": os.environ["BEDROCK_MODEL_ID"]
+        },
+        "scenarios": results
+    }
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    def delta(name: str, value: float, pick: Callable[[Dict[str, Any]], float]) -> str:
+        if not baseline or name not in baseline.get("scenarios", {}):
+            return ""
+        previous = pick(baseline["scenarios"][name])
+        if not previous:
+            return ""
+        return f" ({(value - previous) / previous * 100:+.0f}%)"
+
+    header = f"{'scenario':<12}{'p50 ms':>16}{'p95 ms':>16}{'p99 ms':>16}{'req/s':>16}{'calls/req':>16}{'tokens/req':>18}"
+    print(header)
+    for name, result in report["scenarios"].items():
+        latency = result["latency_ms"]
+        row = [
+            f"{latency['p50']:.1f}{delta(name, latency['p50'], lambda r: r['latency_ms']['p50'])}",
+            f"{latency['p95']:.1f}{delta(name, latency['p95'], lambda r: r['latency_ms']['p95'])}",
+            f"{latency['p99']:.1f}{delta(name, latency['p99'], lambda r: r['latency_ms']['p99'])}",
+            f"{result['throughput_rps']:.1f}{delta(name, result['throughput_rps'], lambda r: r['throughput_rps'])}",
+            f"{result['bedrock_calls_per_request']:g}{delta(name, result['bedrock_calls_per_request'], lambda r: r['bedrock_calls_per_request'])}",
+            f"{result['prompt_tokens_per_request']:g}{delta(name, result['prompt_tokens_per_request'], lambda r: r['prompt_tokens_per_request'])}"
+        ]
+        print(f"{name:<12}" + "".join(f"{cell:>16}" for cell in row[:-1]) + f"{row[-1]:>18}")
+        if result["failures"]:
+            print(f"{'':<12}{result['failures']} of {result['requests']} requests failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--users", type=int, default=10, help="Concurrent users per scenario")
+    parser.add_argument("--requests-per-user", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="Fixed model latency (s)")
+    parser.add_argument("--retrieve-latency", type=float, default=0.02, help="Fixed retrieve latency (s)")
+    parser.add_argument("--output", help="Write the JSON results here")
+    parser.add_argument("--compare", help="Earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"[Benchmark] Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
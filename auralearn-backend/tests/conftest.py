@@ -0,0 +1,42 @@
+"""
+Shared setup for the test suite (run from auralearn-backend/: python -m pytest).
+
+Settings are read at import time, so the environment is pinned here before
+any app module loads: fake AWS credentials, no response or retrieval
+caches, and local databases in a throwaway directory. Async code runs
+through asyncio.run inside plain tests.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "fake")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "fake")
+os.environ.setdefault("BEDROCK_MODEL_ID", "amazon.nova-lite-v1:0")
+os.environ.setdefault("BEDROCK_KB_ID", "FAKEKB0001")
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+os.environ.setdefault("KB_CACHE_ENABLED", "false")
+os.environ.setdefault("BEDROCK_RETRY_BASE_DELAY_SECONDS", "0")
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="auralearn-tests-"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_bedrock import FakeBedrockConfig, endpoint_url, start_fake_bedrock
+
+
+@pytest.fixture
+def fake_bedrock():
+    """
+    A fake Bedrock server with default (instant) responses; tests that need
+    throttling or latency start their own with a FakeBedrockConfig.
+    """
+    server = start_fake_bedrock(config=FakeBedrockConfig(seed=0))
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def fake_bedrock_url(fake_bedrock) -> str:
+    return endpoint_url(fake_bedrock)
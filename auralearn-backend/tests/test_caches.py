@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+from app.aws.response_cache import ResponseCache, SQLiteResponseStore
+from app.utils.cache import TTLCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache(max_entries=10, ttl_seconds=5)
+    cache.set("a", 1)
+    now[0] += 4
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+
+def test_empty_ttl_cache_is_falsy():
+    # Callers must test injected caches with `is not None`
+    assert not TTLCache()
+
+
+def test_sqlite_store_evicts_least_recently_used(tmp_path):
+    async def scenario():
+        store = SQLiteResponseStore(str(tmp_path / "responses.db"), max_entries=2, access_flush_batch=100)
+        await store.set("a", "1")
+        await asyncio.sleep(0.01)
+        await store.set("b", "2")
+        await asyncio.sleep(0.01)
+        # Read access is buffered, but must count before the next eviction
+        assert await store.get("a") == "1"
+        await store.set("c", "3")
+        assert await store.get("b") is None
+        assert (await store.get("a"), await store.get("c")) == ("1", "3")
+        assert (await store.stats())["entries"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_store_expires_entries(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+
+    async def scenario():
+        store = SQLiteResponseStore(str(tmp_path / "responses.db"), ttl_seconds=5)
+        await store.set("a", "1")
+        now[0] += 6
+        assert await store.get("a") is None
+        assert (await store.stats())["entries"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_sqlite_store_persists_across_instances(tmp_path):
+    path = str(tmp_path / "data" / "responses.db")
+
+    async def scenario():
+        await SQLiteResponseStore(path).set("a", "1")
+        return await SQLiteResponseStore(path).get("a")
+
+    assert asyncio.run(scenario()) == "1"
+
+
+def test_response_cache_promotes_disk_hits(tmp_path):
+    async def scenario():
+        disk = SQLiteResponseStore(str(tmp_path / "responses.db"))
+        await disk.set("a", "1")
+        cache = ResponseCache(TTLCache(max_entries=4), disk)
+        assert await cache.get("a") == "1"
+        assert cache.memory.get("a") == "1"
+        assert (await cache.stats())["disk"]["hits"] == 1
+
+        await cache.clear()
+        assert await cache.get("a") is None
+        assert (await cache.stats())["disk"]["entries"] == 0
+
+    asyncio.run(scenario())
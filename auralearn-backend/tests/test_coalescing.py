@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from benchmarks.fake_bedrock import FakeBedrockConfig, endpoint_url, parse_latency, start_fake_bedrock
+from tests.test_pipeline import GOAL, app_client
+
+
+@pytest.fixture
+def slow_bedrock():
+    # Slow enough that concurrent requests overlap
+    server = start_fake_bedrock(config=FakeBedrockConfig(latency=parse_latency("0.1"), seed=0))
+    yield server
+    server.shutdown()
+
+
+def model_calls(server) -> int:
+    return server.stats.snapshot()["operations"].get("converse", {}).get("calls", 0)
+
+
+def post_concurrently(url: str, path: str, bodies):
+    async def scenario():
+        async with app_client(url) as client:
+            return await asyncio.gather(*(client.post(path, json=body) for body in bodies))
+    return asyncio.run(scenario())
+
+
+def test_identical_orchestrations_share_one_run(slow_bedrock):
+    url = endpoint_url(slow_bedrock)
+    post_concurrently(url, "/orchestrate", [{"user_input": GOAL}])
+    single_run = model_calls(slow_bedrock)
+
+    # Same goal up to case and whitespace
+    responses = post_concurrently(url, "/orchestrate", [{"user_input": GOAL}, {"user_input": f"  {GOAL.upper()} "}])
+    assert [response.status_code for response in responses] == [200, 200]
+    assert model_calls(slow_bedrock) == 2 * single_run
+    first, second = (response.json() for response in responses)
+    assert first["learning_plan"] == second["learning_plan"]
+    # Each request still gets its own session
+    assert first["session_id"] != second["session_id"]
+
+
+def test_different_domains_are_not_coalesced(slow_bedrock):
+    responses = post_concurrently(endpoint_url(slow_bedrock), "/orchestrate", [
+        {"user_input": GOAL, "domains": ["health"]},
+        {"user_input": GOAL, "domains": ["finance"]}
+    ])
+    assert [set(response.json()["cross_domain_impact"]) for response in responses] == [{"health"}, {"finance"}]
+
+
+def test_identical_learn_requests_share_one_generation(slow_bedrock):
+    body = {"skill": "Python", "user_level": "Beginner"}
+    responses = post_concurrently(endpoint_url(slow_bedrock), "/learn", [body, dict(body, skill="python")])
+    assert [response.status_code for response in responses] == [200, 200]
+    assert model_calls(slow_bedrock) == 1
+    assert responses[0].json()["content"] == responses[1].json()["content"]
+
+
+def test_coalescing_can_be_disabled(slow_bedrock, monkeypatch):
+    monkeypatch.setattr(settings, "REQUEST_COALESCING_ENABLED", False)
+    body = {"skill": "Python", "user_level": "Beginner"}
+    post_concurrently(endpoint_url(slow_bedrock), "/learn", [body, body])
+    assert model_calls(slow_bedrock) == 2
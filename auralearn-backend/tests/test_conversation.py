@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+from app.memory.conversation import SUMMARY_CONTEXT_KEY, ConversationMemory
+from app.memory.state import MemorySessionStore
+
+
+class StubSummariser:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = []
+
+    async def generate_text(self, prompt: str, model_id=None, max_tokens=None) -> str:
+        self.calls.append({"prompt": prompt, "model_id": model_id, "max_tokens": max_tokens})
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return f"summary {len(self.calls)}"
+
+
+class RecordingStore(MemorySessionStore):
+    def __init__(self):
+        super().__init__()
+        self.offsets = []
+
+    async def history(self, session_id, limit=None, offset=0):
+        self.offsets.append(offset)
+        return await super().history(session_id, limit, offset)
+
+
+async def session_with_turns(store, count: int, words: int = 20) -> str:
+    session_id = await store.create_session("goal")
+    for i in range(count):
+        await store.append_turn(session_id, "user" if i % 2 == 0 else "assistant", f"turn {i} " + "word " * words)
+    return session_id
+
+
+def test_history_within_budget_is_verbatim():
+    async def scenario():
+        store = MemorySessionStore()
+        session_id = await session_with_turns(store, 2, words=2)
+        bedrock = StubSummariser()
+        history = await ConversationMemory(bedrock, store, token_budget=500).history(session_id)
+        return history, bedrock.calls
+
+    history, calls = asyncio.run(scenario())
+    assert "turn 0" in history and "turn 1" in history
+    assert "Summary" not in history
+    assert calls == []
+
+
+def test_older_turns_are_folded_into_a_cached_summary():
+    async def scenario():
+        store = RecordingStore()
+        session_id = await session_with_turns(store, 12)
+        bedrock = StubSummariser()
+        memory = ConversationMemory(bedrock, store, token_budget=200, summary_model_id="cheap-model")
+
+        history = await memory.history(session_id)
+        state = json.loads(await store.get_context(session_id, SUMMARY_CONTEXT_KEY))
+        again = await memory.history(session_id)
+        return history, again, state, bedrock.calls, store.offsets
+
+    history, again, state, calls, offsets = asyncio.run(scenario())
+    assert history.startswith("Summary of earlier conversation: summary 1")
+    assert "turn 11" in history and "turn 0 " not in history
+    assert len(calls) == 1
+    assert calls[0]["model_id"] == "cheap-model"
+    assert "turn 0" in calls[0]["prompt"]
+    # The second call reuses the summary and loads only the unsummarised turns
+    assert again == history
+    assert offsets == [0, state["covered"]]
+    assert 0 < state["covered"] < 12
+
+
+def test_failed_summary_drops_older_turns_instead_of_overflowing():
+    async def scenario():
+        store = MemorySessionStore()
+        session_id = await session_with_turns(store, 12)
+        memory = ConversationMemory(StubSummariser(fail=True), store, token_budget=200)
+        return await memory.history(session_id), await store.get_context(session_id, SUMMARY_CONTEXT_KEY)
+
+    history, state = asyncio.run(scenario())
+    assert "turn 11" in history and "turn 0 " not in history
+    assert len(history) // 4 <= 200
+    assert state is None
+
+
+def test_trim_keeps_the_newest_lines():
+    memory = ConversationMemory(StubSummariser(), MemorySessionStore(), token_budget=10)
+    trimmed = memory.trim("\n".join(f"line {i} padding" for i in range(20)))
+    assert trimmed.startswith("(Earlier conversation omitted.)")
+    assert trimmed.endswith("line 19 padding")
+    assert "line 0 " not in trimmed
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from typing import Dict, List
+
+from app.agents.cross_domain_agent import CrossDomainAgent
+from app.services.domain_registry import get_domain_registry
+
+LEARNING_PATH = {"foundation": ["Python"], "intermediate": ["SQL"], "advanced": ["Docker"]}
+DOMAINS = ["health", "finance", "agriculture"]
+
+
+def domain_of(text: str) -> str:
+    return next(domain for domain in DOMAINS if domain in text.lower())
+
+
+class StubKB:
+    """
+    Returns one document per query after a per-domain delay.
+    """
+
+    def __init__(self, delays: Dict[str, float] = None):
+        self.delays = delays or {}
+
+    async def search_many(self, queries: List[str], top_k: int = 5, timeout=None, max_concurrency=None, semaphore=None):
+        async def one(query: str):
+            await asyncio.sleep(self.delays.get(domain_of(query), 0))
+            return [{"content": f"Reference material for {domain_of(query)}.", "score": 0.9}]
+        return dict(zip(queries, await asyncio.gather(*(one(query) for query in queries))))
+
+
+class StubBedrock:
+    """
+    Answers per-domain prompts after a per-domain delay and records when
+    each generation started.
+    """
+
+    def __init__(self, delays: Dict[str, float] = None, batched_reply: str = None, batched_delay: float = 0):
+        self.delays = delays or {}
+        self.batched_reply = batched_reply
+        self.batched_delay = batched_delay
+        self.started: Dict[str, float] = {}
+
+    async def generate_text(self, prompt: str) -> str:
+        if "DOMAINS:" in prompt:
+            await asyncio.sleep(self.batched_delay)
+            return self.batched_reply
+        domain = domain_of(prompt)
+        self.started[domain] = time.monotonic()
+        await asyncio.sleep(self.delays.get(domain, 0))
+        return f"Applied to {domain}."
+
+
+def make_agent(bedrock, kb, batched: bool, timeout: float = 1.0) -> CrossDomainAgent:
+    agent = CrossDomainAgent(bedrock, kb, registry=get_domain_registry())
+    agent.batched = batched
+    agent.domain_timeout = timeout
+    return agent
+
+
+def test_slow_domain_generation_falls_back_on_timeout():
+    bedrock = StubBedrock(delays={"finance": 5})
+    agent = make_agent(bedrock, StubKB(), batched=False, timeout=0.1)
+
+    started = time.monotonic()
+    results = asyncio.run(agent.run(LEARNING_PATH))
+    assert time.monotonic() - started < 1
+    assert results == {
+        "health": "Applied to health.",
+        "finance": "Skills can be applied to finance sector.",
+        "agriculture": "Applied to agriculture."
+    }
+
+
+def test_generation_starts_when_its_own_context_arrives():
+    bedrock = StubBedrock()
+    agent = make_agent(bedrock, StubKB(delays={"agriculture": 0.3}), batched=False)
+
+    async def scenario():
+        started = time.monotonic()
+        await agent.run(LEARNING_PATH)
+        return started
+
+    started = asyncio.run(scenario())
+    assert bedrock.started["health"] - started < 0.2
+    assert bedrock.started["agriculture"] - started >= 0.3
+
+
+def test_slow_batched_generation_falls_back_on_timeout():
+    bedrock = StubBedrock(batched_reply="{}", batched_delay=5)
+    agent = make_agent(bedrock, StubKB(), batched=True, timeout=0.1)
+
+    started = time.monotonic()
+    results = asyncio.run(agent.run(LEARNING_PATH))
+    assert time.monotonic() - started < 1
+    assert results == {domain: f"Skills can be applied to {domain} sector." for domain in DOMAINS}
+
+
+def test_batched_answer_is_used_for_every_domain_it_covers():
+    reply = '{"health": "Batched health.", "finance": "Batched finance.", "agriculture": "Batched agriculture."}'
+    bedrock = StubBedrock(batched_reply=reply)
+    agent = make_agent(bedrock, StubKB(), batched=True)
+
+    results = asyncio.run(agent.run(LEARNING_PATH))
+    assert results == {domain: f"Batched {domain}." for domain in DOMAINS}
+    assert bedrock.started == {}
+
+
+def test_domains_missing_from_the_batched_answer_are_generated_individually():
+    bedrock = StubBedrock(batched_reply='{"health": "Batched health.", "finance": ""}')
+    agent = make_agent(bedrock, StubKB(), batched=True)
+
+    results = asyncio.run(agent.run(LEARNING_PATH))
+    assert results == {
+        "health": "Batched health.",
+        "finance": "Applied to finance.",
+        "agriculture": "Applied to agriculture."
+    }
+    assert set(bedrock.started) == {"finance", "agriculture"}
+
+
+def test_invalid_batched_answer_falls_back_per_domain():
+    bedrock = StubBedrock(batched_reply="not json")
+    agent = make_agent(bedrock, StubKB(), batched=True)
+
+    results = asyncio.run(agent.run(LEARNING_PATH))
+    assert results == {domain: f"Applied to {domain}." for domain in DOMAINS}
@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+import pytest
+
+from app.agents.cross_domain_agent import CrossDomainAgent
+from app.services.domain_registry import DomainRegistry, DomainSpec
+from tests.test_cross_domain import LEARNING_PATH, StubBedrock, StubKB
+from tests.test_pipeline import app_client
+
+
+def make_registry() -> DomainRegistry:
+    return DomainRegistry([
+        DomainSpec("finance", priority=20),
+        DomainSpec("health", priority=30),
+        DomainSpec("agriculture", priority=10),
+        DomainSpec("retail", enabled=False)
+    ])
+
+
+def test_enabled_domains_in_priority_order():
+    assert [spec.name for spec in make_registry().select()] == ["health", "finance", "agriculture"]
+
+
+def test_select_keeps_priority_order_and_rejects_unknown_or_disabled():
+    registry = make_registry()
+    assert [spec.name for spec in registry.select(["agriculture", "health"])] == ["health", "agriculture"]
+    for names in (["energy"], ["retail"]):
+        with pytest.raises(ValueError):
+            registry.select(names)
+
+
+def test_duplicate_domains_are_rejected():
+    with pytest.raises(ValueError):
+        DomainRegistry([DomainSpec("health"), DomainSpec("health")])
+
+
+def test_load_from_json(tmp_path):
+    path = tmp_path / "domains.json"
+    path.write_text(json.dumps([
+        {"name": "energy", "query_template": "energy grid {skills}", "priority": 5},
+        {"name": "retail", "enabled": False}
+    ]))
+
+    registry = DomainRegistry.load(str(path))
+    assert registry.describe() == [
+        {"name": "energy", "enabled": True, "priority": 5},
+        {"name": "retail", "enabled": False, "priority": 0}
+    ]
+    assert registry.select()[0].query(["Python", "SQL"]) == "energy grid Python SQL"
+
+
+def test_agent_runs_only_the_selected_domains():
+    agent = CrossDomainAgent(StubBedrock(), StubKB(), registry=make_registry())
+    agent.batched = False
+
+    results = asyncio.run(agent.run(LEARNING_PATH, domains=["finance"]))
+    assert results == {"finance": "Applied to finance."}
+
+
+def test_unknown_domain_is_rejected_before_orchestration(fake_bedrock, fake_bedrock_url):
+    async def scenario():
+        async with app_client(fake_bedrock_url) as client:
+            return await client.post("/orchestrate", json={"user_input": "learn data science", "domains": ["energy"]})
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 400
+    assert "energy" in response.json()["detail"]
+    assert fake_bedrock.stats.snapshot()["totals"].get("calls", 0) == 0
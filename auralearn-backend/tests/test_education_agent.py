@@ -0,0 +1,92 @@
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from app.agents.education_agent import EducationAgent
+from app.aws.errors import BedrockStructuredOutputError
+
+GOAL_CONTEXT = {"raw_input": "I want to become a backend developer"}
+DOCUMENTS = [{"content": "Backend developers use Python, SQL and Docker.", "score": 0.9, "source": {}}]
+
+
+class StubKB:
+    def __init__(self, documents: List[Dict[str, Any]] = DOCUMENTS):
+        self.documents = documents
+
+    async def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        return [dict(doc) for doc in self.documents]
+
+
+class StubBedrock:
+    """
+    Answers the structured call with `structured` (or raises it when it is
+    an exception) and the two-call prompts with fixed text; records calls.
+    """
+
+    def __init__(self, structured: Any = None, supports_structured: bool = True):
+        self.structured = structured
+        self.supports_structured = supports_structured
+        self.calls: List[str] = []
+
+    def supports_structured_output(self) -> bool:
+        return self.supports_structured
+
+    async def generate_structured(self, prompt: str, tool_name: str, description: str, input_schema: Dict[str, Any]) -> Dict[str, Any]:
+        self.calls.append("structured")
+        if isinstance(self.structured, Exception):
+            raise self.structured
+        return self.structured
+
+    async def generate_text(self, prompt: str) -> str:
+        if "comma-separated list of skills" in prompt:
+            self.calls.append("extract")
+            return "Python, SQL, Docker"
+        self.calls.append("structure")
+        return json.dumps({"foundation": ["Python"], "intermediate": ["SQL"], "advanced": ["Docker"]})
+
+
+def run_agent(bedrock: StubBedrock, kb: StubKB = None) -> Dict[str, Any]:
+    return asyncio.run(EducationAgent(bedrock, kb or StubKB()).run(GOAL_CONTEXT))
+
+
+def test_single_structured_call_extracts_and_stages_skills():
+    bedrock = StubBedrock(structured={
+        "relevant": True,
+        "skills": ["Python", "SQL", "Python", " Docker "],
+        "foundation": ["Python"],
+        "intermediate": ["SQL", "Kubernetes"],
+        "advanced": ["Docker"]
+    })
+
+    result = run_agent(bedrock)
+    assert bedrock.calls == ["structured"]
+    assert result["status"] == "success"
+    assert result["skills_identified"] == ["Python", "SQL", "Docker"]
+    # Stages only keep skills the model extracted
+    assert result["learning_path"] == {"foundation": ["Python"], "intermediate": ["SQL"], "advanced": ["Docker"]}
+
+
+def test_irrelevant_content_stops_after_the_structured_call():
+    bedrock = StubBedrock(structured={"relevant": False, "skills": [], "foundation": [], "intermediate": [], "advanced": []})
+
+    result = run_agent(bedrock)
+    assert bedrock.calls == ["structured"]
+    assert result["status"] == "insufficient_knowledge"
+
+
+def test_structured_output_errors_fall_back_to_two_calls():
+    for structured in (BedrockStructuredOutputError("no tool call"), {"relevant": "yes", "skills": "Python"}):
+        bedrock = StubBedrock(structured=structured)
+
+        result = run_agent(bedrock)
+        assert bedrock.calls == ["structured", "extract", "structure"]
+        assert result["status"] == "success"
+        assert result["learning_path"] == {"foundation": ["Python"], "intermediate": ["SQL"], "advanced": ["Docker"]}
+
+
+def test_models_without_tool_use_use_two_calls():
+    bedrock = StubBedrock(supports_structured=False)
+
+    result = run_agent(bedrock)
+    assert bedrock.calls == ["extract", "structure"]
+    assert result["status"] == "success"
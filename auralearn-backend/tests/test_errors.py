@@ -0,0 +1,85 @@
+import asyncio
+
+import httpx
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError, ParamValidationError, ReadTimeoutError
+
+from app.aws.errors import (
+    BedrockError,
+    BedrockRequestError,
+    BedrockThrottledError,
+    BedrockTimeoutError,
+    BedrockUnavailableError,
+    classify_error
+)
+from app.main import app
+from app.memory.state import MemorySessionStore
+from app.utils.singleflight import SingleFlight
+
+
+def client_error(code: str, status: int = 400) -> ClientError:
+    return ClientError(
+        {"Error": {"Code": code, "Message": f"{code} happened"}, "ResponseMetadata": {"HTTPStatusCode": status}},
+        "Converse"
+    )
+
+
+@pytest.mark.parametrize("exc, expected", [
+    (client_error("ThrottlingException", 429), BedrockThrottledError),
+    (client_error("TooManyRequestsException"), BedrockThrottledError),
+    (client_error("SomethingNew", 429), BedrockThrottledError),
+    (client_error("ServiceQuotaExceededException"), BedrockRequestError),
+    (client_error("ModelTimeoutException", 408), BedrockTimeoutError),
+    (client_error("ModelNotReadyException", 429), BedrockUnavailableError),
+    (client_error("InternalServerException", 500), BedrockUnavailableError),
+    (client_error("SomethingNew", 503), BedrockUnavailableError),
+    (client_error("ValidationException"), BedrockRequestError),
+    (client_error("AccessDeniedException", 403), BedrockRequestError),
+    (ParamValidationError(report="bad"), BedrockRequestError),
+    (ReadTimeoutError(endpoint_url="http://bedrock"), BedrockTimeoutError),
+    (EndpointConnectionError(endpoint_url="http://bedrock"), BedrockUnavailableError),
+    (RuntimeError("boom"), BedrockError)
+])
+def test_classify_error(exc, expected):
+    error = classify_error(exc)
+    assert type(error) is expected
+    # Hard quotas are not retried; waiting doesn't help
+    assert error.retryable == (expected in (BedrockThrottledError, BedrockTimeoutError, BedrockUnavailableError))
+
+
+def test_classify_error_keeps_the_code():
+    assert classify_error(client_error("ValidationException")).code == "ValidationException"
+    error = BedrockThrottledError("slow down")
+    assert classify_error(error) is error
+
+
+class FailingBedrock:
+    def __init__(self, error: BedrockError):
+        self.error = error
+
+    async def generate_text(self, prompt: str, use_cache: bool = True) -> str:
+        raise self.error
+
+
+@pytest.mark.parametrize("error, status", [
+    (BedrockThrottledError("slow down"), 429),
+    (BedrockUnavailableError("down"), 503),
+    (BedrockRequestError("quota", "ServiceQuotaExceededException"), 502)
+])
+def test_learn_and_chat_surface_bedrock_errors(error, status):
+    app.state.bedrock = FailingBedrock(error)
+    app.state.sessions = MemorySessionStore()
+    app.state.learn_modules = SingleFlight("learn")
+    app.state.learn_catalogue = None
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return (
+                await client.post("/learn", json={"skill": "Python"}),
+                await client.post("/chat", json={"message": "What is a list?"})
+            )
+
+    for response in asyncio.run(scenario()):
+        assert response.status_code == status
+        assert response.json()["error_type"] == type(error).__name__
+        assert ("Retry-After" in response.headers) == error.retryable
@@ -0,0 +1,25 @@
+import asyncio
+
+from app.agents.explainability import ExplainabilityAgent
+from app.aws.bedrock_client import BedrockClient
+from app.aws.client_registry import ClientRegistry
+from app.aws.response_cache import ResponseCache
+from app.utils.cache import TTLCache
+
+
+def test_repeated_explanations_are_served_from_the_response_cache(fake_bedrock, fake_bedrock_url):
+    async def scenario():
+        registry = ClientRegistry(endpoint_urls={"bedrock-runtime": fake_bedrock_url})
+        agent = ExplainabilityAgent(BedrockClient(registry, cache=ResponseCache(TTLCache(max_entries=8))))
+        goal = {"raw_input": "I want to become a backend developer"}
+        path = {"foundation": ["Python"], "intermediate": ["SQL"], "advanced": ["Docker"]}
+        try:
+            first = await agent.run(goal, path, {"health": "Applied to health."})
+            second = await agent.run(goal, path, {"health": "Applied to health."})
+        finally:
+            await registry.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second
+    assert fake_bedrock.stats.snapshot()["totals"]["calls"] == 1
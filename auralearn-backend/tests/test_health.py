@@ -0,0 +1,15 @@
+import asyncio
+
+import httpx
+
+from app.main import app
+
+
+def test_health():
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get("/health")
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
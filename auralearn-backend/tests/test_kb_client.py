@@ -0,0 +1,59 @@
+import asyncio
+
+from app.aws.bedrock_client import BedrockClient
+from app.aws.client_registry import ClientRegistry
+from app.aws.kb_client import KnowledgeBaseClient
+from benchmarks.fake_bedrock import FakeBedrockConfig, endpoint_url, parse_latency, start_fake_bedrock
+
+
+def retrieve_calls(server) -> int:
+    return server.stats.snapshot()["operations"].get("retrieve", {}).get("calls", 0)
+
+
+def test_identical_searches_share_one_retrieval_across_clients():
+    server = start_fake_bedrock(config=FakeBedrockConfig(retrieve_latency=parse_latency("0.1"), seed=0))
+    url = endpoint_url(server)
+
+    async def scenario():
+        registry = ClientRegistry(endpoint_urls={"bedrock-agent-runtime": url})
+        bedrock = BedrockClient(registry)
+        # Agents built without an injected kb each construct their own client
+        clients = [KnowledgeBaseClient(bedrock, local_index=None) for _ in range(3)]
+        try:
+            return await asyncio.gather(*(client.search("Python web frameworks") for client in clients))
+        finally:
+            await registry.close()
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        server.shutdown()
+    assert results[0] and all(result == results[0] for result in results)
+    assert retrieve_calls(server) == 1
+
+
+def test_search_many_bounds_concurrency_and_dedupes(monkeypatch):
+    active = 0
+    peak = 0
+    searched = []
+
+    async def fake_search(self, query, top_k=5):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        searched.append(query)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if query == "slow":
+            await asyncio.sleep(1)
+        return [{"content": query, "score": 1.0}]
+
+    monkeypatch.setattr(KnowledgeBaseClient, "search", fake_search)
+    client = KnowledgeBaseClient(bedrock=object(), local_index=None)
+    queries = [f"q{i}" for i in range(6)] + ["q0", "slow"]
+    results = asyncio.run(client.search_many(queries, timeout=0.2, max_concurrency=2))
+
+    assert peak == 2
+    assert sorted(searched) == sorted(set(queries))
+    assert results["q3"] == [{"content": "q3", "score": 1.0}]
+    assert results["slow"] == []
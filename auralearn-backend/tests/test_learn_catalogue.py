@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+from app.services.learn_catalogue import ROADMAP_LEVEL, LearnCatalogue
+
+
+def test_modules_round_trip_with_normalised_keys(tmp_path):
+    async def scenario():
+        catalogue = LearnCatalogue(str(tmp_path / "data" / "catalogue.db"), version="v1")
+        await catalogue.put("Python", "Beginner", "module")
+        return await catalogue.get("  python ", "BEGINNER"), await catalogue.get("Rust", "Beginner")
+
+    assert asyncio.run(scenario()) == ("module", None)
+
+
+def test_modules_from_an_older_version_are_dropped(tmp_path):
+    path = str(tmp_path / "catalogue.db")
+
+    async def scenario():
+        old = LearnCatalogue(path, version="v1")
+        await old.put("Python", "Beginner", "old module")
+        await old.record_request("Python", "Beginner")
+
+        new = LearnCatalogue(path, version="v2")
+        return await new.get("Python", "Beginner"), await new.stats(), await new.missing(5)
+
+    module, stats, missing = asyncio.run(scenario())
+    assert module is None
+    assert stats["modules"] == 0
+    # Demand outlives the version change, so the warm-up regenerates it
+    assert missing == [("Python", "Beginner")]
+
+
+def test_missing_orders_by_demand(tmp_path):
+    async def scenario():
+        catalogue = LearnCatalogue(str(tmp_path / "catalogue.db"), version="v1")
+        for skill, count in [("SQL", 1), ("Python", 3), ("Docker", 2)]:
+            for _ in range(count):
+                await catalogue.record_request(skill, "Beginner")
+        await catalogue.record_roadmap({"stage_1": ["Git", "SQL"], "notes": "ignored"})
+        await catalogue.put("Python", "Beginner", "module")
+        return await catalogue.missing(10)
+
+    assert asyncio.run(scenario()) == [("Docker", "Beginner"), ("SQL", "Beginner"), ("Git", ROADMAP_LEVEL)]
+
+
+def test_demand_is_pruned_by_age_and_row_cap(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+
+    async def scenario():
+        catalogue = LearnCatalogue(
+            str(tmp_path / "catalogue.db"), version="v1", demand_max_rows=2, demand_max_age_days=1
+        )
+        await catalogue.record_request("Stale", "Beginner")
+        now[0] += 2 * 86400
+        for skill, count in [("A", 3), ("B", 2), ("C", 1)]:
+            for _ in range(count):
+                await catalogue.record_request(skill, "Beginner")
+        removed = await catalogue.prune()
+        return removed, await catalogue.missing(10)
+
+    removed, missing = asyncio.run(scenario())
+    assert removed == (2, 0)
+    assert missing == [("A", "Beginner"), ("B", "Beginner")]
+
+
+def test_live_modules_are_kept_only_for_top_pairs(tmp_path):
+    async def scenario():
+        catalogue = LearnCatalogue(str(tmp_path / "catalogue.db"), version="v1", top_n=1)
+        await catalogue.record_request("Python", "Beginner")
+        await catalogue.record_request("Python", "Beginner")
+        await catalogue.record_request("Cobol", "Expert")
+        kept = await catalogue.put_if_in_demand("python", "beginner", "module")
+        dropped = await catalogue.put_if_in_demand("Cobol", "Expert", "module")
+        return kept, dropped, await catalogue.stats()
+
+    kept, dropped, stats = asyncio.run(scenario())
+    assert (kept, dropped) == (True, False)
+    assert stats["modules"] == 1
+
+
+def test_modules_leaving_the_top_pairs_are_pruned(tmp_path):
+    async def scenario():
+        catalogue = LearnCatalogue(str(tmp_path / "catalogue.db"), version="v1", top_n=1)
+        await catalogue.record_request("Python", "Beginner")
+        await catalogue.put("Python", "Beginner", "module")
+        for _ in range(3):
+            await catalogue.record_request("SQL", "Beginner")
+        removed = await catalogue.prune()
+        return removed, await catalogue.get("Python", "Beginner")
+
+    removed, module = asyncio.run(scenario())
+    assert removed == (0, 1)
+    assert module is None
@@ -0,0 +1,24 @@
+import asyncio
+
+import httpx
+
+from app.main import app
+from app.memory.state import MemorySessionStore
+
+
+def test_request_metrics_use_route_templates():
+    app.state.sessions = MemorySessionStore()
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            missing = await client.get("/sessions/0123456789abcdef")
+            probe = await client.get("/wp-admin/setup.php")
+            metrics = await client.get("/metrics")
+        return missing, probe, metrics.text
+
+    missing, probe, metrics = asyncio.run(scenario())
+    assert (missing.status_code, probe.status_code) == (404, 404)
+    assert 'name="GET /sessions/{session_id}"' in metrics
+    assert 'name="GET unmatched"' in metrics
+    assert "0123456789abcdef" not in metrics
+    assert "wp-admin" not in metrics
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.aws import model_capabilities
+from app.aws.bedrock_client import BedrockClient
+from app.aws.client_registry import ClientRegistry
+from app.aws.model_capabilities import (
+    PAYLOAD_ANTHROPIC,
+    PAYLOAD_NOVA,
+    PAYLOAD_TITAN,
+    ModelCapabilities,
+    base_model_id,
+    build_invoke_body,
+    detect_capabilities,
+    parse_invoke_body,
+    parse_invoke_usage,
+    probe_capabilities
+)
+from app.core.config import settings
+
+
+@pytest.mark.parametrize("model_id, expected", [
+    ("us.amazon.nova-premier-v1:0", "amazon.nova-premier-v1:0"),
+    ("arn:aws:bedrock:us-east-1::foundation-model/anthropic.claude-3-haiku-20240307-v1:0", "anthropic.claude-3-haiku-20240307-v1:0"),
+    ("amazon.titan-text-express-v1", "amazon.titan-text-express-v1")
+])
+def test_base_model_id_strips_arns_and_inference_profiles(model_id, expected):
+    assert base_model_id(model_id) == expected
+
+
+@pytest.mark.parametrize("model_id, api, payload, tool_use", [
+    ("amazon.nova-lite-v1:0", "converse", PAYLOAD_NOVA, True),
+    ("eu.anthropic.claude-3-5-sonnet-20240620-v1:0", "converse", PAYLOAD_ANTHROPIC, True),
+    ("anthropic.claude-v2:1", "converse", PAYLOAD_ANTHROPIC, False),
+    ("amazon.titan-text-express-v1", "converse", PAYLOAD_TITAN, False),
+    ("amazon.titan-tg1-large", "invoke_model", PAYLOAD_TITAN, False),
+    ("cohere.command-text-v14", "invoke_model", PAYLOAD_NOVA, False)
+])
+def test_detect_capabilities_by_family(model_id, api, payload, tool_use):
+    capabilities = detect_capabilities(model_id)
+    assert (capabilities.api, capabilities.payload, capabilities.supports_tool_use) == (api, payload, tool_use)
+    assert capabilities.supports_streaming == (api == "converse")
+
+
+@pytest.mark.parametrize("payload, body, text, usage", [
+    (PAYLOAD_NOVA, {"output": {"message": {"content": [{"text": "hi"}]}}, "usage": {"inputTokens": 3, "outputTokens": 1}}, "hi", (3, 1)),
+    (PAYLOAD_ANTHROPIC, {"content": [{"text": "hi"}], "usage": {"input_tokens": 3, "output_tokens": 1}}, "hi", (3, 1)),
+    (PAYLOAD_TITAN, {"inputTextTokenCount": 3, "results": [{"outputText": "hi", "tokenCount": 1}]}, "hi", (3, 1))
+])
+def test_invoke_bodies_round_trip(payload, body, text, usage):
+    request = build_invoke_body(payload, "hello", max_tokens=10, temperature=0.2)
+    assert "hello" in str(request)
+    assert parse_invoke_body(body) == text
+    assert parse_invoke_usage(body) == usage
+
+
+def test_probe_falls_back_to_invoke_model_when_converse_is_rejected():
+    class RejectingRuntime:
+        async def converse(self, **kwargs):
+            raise ClientError({"Error": {"Code": "ValidationException", "Message": "unsupported"}}, "Converse")
+
+    capabilities = asyncio.run(probe_capabilities(RejectingRuntime(), "amazon.nova-lite-v1:0"))
+    assert (capabilities.api, capabilities.supports_streaming) == ("invoke_model", False)
+
+
+def run_with_client(url: str, scenario):
+    async def run():
+        registry = ClientRegistry(endpoint_urls={"bedrock-runtime": url, "bedrock-agent-runtime": url})
+        try:
+            return await scenario(BedrockClient(registry))
+        finally:
+            await registry.close()
+    return asyncio.run(run())
+
+
+async def collect(stream) -> str:
+    return "".join([chunk async for chunk in stream])
+
+
+def test_converse_models_use_converse_and_converse_stream(fake_bedrock, fake_bedrock_url):
+    async def scenario(bedrock):
+        return await bedrock.generate_text("hello"), await collect(bedrock.generate_text_stream("hello"))
+
+    text, streamed = run_with_client(fake_bedrock_url, scenario)
+    assert text and streamed
+    operations = fake_bedrock.stats.snapshot()["operations"]
+    assert set(operations) == {"converse", "converse_stream"}
+
+
+def test_invoke_model_only_models_use_invoke_model(fake_bedrock, fake_bedrock_url, monkeypatch):
+    model_id = settings.BEDROCK_MODEL_ID
+    monkeypatch.setitem(
+        model_capabilities._capabilities,
+        model_id,
+        ModelCapabilities(model_id, "invoke_model", PAYLOAD_NOVA, supports_streaming=False)
+    )
+
+    async def scenario(bedrock):
+        return await bedrock.generate_text("hello"), await collect(bedrock.generate_text_stream("hello"))
+
+    text, streamed = run_with_client(fake_bedrock_url, scenario)
+    assert text and streamed
+    operations = fake_bedrock.stats.snapshot()["operations"]
+    assert set(operations) == {"invoke_model"}
+    assert operations["invoke_model"]["calls"] == 2
@@ -0,0 +1,49 @@
+import asyncio
+
+from app.schemas.response import compact_orchestration
+from tests.test_pipeline import GOAL, app_client
+
+RESULT = {
+    "learning_plan": {"status": "success", "learning_path": {"foundation": ["Python"]}, "source_documents": [{"score": 0.9}]},
+    "cross_domain_impact": {"health": "Applied to health."},
+    "explanation": {"summary": "Because."},
+    "decision_trace": {"step_timings": {}},
+    "session_id": "abc"
+}
+
+
+def test_compact_orchestration_keeps_everything_by_default():
+    assert compact_orchestration(RESULT) == RESULT
+
+
+def test_compact_orchestration_drops_trace_and_sources_unless_verbose():
+    compact = compact_orchestration(RESULT, verbose=False)
+    assert "decision_trace" not in compact
+    assert compact["learning_plan"] == {"status": "success", "learning_path": {"foundation": ["Python"]}}
+    # The input is left alone
+    assert RESULT["learning_plan"]["source_documents"]
+
+
+def test_compact_orchestration_selects_fields():
+    assert compact_orchestration(RESULT, fields=["cross_domain_impact", "session_id"]) == {
+        "cross_domain_impact": {"health": "Applied to health."},
+        "session_id": "abc"
+    }
+
+
+def test_orchestrate_trims_the_response_body(fake_bedrock_url):
+    async def scenario():
+        async with app_client(fake_bedrock_url) as client:
+            compact = await client.post("/orchestrate", json={"user_input": GOAL, "verbose": False})
+            selected = await client.post("/orchestrate", json={"user_input": GOAL, "fields": ["explanation", "session_id"]})
+            invalid = await client.post("/orchestrate", json={"user_input": GOAL, "fields": ["everything"]})
+        return compact, selected, invalid
+
+    compact, selected, invalid = asyncio.run(scenario())
+    assert compact.status_code == 200
+    assert "decision_trace" not in compact.json()
+    assert "source_documents" not in compact.json()["learning_plan"]
+    assert compact.json()["session_id"]
+    # Dropped fields are left out, not sent as null
+    assert set(selected.json()) == {"explanation", "session_id"}
+    assert invalid.status_code == 422
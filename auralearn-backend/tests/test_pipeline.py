@@ -0,0 +1,87 @@
+import asyncio
+import contextlib
+
+import httpx
+
+from app.agents.orchestrator import OrchestratorAgent
+from app.aws.bedrock_client import BedrockClient
+from app.aws.client_registry import ClientRegistry
+from app.aws.kb_client import KnowledgeBaseClient
+from app.main import app
+from app.memory.state import MemorySessionStore
+from app.utils.singleflight import SingleFlight
+from benchmarks.fake_bedrock import FakeBedrockConfig, endpoint_url, start_fake_bedrock
+
+GOAL = "I want to become a backend developer"
+
+
+@contextlib.asynccontextmanager
+async def app_client(url: str):
+    """
+    The FastAPI app wired the way the lifespan does, but against the fake.
+    """
+    registry = ClientRegistry(endpoint_urls={"bedrock-runtime": url, "bedrock-agent-runtime": url})
+    app.state.bedrock = BedrockClient(registry)
+    app.state.kb = KnowledgeBaseClient(app.state.bedrock)
+    app.state.sessions = MemorySessionStore()
+    app.state.orchestrations = SingleFlight("orchestrate")
+    app.state.learn_modules = SingleFlight("learn")
+    app.state.learn_catalogue = None
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=30) as client:
+            yield client
+    finally:
+        await registry.close()
+
+
+def test_orchestrator_runs_every_stage(fake_bedrock_url):
+    async def scenario():
+        registry = ClientRegistry(endpoint_urls={"bedrock-runtime": fake_bedrock_url, "bedrock-agent-runtime": fake_bedrock_url})
+        bedrock = BedrockClient(registry)
+        events = []
+        try:
+            result = await OrchestratorAgent(bedrock, KnowledgeBaseClient(bedrock)).execute(
+                GOAL, on_event=lambda event, payload: events.append(event)
+            )
+        finally:
+            await registry.close()
+        return result, events
+
+    result, events = asyncio.run(scenario())
+    assert result["learning_plan"]["learning_path"]
+    assert set(result["cross_domain_impact"]) == {"health", "finance", "agriculture"}
+    assert result["explanation"]
+    timings = result["decision_trace"]["step_timings"]
+    assert all(record["status"] == "completed" for record in timings.values())
+    for event in ("goal_context", "learning_path", "cross_domain_impact", "explanation"):
+        assert event in events
+
+
+def test_orchestrate_endpoint_stores_session(fake_bedrock, fake_bedrock_url):
+    async def scenario():
+        async with app_client(fake_bedrock_url) as client:
+            response = await client.post("/orchestrate", json={"user_input": GOAL})
+            session = await client.get(f"/sessions/{response.json()['session_id']}")
+        return response, session
+
+    response, session = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert response.json()["learning_plan"]["learning_path"]
+    assert session.status_code == 200
+    assert session.json()["goal"] == GOAL
+    assert fake_bedrock.stats.snapshot()["operations"]
+
+
+def test_throttling_surfaces_as_429():
+    server = start_fake_bedrock(config=FakeBedrockConfig(throttle_rate=1.0, seed=0))
+
+    async def scenario():
+        async with app_client(endpoint_url(server)) as client:
+            return await client.post("/learn", json={"skill": "Python", "user_level": "Beginner"})
+
+    try:
+        response = asyncio.run(scenario())
+    finally:
+        server.shutdown()
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
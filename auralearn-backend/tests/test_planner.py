@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from app.services.planner import PlanExecutor, PlanStep
+
+
+def echo(value):
+    async def run(**kwargs):
+        return value
+    return run
+
+
+def test_independent_steps_run_concurrently():
+    running = 0
+    peak = 0
+
+    async def slow(**kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return "done"
+
+    steps = [PlanStep(name=f"step{i}", run=slow, inputs=["start"], output=f"out{i}") for i in range(3)]
+    values, timings = asyncio.run(PlanExecutor(max_concurrency=2).run(steps, {"start": 1}))
+    assert peak == 2
+    assert [values[f"out{i}"] for i in range(3)] == ["done"] * 3
+    assert all(record["status"] == "completed" for record in timings.values())
+
+
+def test_steps_receive_their_inputs():
+    async def add(a, b):
+        return a + b
+
+    steps = [
+        PlanStep(name="a", run=echo(2), inputs=["start"], output="a"),
+        PlanStep(name="sum", run=add, inputs=["a", "b"], output="sum"),
+        PlanStep(name="b", run=echo(3), inputs=["start"], output="b")
+    ]
+    values, _ = asyncio.run(PlanExecutor().run(steps, {"start": None}))
+    assert values["sum"] == 5
+
+
+def test_cancel_downstream_skips_transitive_dependents():
+    calls = []
+
+    def tracked(name, value):
+        async def run(**kwargs):
+            calls.append(name)
+            return value
+        return run
+
+    finished = []
+    steps = [
+        PlanStep(name="check", run=tracked("check", False), inputs=["start"], output="relevant",
+                 cancel_downstream=lambda relevant: not relevant),
+        PlanStep(name="path", run=tracked("path", "path"), inputs=["relevant"], output="path",
+                 cancelled_output="no path"),
+        PlanStep(name="explain", run=tracked("explain", "explained"), inputs=["path"], output="explanation",
+                 cancelled_output="nothing to explain"),
+        PlanStep(name="other", run=tracked("other", "other"), inputs=["start"], output="other")
+    ]
+    values, timings = asyncio.run(PlanExecutor().run(
+        steps, {"start": None}, lambda step, status, value: finished.append((step.name, status))
+    ))
+
+    assert sorted(calls) == ["check", "other"]
+    assert values["path"] == "no path"
+    assert values["explanation"] == "nothing to explain"
+    assert timings["path"] == {"status": "cancelled", "cancelled_by": "check"}
+    assert timings["explain"]["status"] == "cancelled"
+    assert ("explain", "cancelled") in finished
+
+
+def test_failed_step_aborts_the_plan():
+    async def fail(**kwargs):
+        raise RuntimeError("boom")
+
+    steps = [
+        PlanStep(name="fail", run=fail, inputs=["start"], output="x"),
+        PlanStep(name="after", run=echo(1), inputs=["x"], output="y")
+    ]
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(PlanExecutor().run(steps, {"start": None}))
+
+
+def test_unknown_inputs_are_rejected():
+    steps = [PlanStep(name="orphan", run=echo(1), inputs=["missing"], output="x")]
+    with pytest.raises(ValueError, match="unknown inputs"):
+        asyncio.run(PlanExecutor().run(steps, {}))
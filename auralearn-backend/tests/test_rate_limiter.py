@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.aws.errors import BedrockRequestError, BedrockThrottledError
+from app.aws.rate_limiter import AIMDLimiter, RetryPolicy, TokenBucket
+
+
+def client_error(code: str) -> Exception:
+    return ClientError({"Error": {"Code": code, "Message": code}}, "Converse")
+
+
+def test_aimd_grows_after_a_window_and_halves_on_throttle():
+    limiter = AIMDLimiter(initial=4, minimum=1, maximum=6)
+    for _ in range(4):
+        limiter.on_success()
+    assert limiter.limit == 5
+    limiter.on_throttle()
+    assert limiter.limit == 2
+    limiter.on_throttle()
+    limiter.on_throttle()
+    assert limiter.limit == 1
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.limit == 6
+
+
+def test_aimd_caps_in_flight_calls():
+    limiter = AIMDLimiter(initial=2)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        await limiter.acquire()
+        peak = max(peak, limiter.in_flight)
+        await asyncio.sleep(0.01)
+        await limiter.release()
+
+    async def scenario():
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    asyncio.run(scenario())
+    assert peak == 2
+    assert limiter.in_flight == 0
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(rate_per_minute=600)
+
+    async def scenario():
+        await bucket.acquire(600)
+        started = time.monotonic()
+        await bucket.acquire(3)
+        return time.monotonic() - started
+
+    assert 0.2 <= asyncio.run(scenario()) < 1.0
+
+
+def test_token_bucket_debt_delays_later_callers():
+    bucket = TokenBucket(rate_per_minute=6000)
+    bucket.consume(6000 + 10)
+    assert bucket.tokens < 0
+
+
+def test_retry_policy_retries_throttling_then_succeeds():
+    attempts = 0
+
+    async def call():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise client_error("ThrottlingException")
+        return "ok"
+
+    assert asyncio.run(RetryPolicy(max_attempts=4, base_delay=0, max_delay=0).run(call)) == "ok"
+    assert attempts == 3
+
+
+def test_retry_policy_raises_the_typed_error_when_attempts_run_out():
+    async def call():
+        raise client_error("ThrottlingException")
+
+    with pytest.raises(BedrockThrottledError):
+        asyncio.run(RetryPolicy(max_attempts=2, base_delay=0, max_delay=0).run(call))
+
+
+@pytest.mark.parametrize("code", ["ValidationException", "ServiceQuotaExceededException"])
+def test_retry_policy_does_not_retry_request_errors(code):
+    attempts = 0
+
+    async def call():
+        nonlocal attempts
+        attempts += 1
+        raise client_error(code)
+
+    with pytest.raises(BedrockRequestError):
+        asyncio.run(RetryPolicy(max_attempts=4, base_delay=0, max_delay=0).run(call))
+    assert attempts == 1
+
+
+def test_retry_delay_is_capped():
+    policy = RetryPolicy(max_attempts=10, base_delay=1, max_delay=2)
+    assert all(0 <= policy.delay(attempt) <= 2 for attempt in range(10))
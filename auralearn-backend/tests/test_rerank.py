@@ -0,0 +1,46 @@
+from app.aws.kb_client import pack_context, rerank
+from app.aws.rate_limiter import estimate_tokens
+
+
+def doc(content: str, score: float) -> dict:
+    return {"content": content, "score": score}
+
+
+def test_rerank_blends_vector_score_with_bm25():
+    documents = [
+        doc("Gardening tips for spring tomatoes.", 0.80),
+        doc("Python decorators wrap functions to add behaviour.", 0.78),
+        doc("Cooking pasta al dente.", 0.10)
+    ]
+    ranked = rerank("python decorators", documents, top_k=3)
+    assert [d["content"] for d in ranked][0].startswith("Python decorators")
+    assert [d["relevance"] for d in ranked] == sorted((d["relevance"] for d in ranked), reverse=True)
+
+
+def test_rerank_drops_near_duplicates_and_keeps_top_k():
+    documents = [
+        doc("Docker containers package an application with its dependencies.", 0.9),
+        doc("Docker containers package an application with its dependencies!", 0.89),
+        doc("Kubernetes schedules containers across a cluster.", 0.5),
+        doc("Terraform describes infrastructure as code.", 0.4)
+    ]
+    ranked = rerank("docker containers", documents, top_k=2)
+    assert len(ranked) == 2
+    assert ranked[0]["content"].startswith("Docker")
+    assert not ranked[1]["content"].startswith("Docker")
+
+
+def test_rerank_of_nothing_is_empty():
+    assert rerank("anything", [], top_k=3) == []
+
+
+def test_pack_context_keeps_rank_order_within_budget():
+    documents = [doc("a" * 40, 0), doc("b" * 400, 0), doc("c" * 40, 0)]
+    packed = pack_context(documents, token_budget=25)
+    assert packed == "a" * 40 + "\n\n" + "c" * 40
+    assert sum(estimate_tokens(part) for part in packed.split("\n\n")) <= 25
+
+
+def test_pack_context_truncates_an_oversized_best_chunk():
+    packed = pack_context([doc("x" * 1000, 0), doc("y" * 8, 0)], token_budget=10)
+    assert packed == "x" * 40
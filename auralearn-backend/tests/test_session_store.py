@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.main import app
+from app.memory.state import MemorySessionStore, SessionNotFoundError, SessionStore, SQLiteSessionStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(ttl_seconds=None) -> SessionStore:
+        if request.param == "memory":
+            return MemorySessionStore(ttl_seconds=ttl_seconds)
+        return SQLiteSessionStore(str(tmp_path / "nested" / "sessions.db"), ttl_seconds=ttl_seconds)
+    return make
+
+
+def test_crud(make_store):
+    async def scenario():
+        store = make_store()
+        session_id = await store.create_session("learn rust")
+        await store.save_plan(session_id, "learn rust", {"stages": ["basics"]})
+        await store.add_feedback(session_id, {"Docker": "want_more"}, {"ok": True})
+        await store.append_turn(session_id, "user", "hi")
+        await store.append_turn(session_id, "assistant", "hello")
+        await store.append_turn(session_id, "user", "bye")
+        await store.set_context(session_id, "summary", "greetings")
+
+        session = await store.get_session(session_id)
+        assert session["goal"] == "learn rust"
+        assert session["plan"] == {"stages": ["basics"]}
+        assert len(await store.feedback_rounds(session_id)) == 1
+        assert [turn["content"] for turn in await store.history(session_id)] == ["hi", "hello", "bye"]
+        assert [turn["content"] for turn in await store.history(session_id, limit=2)] == ["hello", "bye"]
+        assert [turn["content"] for turn in await store.history(session_id, offset=1)] == ["hello", "bye"]
+        assert [turn["content"] for turn in await store.history(session_id, limit=1, offset=1)] == ["bye"]
+        assert await store.history(session_id, offset=5) == []
+        assert await store.get_context(session_id, "summary") == "greetings"
+
+        assert await store.delete_session(session_id) is True
+        assert await store.get_session(session_id) is None
+        assert await store.delete_session(session_id) is False
+
+    asyncio.run(scenario())
+
+
+def test_unknown_session_raises_session_not_found(make_store):
+    async def scenario():
+        with pytest.raises(SessionNotFoundError):
+            await make_store().append_turn("missing", "user", "hi")
+
+    asyncio.run(scenario())
+
+
+def test_idle_sessions_expire(make_store, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+
+    async def scenario():
+        store = make_store(ttl_seconds=60)
+        session_id = await store.create_session("goal")
+        now[0] += 30
+        assert await store.get_session(session_id) is not None
+        now[0] += 61
+        assert await store.get_session(session_id) is None
+
+    asyncio.run(scenario())
+
+
+def test_incomplete_backend_cannot_be_built():
+    class Partial(SessionStore):
+        async def create_session(self, goal: str = "") -> str:
+            return "id"
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_session_expiring_mid_request_is_a_404():
+    class ExpiringStore(MemorySessionStore):
+        async def save_plan(self, session_id, goal, plan):
+            await self.delete_session(session_id)
+            await super().save_plan(session_id, goal, plan)
+
+    async def scenario():
+        app.state.sessions = ExpiringStore()
+        session_id = await app.state.sessions.create_session("goal")
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.put(f"/sessions/{session_id}/learning_path", json={"foundation": ["Python"]})
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 404
+    assert "expired" in response.json()["detail"]
@@ -0,0 +1,199 @@
+import asyncio
+import json
+from typing import AsyncIterator, List, Tuple
+
+from app.agents.orchestrator import OrchestratorAgent
+from app.api.streaming import stream_text_events
+from app.aws.bedrock_client import BedrockClient
+from tests.test_pipeline import GOAL, app_client
+
+
+def parse_events(body: str) -> List[Tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class Upstream:
+    """
+    Text chunks as an async generator that records whether it was closed.
+    """
+
+    def __init__(self, chunks: List[str], error: Exception = None):
+        self.chunks = chunks
+        self.error = error
+        self.closed = False
+
+    async def stream(self) -> AsyncIterator[str]:
+        try:
+            for chunk in self.chunks:
+                yield chunk
+            if self.error:
+                raise self.error
+        finally:
+            self.closed = True
+
+
+def test_stream_text_events_emits_deltas_then_done():
+    upstream = Upstream(["Hello ", "world"])
+    completed = []
+
+    async def on_complete(text: str):
+        completed.append(text)
+
+    async def scenario():
+        return [event async for event in stream_text_events(upstream.stream(), on_complete=on_complete)]
+
+    events = parse_events("".join(asyncio.run(scenario())))
+    assert events == [("delta", {"text": "Hello "}), ("delta", {"text": "world"}), ("done", {})]
+    assert completed == ["Hello world"]
+
+
+def test_stream_text_events_reports_upstream_errors():
+    upstream = Upstream(["Hello"], error=RuntimeError("stream broke"))
+    completed = []
+
+    async def scenario():
+        return [event async for event in stream_text_events(upstream.stream(), on_complete=completed.append)]
+
+    events = parse_events("".join(asyncio.run(scenario())))
+    assert events[-1] == ("error", {"message": "stream broke"})
+    assert completed == []
+
+
+def test_disconnect_closes_the_upstream_without_completing():
+    upstream = Upstream(["one", "two", "three"])
+    completed = []
+
+    async def scenario():
+        events = stream_text_events(upstream.stream(), on_complete=completed.append)
+        first = await events.__anext__()
+        # What the server does when the client goes away
+        await events.aclose()
+        # Checked before asyncio.run's shutdown would close it anyway
+        return first, upstream.closed
+
+    first, closed = asyncio.run(scenario())
+    assert parse_events(first) == [("delta", {"text": "one"})]
+    assert closed
+    assert completed == []
+
+
+class EventStream:
+    def __init__(self, deltas: List[str]):
+        self.deltas = deltas
+        self.closed = False
+
+    async def __aiter__(self):
+        for delta in self.deltas:
+            yield {"contentBlockDelta": {"delta": {"text": delta}}}
+
+    def close(self):
+        self.closed = True
+
+
+class StubRuntime:
+    def __init__(self, stream: EventStream):
+        self.stream = stream
+
+    async def converse_stream(self, **kwargs):
+        return {"stream": self.stream}
+
+
+class StubRegistry:
+    def __init__(self, runtime: StubRuntime):
+        self.runtime = runtime
+
+    async def get(self, service: str):
+        return self.runtime
+
+
+def test_generate_text_stream_closes_the_event_stream_when_stopped_early():
+    stream = EventStream(["one", "two", "three"])
+    bedrock = BedrockClient(StubRegistry(StubRuntime(stream)))
+
+    async def scenario():
+        chunks = bedrock.generate_text_stream("hello", use_cache=False)
+        first = await chunks.__anext__()
+        await chunks.aclose()
+        return first
+
+    assert asyncio.run(scenario()) == "one"
+    assert stream.closed
+
+
+def test_learn_stream_endpoint(fake_bedrock_url):
+    async def scenario():
+        async with app_client(fake_bedrock_url) as client:
+            return await client.post("/learn/stream", json={"skill": "Python", "user_level": "Beginner"})
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert events[-1] == ("done", {})
+    assert "".join(payload["text"] for event, payload in events if event == "delta")
+
+
+def test_orchestrate_stream_emits_stage_events(fake_bedrock_url):
+    async def scenario():
+        async with app_client(fake_bedrock_url) as client:
+            return await client.post("/orchestrate/stream", json={"user_input": GOAL, "verbose": False})
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    events = parse_events(response.text)
+    names = [event for event, payload in events]
+    assert names[0] == "goal_context"
+    assert names.count("cross_domain") == 3
+    assert names.index("learning_path") < names.index("cross_domain_impact") < names.index("explanation")
+    assert names[-1] == "result"
+    result = events[-1][1]
+    assert result["session_id"]
+    assert "decision_trace" not in result
+
+
+def stalling_orchestrator(cancelled: asyncio.Event, error: Exception = None) -> OrchestratorAgent:
+    """
+    An orchestrator whose pipeline reports the goal, then fails with
+    `error` or stalls until cancelled.
+    """
+    orchestrator = OrchestratorAgent(BedrockClient())
+
+    async def execute(user_input, on_event=None, domains=None):
+        on_event("goal_context", {"raw_input": user_input})
+        if error:
+            raise error
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    orchestrator.execute = execute
+    return orchestrator
+
+
+def test_execute_stream_stops_the_pipeline_when_the_consumer_goes_away():
+    async def scenario():
+        cancelled = asyncio.Event()
+        events = stalling_orchestrator(cancelled).execute_stream(GOAL)
+        first = await events.__anext__()
+        await events.aclose()
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        return first
+
+    assert asyncio.run(scenario())[0] == "goal_context"
+
+
+def test_execute_stream_ends_with_an_error_event():
+    async def scenario():
+        orchestrator = stalling_orchestrator(asyncio.Event(), error=RuntimeError("pipeline broke"))
+        return [event async for event in orchestrator.execute_stream(GOAL)]
+
+    assert asyncio.run(scenario()) == [
+        ("goal_context", {"raw_input": GOAL}),
+        ("error", {"message": "pipeline broke"})
+    ]
@@ -0,0 +1,83 @@
+import asyncio
+from typing import List
+
+from pydantic import BaseModel
+
+from app.utils.validators import JSONObjectScanner, generate_validated, parse_model
+
+
+class Stages(BaseModel):
+    skills: List[str]
+
+
+class ScriptedBedrock:
+    """
+    Returns the scripted completions in order and records every prompt.
+    """
+
+    def __init__(self, *responses: str):
+        self.responses = list(responses)
+        self.prompts: List[str] = []
+
+    async def generate_text(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        return self.responses.pop(0)
+
+    async def generate_text_stream(self, prompt: str):
+        self.prompts.append(prompt)
+        text = self.responses.pop(0)
+        for start in range(0, len(text), 5):
+            yield text[start:start + 5]
+
+
+def test_scanner_ignores_braces_inside_strings():
+    text = 'Sure! {"skills": ["use {curly} braces", "quote \\" and }"]} done'
+    assert JSONObjectScanner().feed(text) == ['{"skills": ["use {curly} braces", "quote \\" and }"]}']
+
+
+def test_scanner_handles_objects_split_across_chunks():
+    scanner = JSONObjectScanner()
+    assert scanner.feed('prefix {"skills": ["a"') == []
+    assert scanner.feed(', "b}"]} {"x": {"y": 1}}') == ['{"skills": ["a", "b}"]}', '{"x": {"y": 1}}']
+
+
+def test_parse_model_takes_first_object_and_ignores_trailing_one():
+    parsed, error = parse_model('{"skills": ["Python"]}\n\nAlso: {"skills": ["Rust"]}', Stages)
+    assert error is None
+    assert parsed.skills == ["Python"]
+
+
+def test_parse_model_skips_objects_that_do_not_validate():
+    parsed, _ = parse_model('{"note": "draft"} then {"skills": ["SQL"]}', Stages)
+    assert parsed.skills == ["SQL"]
+
+
+def test_parse_model_reports_why_nothing_validated():
+    parsed, error = parse_model("no json here", Stages)
+    assert parsed is None
+    assert error == "no JSON object found"
+
+    parsed, error = parse_model('{"skills": "not a list"}', Stages)
+    assert parsed is None
+    assert "skills" in error
+
+
+def test_generate_validated_repairs_once():
+    bedrock = ScriptedBedrock('{"skills": "Python"}', 'Fixed: {"skills": ["Python"]}')
+    parsed = asyncio.run(generate_validated(bedrock, "prompt", Stages))
+    assert parsed.skills == ["Python"]
+    assert len(bedrock.prompts) == 2
+    assert '{"skills": "Python"}' in bedrock.prompts[1]
+
+
+def test_generate_validated_gives_up_after_failed_repair():
+    bedrock = ScriptedBedrock("nope", "still nope")
+    assert asyncio.run(generate_validated(bedrock, "prompt", Stages)) is None
+    assert len(bedrock.prompts) == 2
+
+
+def test_generate_validated_stream_returns_first_valid_object():
+    bedrock = ScriptedBedrock('{"skills": ["Go"]} and {"skills": ["trailing"]}')
+    parsed = asyncio.run(generate_validated(bedrock, "prompt", Stages, stream=True))
+    assert parsed.skills == ["Go"]
+    assert len(bedrock.prompts) == 1
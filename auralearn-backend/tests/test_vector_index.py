@@ -0,0 +1,57 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services.vector_index import BruteForceIndex, IVFIndex, LocalKnowledgeBase, normalize_rows
+
+
+def clustered_vectors(count: int = 2000, dimensions: int = 32, clusters: int = 20, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dimensions))
+    points = centres[rng.integers(0, clusters, count)] + 0.3 * rng.normal(size=(count, dimensions))
+    return normalize_rows(points).astype(np.float32)
+
+
+def test_brute_force_returns_exact_top_k():
+    vectors = clustered_vectors(200)
+    query = vectors[7]
+    ids, scores = BruteForceIndex(vectors).search(query, 5)
+    expected = np.argsort(-(vectors @ query))[:5]
+    assert list(ids) == list(expected)
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_ivf_recall_against_brute_force():
+    vectors = clustered_vectors()
+    centroids, assignments = IVFIndex.train(vectors, seed=0)
+    exact = BruteForceIndex(vectors)
+    approximate = IVFIndex(vectors, centroids, assignments, n_probe=8)
+
+    rng = np.random.default_rng(1)
+    queries = normalize_rows(vectors[rng.choice(len(vectors), 50, replace=False)] + 0.05 * rng.normal(size=(50, vectors.shape[1])))
+    recall = np.mean([
+        len(set(exact.search(query, 10)[0]) & set(approximate.search(query, 10)[0])) / 10
+        for query in queries.astype(np.float32)
+    ])
+    assert recall >= 0.9
+
+
+def test_ivf_probing_every_cluster_is_exact():
+    vectors = clustered_vectors(500)
+    centroids, assignments = IVFIndex.train(vectors, seed=0)
+    query = vectors[3]
+    full = IVFIndex(vectors, centroids, assignments, n_probe=len(centroids))
+    assert list(full.search(query, 10)[0]) == list(BruteForceIndex(vectors).search(query, 10)[0])
+
+
+def test_local_knowledge_base_round_trip(tmp_path):
+    vectors = clustered_vectors(100)
+    chunks = [{"text": f"chunk {i}", "location": {"uri": f"doc-{i}"}} for i in range(len(vectors))]
+    LocalKnowledgeBase.save(str(tmp_path), chunks, vectors, {"model_id": "test"}, ivf_lists=0)
+
+    brute = LocalKnowledgeBase.load(str(tmp_path))
+    ivf = LocalKnowledgeBase.load(str(tmp_path), index_type="ivf", n_probe=4)
+    results = brute.search(vectors[42].tolist(), top_k=3)
+    assert results[0]["content"]["text"] == "chunk 42"
+    # Cached retrievals are keyed by identity, so different indexes must differ
+    assert brute.identity != ivf.identity
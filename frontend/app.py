@@ -1,5 +1,6 @@
 import streamlit as st
 import requests
+import json
 import re
 
 BACKEND_URL = "http://localhost:8000"
@@ -203,6 +204,8 @@ if "refined_path" not in st.session_state:
     st.session_state.refined_path = None
 if "feedback_changes" not in st.session_state:
     st.session_state.feedback_changes = []
+if "session_id" not in st.session_state:
+    st.session_state.session_id = None
 
 def check_backend_health():
     try:
@@ -217,7 +220,7 @@ def call_orchestrate_api(user_input: str):
     try:
         response = requests.post(
             f"{BACKEND_URL}/orchestrate",
-            params={"user_input": user_input},
+            json={"user_input": user_input, "verbose": False},
             timeout=120
         )
         if response.status_code == 200:
@@ -239,7 +242,7 @@ def call_learn_api(skill: str, user_level: str = "Beginner"):
     try:
         response = requests.post(
             f"{BACKEND_URL}/learn",
-            params={"skill": skill, "user_level": user_level},
+            json={"skill": skill, "user_level": user_level},
             timeout=90
         )
         if response.status_code == 200:
@@ -249,11 +252,17 @@ def call_learn_api(skill: str, user_level: str = "Beginner"):
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+def with_session(body: dict) -> dict:
+    """Adds the backend session id, which keeps plan and chat history server-side."""
+    if st.session_state.session_id:
+        return {**body, "session_id": st.session_state.session_id}
+    return body
+
 def call_chat_api(message: str, skill_context: str = ""):
     try:
         response = requests.post(
             f"{BACKEND_URL}/chat",
-            params={"message": message, "skill_context": skill_context},
+            json=with_session({"message": message, "skill_context": skill_context}),
             timeout=60
         )
         if response.status_code == 200:
@@ -264,14 +273,15 @@ def call_chat_api(message: str, skill_context: str = ""):
         return {"success": False, "error": str(e)}
 
 def call_refine_api(original_path: dict, feedback: dict, original_goal: str):
+    # With a session the backend already holds the path and goal; send only the feedback
+    if st.session_state.session_id:
+        body = {"session_id": st.session_state.session_id, "feedback": feedback}
+    else:
+        body = {"original_path": original_path, "feedback": feedback, "original_goal": original_goal}
     try:
         response = requests.post(
             f"{BACKEND_URL}/refine",
-            json={
-                "original_path": original_path,
-                "feedback": feedback,
-                "original_goal": original_goal
-            },
+            json=body,
             timeout=90
         )
         if response.status_code == 200:
@@ -281,6 +291,98 @@ def call_refine_api(original_path: dict, feedback: dict, original_goal: str):
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+def iter_sse_events(response):
+    """Parses a server-sent events response into (event, data) pairs."""
+    event, data_lines = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            if data_lines:
+                yield event, json.loads("\n".join(data_lines))
+            event, data_lines = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data_lines.append(line[len("data:"):].strip())
+
+def stream_text_api(path: str, body: dict, timeout: int = 90):
+    """Yields text deltas from a streaming endpoint as they arrive."""
+    with requests.post(f"{BACKEND_URL}{path}", json=body, stream=True, timeout=timeout) as response:
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        response.encoding = "utf-8"
+        for event, data in iter_sse_events(response):
+            if event == "delta":
+                yield data.get("text", "")
+            elif event == "error":
+                raise RuntimeError(data.get("message", "Streaming failed"))
+            elif event == "done":
+                return
+
+def stream_learn_api(skill: str, user_level: str = "Beginner"):
+    """Renders the learning module live as it streams; returns the same shape as call_learn_api."""
+    placeholder = st.empty()
+    content = ""
+    try:
+        for chunk in stream_text_api("/learn/stream", {"skill": skill, "user_level": user_level}):
+            content += chunk
+            placeholder.markdown(format_lesson_content(content), unsafe_allow_html=True)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    finally:
+        placeholder.empty()
+    return {"success": True, "data": {"status": "success", "skill": skill, "level": user_level, "content": content}}
+
+def stream_chat_api(message: str, skill_context: str = ""):
+    """Renders the tutor reply live as it streams; returns the same shape as call_chat_api."""
+    placeholder = st.empty()
+    reply = ""
+    try:
+        for chunk in stream_text_api("/chat/stream", with_session({"message": message, "skill_context": skill_context}), timeout=60):
+            reply += chunk
+            placeholder.markdown(f'<div class="chat-ai"><div style="color:#7209B7;font-size:0.8rem;margin-bottom:4px;">AURA</div>{reply}</div>', unsafe_allow_html=True)
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    finally:
+        placeholder.empty()
+    return {"success": True, "data": {"status": "success", "response": reply}}
+
+def stream_orchestrate_api(user_input: str):
+    """Renders each pipeline stage as it completes; returns the same shape as call_orchestrate_api."""
+    placeholder = st.empty()
+    partial = {"learning_plan": {}, "cross_domain_impact": {}, "explanation": {}}
+    completed = []
+    try:
+        # The timeout applies per read, so a long pipeline no longer fails as long as stages keep arriving
+        with requests.post(f"{BACKEND_URL}/orchestrate/stream", json={"user_input": user_input, "verbose": False}, stream=True, timeout=120) as response:
+            if response.status_code != 200:
+                return {"success": False, "error": f"HTTP {response.status_code}"}
+            response.encoding = "utf-8"
+            for event, data in iter_sse_events(response):
+                if event == "result":
+                    return {"success": True, "data": data}
+                if event == "error":
+                    return {"success": False, "error": data.get("message", "Pipeline failed.")}
+                if event == "learning_path":
+                    partial["learning_plan"] = data
+                elif event == "cross_domain":
+                    partial["cross_domain_impact"][data["domain"]] = data["application"]
+                elif event == "cross_domain_impact":
+                    partial["cross_domain_impact"] = data
+                elif event == "explanation":
+                    partial["explanation"] = data
+                completed.append(event)
+                with placeholder.container():
+                    render_partial_results(partial, completed)
+    except requests.exceptions.Timeout:
+        return {"success": False, "error": "Request timed out. The AI is taking too long."}
+    except requests.exceptions.ConnectionError:
+        return {"success": False, "error": "Cannot connect to backend. Is it running?"}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    finally:
+        placeholder.empty()
+    return {"success": False, "error": "Connection closed before the pipeline finished."}
+
 def format_lesson_content(text: str) -> str:
     """Formats raw LLM output into clean HTML for display."""
     if not text:
@@ -483,11 +585,12 @@ def render_planner_page():
             st.session_state.user_profile = {"name": name, "degree": degree, "role": role, "level": knowledge_level, "goal": goal}
             enriched_input = f"User Profile: {name}, {role}, {knowledge_level}, Background: {degree}. Learning Goal: {goal}"
             
-            with st.spinner("🔄 Agents orchestrating... Analyzing constraints and dependencies..."):
-                result = call_orchestrate_api(enriched_input)
+            # Stream the pipeline so each stage shows up as soon as it is ready
+            result = stream_orchestrate_api(enriched_input)
             
             if result["success"]:
                 st.session_state.api_response = result["data"]
+                st.session_state.session_id = result["data"].get("session_id")
                 st.success("✅ Architecture generated successfully.")
             else:
                 st.error(f"❌ System Fault: {result['error']}")
@@ -495,6 +598,30 @@ def render_planner_page():
     if st.session_state.api_response:
         render_results_section(st.session_state.api_response)
 
+def render_partial_results(partial: dict, completed: list):
+    """Read-only preview of the stages received so far while /orchestrate/stream runs."""
+    stages = [("goal_context", "Goal interpreted"), ("learning_path", "Learning path"), ("cross_domain_impact", "Cross-domain mapping"), ("explanation", "Reasoning")]
+    status = " · ".join([f"{'✅' if key in completed else '⏳'} {label}" for key, label in stages])
+    st.markdown(f"<div style='color:#94A3B8;margin:1rem 0;'>{status}</div>", unsafe_allow_html=True)
+
+    learning_plan = partial.get("learning_plan", {})
+    if learning_plan.get("status") == "success":
+        roadmap = learning_plan.get("learning_path", {})
+        c1, c2, c3 = st.columns(3)
+        for col, key, title, css in [(c1, "foundation", "Foundation", "stage-foundation"), (c2, "intermediate", "Growth", "stage-growth"), (c3, "advanced", "Mastery", "stage-mastery")]:
+            with col:
+                content = "".join([f"<li>{s}</li>" for s in roadmap.get(key, [])])
+                st.markdown(f"<div class='custom-card {css}'><div class='card-title'>{title}</div><div class='card-body'><ul style='padding-left:1rem;margin:0'>{content}</ul></div></div>", unsafe_allow_html=True)
+    elif learning_plan:
+        st.error(f"🚫 {learning_plan.get('message', 'Generation failed.')}")
+
+    cross_domain = partial.get("cross_domain_impact", {})
+    if cross_domain:
+        cols = st.columns(3)
+        for idx, (domain, impact) in enumerate(list(cross_domain.items())[:3]):
+            with cols[idx]:
+                st.markdown(f"<div class='custom-card'><div class='card-title'>{domain.capitalize()}</div><div class='card-body'>{impact}</div></div>", unsafe_allow_html=True)
+
 def render_results_section(data: dict):
     st.markdown("---")
     st.markdown("## 📊 Your Path to Success")
@@ -633,6 +760,17 @@ def render_results_section(data: dict):
             
         if st.button("✅ Commit to This Path", use_container_width=True):
             st.session_state.api_response["learning_plan"]["learning_path"] = st.session_state.refined_path
+            if st.session_state.session_id:
+                try:
+                    response = requests.put(f"{BACKEND_URL}/sessions/{st.session_state.session_id}/learning_path",
+                                            json=st.session_state.refined_path, timeout=10)
+                    saved = response.status_code == 200
+                    error = f"HTTP {response.status_code}"
+                except requests.exceptions.RequestException as e:
+                    saved, error = False, str(e)
+                if not saved:
+                    st.error(f"❌ Could not save the path to your session: {error}")
+                    st.stop()
             st.session_state.refined_path = None
             st.rerun()
 
@@ -673,15 +811,18 @@ def render_learn_page():
         with ic2:
             user_level = st.selectbox("Depth", ["Beginner", "Intermediate", "Advanced"], label_visibility="collapsed")
         with ic3:
-            if st.button("Start", use_container_width=True):
-                target = manual_skill.strip() or st.session_state.selected_skill
-                if target:
-                    st.session_state.selected_skill = target
-                    with st.spinner("Retrieving verified content..."):
-                        res = call_learn_api(target, user_level)
-                        if res["success"]: st.session_state.learning_content = res["data"]
-                else:
-                    st.warning("Enter a topic.")
+            start_clicked = st.button("Start", use_container_width=True)
+
+        if start_clicked:
+            target = manual_skill.strip() or st.session_state.selected_skill
+            if target:
+                st.session_state.selected_skill = target
+                # Stream the module so the first tokens show up immediately
+                res = stream_learn_api(target, user_level)
+                if res["success"]: st.session_state.learning_content = res["data"]
+                else: st.error(f"❌ {res['error']}")
+            else:
+                st.warning("Enter a topic.")
 
         # Content Display
         if st.session_state.learning_content:
@@ -751,10 +892,9 @@ def render_learn_page():
             
             if send and user_q:
                 st.session_state.chat_messages.append({"role": "user", "content": user_q})
-                with st.spinner("Processing..."):
-                    res = call_chat_api(user_q, st.session_state.selected_skill or "")
-                    ans = res["data"]["response"] if res["success"] else f"Error: {res['error']}"
-                    st.session_state.chat_messages.append({"role": "assistant", "content": ans})
+                res = stream_chat_api(user_q, st.session_state.selected_skill or "")
+                ans = res["data"]["response"] if res["success"] else f"Error: {res['error']}"
+                st.session_state.chat_messages.append({"role": "assistant", "content": ans})
                 st.rerun()
 
 # =============================================================================